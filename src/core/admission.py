@@ -0,0 +1,363 @@
+import heapq
+import itertools
+
+import numpy as np
+from src.core.arcs import RingArc
+from src.core.flows import FlowRouter
+
+ADMISSION_POLICIES = ('reject', 'defer')
+
+
+class RangeMaxTree:
+    """Segment tree supporting range add and range max in O(log n).
+
+    Pending adds stay on the covering nodes instead of being pushed down
+    on update: ``_max[p]`` is the subtree maximum including ``_add[p]`` but
+    not the adds of p's ancestors.
+    """
+
+    __slots__ = ('size', '_leaves', '_height', '_max', '_add')
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.size = len(values)
+        self._height = max(1, (self.size - 1).bit_length())
+        self._leaves = 1 << self._height
+        tree = np.full(2 * self._leaves, -np.inf)
+        tree[self._leaves:self._leaves + self.size] = values
+        for p in range(self._leaves - 1, 0, -1):
+            tree[p] = max(tree[2 * p], tree[2 * p + 1])
+        self._max = tree.tolist()
+        self._add = [0.0] * self._leaves
+
+    def _apply(self, p, value):
+        self._max[p] += value
+        if p < self._leaves:
+            self._add[p] += value
+
+    def _build(self, p):
+        while p > 1:
+            p >>= 1
+            self._max[p] = max(self._max[2 * p], self._max[2 * p + 1]) + self._add[p]
+
+    def _push(self, p):
+        for shift in range(self._height, 0, -1):
+            i = p >> shift
+            if self._add[i]:
+                self._apply(2 * i, self._add[i])
+                self._apply(2 * i + 1, self._add[i])
+                self._add[i] = 0.0
+
+    def add(self, start, stop, value):
+        """Adds ``value`` to positions ``start <= i < stop``."""
+        if start >= stop:
+            return
+        lo, hi = start + self._leaves, stop + self._leaves
+        first, last = lo, hi - 1
+        while lo < hi:
+            if lo & 1:
+                self._apply(lo, value)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                self._apply(hi, value)
+            lo >>= 1
+            hi >>= 1
+        self._build(first)
+        self._build(last)
+
+    def max(self, start, stop):
+        """Maximum of positions ``start <= i < stop``."""
+        if start >= stop:
+            return -np.inf
+        lo, hi = start + self._leaves, stop + self._leaves
+        self._push(lo)
+        self._push(hi - 1)
+        result = -np.inf
+        while lo < hi:
+            if lo & 1:
+                result = max(result, self._max[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                result = max(result, self._max[hi])
+            lo >>= 1
+            hi >>= 1
+        return result
+
+    def add_circular(self, start, count, value):
+        """Adds ``value`` to ``count`` consecutive positions, wrapping around."""
+        end = start + count
+        self.add(start, min(end, self.size), value)
+        if end > self.size:
+            self.add(0, end - self.size, value)
+
+    def max_circular(self, start, count):
+        """Maximum of ``count`` consecutive positions starting at ``start``, wrapping around."""
+        end = start + count
+        result = self.max(start, min(end, self.size))
+        if end > self.size:
+            result = max(result, self.max(0, end - self.size))
+        return result
+
+    def above(self, threshold):
+        """Sorted positions whose value exceeds threshold, in O(k log n) for k results."""
+        found = []
+        stack = [(1, 0.0)]
+        while stack:
+            p, pending = stack.pop()
+            if self._max[p] + pending <= threshold:
+                continue
+            if p >= self._leaves:
+                found.append(p - self._leaves)
+            else:
+                pending += self._add[p]
+                stack.append((2 * p + 1, pending))
+                stack.append((2 * p, pending))
+        return np.array(found, dtype=np.intp)
+
+
+class ThermalAdmissionRouter(FlowRouter):
+    """FlowRouter that keeps every node at or below a temperature limit.
+
+    A flow is admitted in the best-scoring direction whose arc stays within
+    ``limit`` after adding the flow's heat. The hottest node of an arc comes
+    from a RangeMaxTree that mirrors the router's node temperatures, so
+    admission costs O(log N) like routing. Flows that fit in neither
+    direction are rejected, or with ``policy='defer'`` queued and retried
+    when flows depart. A deferred flow is only retried once the heat
+    removed since its last attempt could have closed the gap to the limit,
+    so departures do not rescan the whole queue.
+
+    ``heat`` raises node temperatures from outside (e.g. a thermal model);
+    ``reroute_hotspots`` then moves all flows crossing nodes over the limit
+    in one pass.
+
+    ``counts`` files every arrival under its latest outcome, so
+    ``admitted``, ``rejected`` and ``deferred`` add up to the number of
+    arrivals: a deferred flow admitted later moves to ``admitted`` (and is
+    tallied in ``admitted_after_defer``), a displaced flow moves from
+    ``admitted`` to ``rejected`` or ``deferred``.
+    """
+
+    def __init__(self, state, wc, wt, limit=80.0, policy='reject', heat_per_load=0.5):
+        if policy not in ADMISSION_POLICIES:
+            raise ValueError(f"Unknown admission policy: {policy}")
+        super().__init__(state, wc, wt, heat_per_load)
+        self.limit = limit
+        self.policy = policy
+        self._hottest = RangeMaxTree(state.temperature)
+        self.deferred = {}
+        # (cooling needed before a retry can succeed, deferral order, flow id)
+        self._retry_heap = []
+        self._order = itertools.count()
+        self._cooled = 0.0
+        self.counts = {'admitted': 0, 'rejected': 0, 'deferred': 0, 'admitted_after_defer': 0}
+
+    def _apply(self, source, target, clockwise, load):
+        super()._apply(source, target, clockwise, load)
+        first_node, hops = self._arc_span(source, target, clockwise)
+        self._hottest.add_circular(first_node, hops + 1, load * self.heat_per_load)
+
+    def _arc_span(self, source, target, clockwise):
+        """First node (in clockwise order) and hop count of an arc."""
+        if clockwise:
+            return source, (target - source) % self.num_nodes
+        return target, (source - target) % self.num_nodes
+
+    def arc_temperature(self, source, target, clockwise):
+        """Hottest node temperature on an arc, endpoints included."""
+        first_node, hops = self._arc_span(source, target, clockwise)
+        return self._hottest.max_circular(first_node, hops + 1)
+
+    def fits(self, source, target, clockwise, load=1.0):
+        """Whether adding a flow on this arc keeps all of its nodes within the limit."""
+        heat = load * self.heat_per_load
+        return self.arc_temperature(source, target, clockwise) + heat <= self.limit
+
+    def hot_nodes(self):
+        """Sorted ids of the nodes currently over the limit."""
+        return self._hottest.above(self.limit)
+
+    def admit(self, source, target, load=1.0):
+        """Best-scoring direction that fits, as (clockwise, score), or None."""
+        clock_score = self.score(source, target, True)
+        counter_score = self.score(source, target, False)
+        for clockwise, score in sorted(((True, clock_score), (False, counter_score)),
+                                       key=lambda option: option[1]):
+            if self.fits(source, target, clockwise, load):
+                return clockwise, score
+        return None
+
+    def _excess(self, source, target, load):
+        """How far the cooler direction of a flow is over the limit."""
+        heat = load * self.heat_per_load
+        return min(self.arc_temperature(source, target, True),
+                   self.arc_temperature(source, target, False)) + heat - self.limit
+
+    def _defer(self, flow_id, source, target, load, order=None):
+        order = next(self._order) if order is None else order
+        self.deferred[flow_id] = (source, target, load, order)
+        # Small slack so rounding in the running sums cannot postpone a retry
+        retry_at = self._cooled + self._excess(source, target, load) - 1e-9
+        heapq.heappush(self._retry_heap, (retry_at, order, flow_id))
+
+    def arrive(self, flow_id, source, target, load=1.0):
+        """Admits a new flow if it fits; returns its RingArc, or None if rejected or deferred."""
+        if flow_id in self.flows or flow_id in self.deferred:
+            raise ValueError(f"Flow {flow_id} is already active")
+        if not (0 <= source < self.num_nodes and 0 <= target < self.num_nodes):
+            raise ValueError("Source and target must be nodes of the ring")
+
+        path, _ = self._place(flow_id, source, target, load)
+        if path is not None:
+            self.counts['admitted'] += 1
+        elif self.policy == 'defer':
+            self._defer(flow_id, source, target, load)
+            self.counts['deferred'] += 1
+        else:
+            self.counts['rejected'] += 1
+        return path
+
+    def _place(self, flow_id, source, target, load):
+        """Adds a flow in the direction chosen by admit; returns (path, score) or (None, None)."""
+        decision = self.admit(source, target, load)
+        if decision is None:
+            return None, None
+        clockwise, score = decision
+        self._apply(source, target, clockwise, load)
+        self.flows[flow_id] = (source, target, clockwise, load)
+        return RingArc(source, target, clockwise, self.num_nodes), score
+
+    def depart(self, flow_id):
+        """Removes an active (or deferred) flow and retries the deferred ones.
+
+        Departures of flows that were rejected or displaced are ignored.
+        Returns ``(flow_id, path)`` for every deferred flow admitted now.
+        """
+        if flow_id in self.deferred:
+            del self.deferred[flow_id]
+            return []
+        if flow_id not in self.flows:
+            return []
+        self._cooled += self.flows[flow_id][3] * self.heat_per_load
+        super().depart(flow_id)
+        return self.retry_deferred()
+
+    def retry_deferred(self):
+        """Admits deferred flows that may fit now, oldest first."""
+        due = []
+        while self._retry_heap and self._retry_heap[0][0] <= self._cooled:
+            _, order, flow_id = heapq.heappop(self._retry_heap)
+            # Skip entries of flows that departed while deferred
+            if self.deferred.get(flow_id, (None,) * 4)[3] == order:
+                due.append((order, flow_id))
+
+        admitted = []
+        for order, flow_id in sorted(due):
+            source, target, load, _ = self.deferred.pop(flow_id)
+            path, _ = self._place(flow_id, source, target, load)
+            if path is None:
+                self._defer(flow_id, source, target, load, order)
+                continue
+            self.counts['deferred'] -= 1
+            self.counts['admitted'] += 1
+            self.counts['admitted_after_defer'] += 1
+            admitted.append((flow_id, path))
+        return admitted
+
+    def process(self, events):
+        """Applies a stream of events like FlowRouter.process.
+
+        Yields ``(flow_id, path)`` for each arrival (path is None if it was
+        not admitted) and for each deferred flow admitted after a departure.
+        """
+        for event in events:
+            kind, flow_id = event[0], event[1]
+            if kind == 'arrive':
+                yield flow_id, self.arrive(flow_id, *event[2:])
+            elif kind == 'depart':
+                yield from self.depart(flow_id)
+            else:
+                raise ValueError(f"Unknown flow event: {kind}")
+
+    def heat(self, nodes, delta):
+        """Adds delta (scalar or per node) to the temperature of nodes, e.g. from a thermal model."""
+        nodes = np.atleast_1d(np.asarray(nodes, dtype=np.intp))
+        deltas = np.broadcast_to(np.asarray(delta, dtype=np.float64), nodes.shape)
+        for node, value in zip(nodes.tolist(), deltas.tolist()):
+            self._temperature.add(node, node + 1, value)
+            self._hottest.add(node, node + 1, value)
+            self._temperature_total += value
+        if len(deltas) and deltas.min() < 0:
+            self._cooled -= deltas.min()
+
+    def _flow_arrays(self):
+        ids = list(self.flows)
+        columns = np.array([self.flows[flow_id] for flow_id in ids], dtype=np.float64).reshape(-1, 4)
+        source, target = columns[:, 0].astype(np.intp), columns[:, 1].astype(np.intp)
+        clockwise = columns[:, 2].astype(bool)
+        first_node = np.where(clockwise, source, target)
+        hops = np.where(clockwise, target - source, source - target) % self.num_nodes
+        return ids, first_node, hops
+
+    def flows_through(self, nodes):
+        """Ids of the active flows whose arc contains any of the given nodes."""
+        nodes = np.unique(np.asarray(nodes, dtype=np.intp))
+        if not len(nodes) or not self.flows:
+            return []
+        ids, first_node, hops = self._flow_arrays()
+        # Count the given nodes in [first_node, first_node + hops], split where the arc wraps
+        end = first_node + hops
+        inside = np.searchsorted(nodes, np.minimum(end, self.num_nodes - 1), side='right') - \
+            np.searchsorted(nodes, first_node, side='left')
+        wrapped = end >= self.num_nodes
+        inside[wrapped] += np.searchsorted(nodes, end[wrapped] - self.num_nodes, side='right')
+        return [flow_id for flow_id, count in zip(ids, inside.tolist()) if count]
+
+    def reroute_hotspots(self):
+        """Moves all flows crossing nodes over the limit away from them in one pass.
+
+        The affected flows are removed together, then placed again one by
+        one (largest load first) with the admission check; each keeps its
+        direction only if that fits again. Flows that fit nowhere are
+        deferred or rejected according to the policy and counted in
+        ``counts``. The heat the displaced flows free up counts as cooling,
+        so deferred flows that fit now are admitted at the end.
+
+        Returns counts of the affected, rerouted, unchanged and displaced
+        flows, the cost of rerouting (the summed score increase over
+        keeping each rerouted flow's old direction, and the extra hops) and
+        under ``'admitted'`` the ``(flow_id, path)`` of every deferred flow
+        admitted afterwards, as ``depart`` returns them.
+        """
+        hot = self.hot_nodes()
+        affected = self.flows_through(hot)
+        removed = {flow_id: self.flows[flow_id] for flow_id in affected}
+        for flow_id in affected:
+            self._cooled += removed[flow_id][3] * self.heat_per_load
+            super().depart(flow_id)
+
+        report = {'hot_nodes': len(hot), 'affected': len(affected), 'rerouted': 0,
+                  'unchanged': 0, 'displaced': 0, 'score_delta': 0.0, 'hop_delta': 0}
+        for flow_id in sorted(affected, key=lambda flow_id: -removed[flow_id][3]):
+            source, target, old_clockwise, load = removed[flow_id]
+            old_score = self.score(source, target, old_clockwise)
+            path, score = self._place(flow_id, source, target, load)
+            if path is None:
+                report['displaced'] += 1
+                self.counts['admitted'] -= 1
+                if self.policy == 'defer':
+                    self._defer(flow_id, source, target, load)
+                    self.counts['deferred'] += 1
+                else:
+                    self.counts['rejected'] += 1
+                continue
+            if path.clockwise == old_clockwise:
+                report['unchanged'] += 1
+                continue
+            report['rerouted'] += 1
+            report['score_delta'] += float(score - old_score)
+            report['hop_delta'] += int(path.hops - self._arc_span(source, target, old_clockwise)[1])
+        report['admitted'] = self.retry_deferred()
+        return report
@@ -0,0 +1,125 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class RingArc(Sequence):
+    """Lazy node sequence of the arc walked from ``source`` to ``target``.
+
+    Behaves like the list returned by ``get_clockwise_path`` /
+    ``get_counter_clockwise_path`` (indexing, slicing, iteration, ``len``)
+    but only materializes nodes when they are actually read.
+    """
+
+    __slots__ = ('source', 'target', 'clockwise', 'num_nodes')
+
+    def __init__(self, source, target, clockwise, num_nodes):
+        self.source = int(source)
+        self.target = int(target)
+        self.clockwise = bool(clockwise)
+        self.num_nodes = int(num_nodes)
+
+    @property
+    def hops(self):
+        if self.clockwise:
+            return (self.target - self.source) % self.num_nodes
+        return (self.source - self.target) % self.num_nodes
+
+    def __len__(self):
+        return self.hops + 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._node(i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RingArc index out of range")
+        return self._node(index)
+
+    def _node(self, offset):
+        step = offset if self.clockwise else -offset
+        return (self.source + step) % self.num_nodes
+
+    def __iter__(self):
+        for offset in range(len(self)):
+            yield self._node(offset)
+
+    def __array__(self, dtype=None, copy=None):
+        step = 1 if self.clockwise else -1
+        nodes = (self.source + step * np.arange(len(self))) % self.num_nodes
+        return nodes if dtype is None else nodes.astype(dtype)
+
+    def tolist(self):
+        return list(self)
+
+    def __eq__(self, other):
+        if isinstance(other, RingArc):
+            return (self.source, self.target, self.num_nodes, self.hops) == \
+                   (other.source, other.target, other.num_nodes, other.hops) and \
+                   (self.clockwise == other.clockwise or self.hops == 0)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.source, self.target, self.num_nodes, self.hops))
+
+    def __repr__(self):
+        direction = 'cw' if self.clockwise else 'ccw'
+        return f"RingArc({self.source} -> {self.target}, {direction}, {len(self)} nodes)"
+
+
+class RingArcIndex:
+    """Circular prefix sums answering arc congestion/temperature in O(1).
+
+    Built from a ``RingState`` snapshot; ``version`` records the state
+    version it reflects so the owner can rebuild it when link or node state
+    changes. All queries accept scalars or NumPy arrays of endpoints.
+    """
+
+    __slots__ = ('num_nodes', 'version', 'cw_prefix', 'ccw_prefix', 'temp_prefix')
+
+    def __init__(self, state, version=0):
+        self.num_nodes = state.num_nodes
+        self.version = version
+        self.cw_prefix = self._prefix(state.cw_utilization)
+        self.ccw_prefix = self._prefix(state.ccw_utilization)
+        self.temp_prefix = self._prefix(state.temperature)
+
+    @staticmethod
+    def _prefix(values):
+        prefix = np.empty(len(values) + 1)
+        prefix[0] = 0.0
+        np.cumsum(values, out=prefix[1:])
+        return prefix
+
+    def _range_sum(self, prefix, start, count):
+        """Sums ``count`` consecutive entries starting at ``start``, wrapping around."""
+        n = self.num_nodes
+        start = np.asarray(start) % n
+        end = start + count
+        wrapped = end > n
+        total = np.where(wrapped,
+                         prefix[n] - prefix[start] + prefix[np.where(wrapped, end - n, 0)],
+                         prefix[np.minimum(end, n)] - prefix[start])
+        return total if total.ndim else float(total)
+
+    def hops(self, source, target, clockwise):
+        if clockwise:
+            return (np.asarray(target) - source) % self.num_nodes
+        return (np.asarray(source) - target) % self.num_nodes
+
+    def congestion(self, source, target, clockwise):
+        """Total link utilization of the arc from ``source`` to ``target``."""
+        hops = self.hops(source, target, clockwise)
+        if clockwise:
+            return self._range_sum(self.cw_prefix, source, hops)
+        # Counter-clockwise links target+1 -> target, ..., source -> source-1
+        return self._range_sum(self.ccw_prefix, np.asarray(target) + 1, hops)
+
+    def temperature(self, source, target, clockwise):
+        """Total node temperature of the arc, both endpoints included."""
+        hops = self.hops(source, target, clockwise)
+        start = source if clockwise else target
+        return self._range_sum(self.temp_prefix, start, hops + 1)
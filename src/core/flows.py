@@ -0,0 +1,215 @@
+import numpy as np
+from src.core.arcs import RingArc
+from src.core.metrics import check_weights
+
+
+class RangeFenwick:
+    """Fenwick tree pair supporting range add and range sum in O(log n).
+
+    Only the added deltas live in the trees; the initial values are kept as
+    a static prefix-sum array. A difference array mirrors every update so
+    the current values can be materialized in one vectorized pass.
+    """
+
+    __slots__ = ('size', '_base_prefix', '_linear', '_offset', '_diff')
+
+    def __init__(self, base):
+        base = np.asarray(base, dtype=np.float64)
+        self.size = len(base)
+        self._base_prefix = np.concatenate(([0.0], np.cumsum(base))).tolist()
+        self._linear = [0.0] * (self.size + 1)
+        self._offset = [0.0] * (self.size + 1)
+        self._diff = np.zeros(self.size + 1)
+        self._diff[0] = base[0] if self.size else 0.0
+        self._diff[1:self.size] = np.diff(base)
+
+    def _update(self, tree, position, value):
+        while position <= self.size:
+            tree[position] += value
+            position += position & -position
+
+    def _query(self, tree, position):
+        total = 0.0
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    def _prefix(self, count):
+        """Sum of the first ``count`` values."""
+        added = self._query(self._linear, count) * count - self._query(self._offset, count)
+        return self._base_prefix[count] + added
+
+    def add(self, start, stop, value):
+        """Adds ``value`` to positions ``start <= i < stop``."""
+        if start >= stop:
+            return
+        self._update(self._linear, start + 1, value)
+        self._update(self._linear, stop + 1, -value)
+        self._update(self._offset, start + 1, value * start)
+        self._update(self._offset, stop + 1, -value * stop)
+        self._diff[start] += value
+        self._diff[stop] -= value
+
+    def sum(self, start, stop):
+        """Sum of positions ``start <= i < stop``."""
+        if start >= stop:
+            return 0.0
+        return self._prefix(stop) - self._prefix(start)
+
+    def add_circular(self, start, count, value):
+        """Adds ``value`` to ``count`` consecutive positions, wrapping around."""
+        end = start + count
+        self.add(start, min(end, self.size), value)
+        if end > self.size:
+            self.add(0, end - self.size, value)
+
+    def sum_circular(self, start, count):
+        """Sums ``count`` consecutive positions starting at ``start``, wrapping around."""
+        end = start + count
+        total = self.sum(start, min(end, self.size))
+        if end > self.size:
+            total += self.sum(0, end - self.size)
+        return total
+
+    def values(self):
+        """Materializes the current values as a NumPy array."""
+        return np.cumsum(self._diff[:self.size])
+
+
+class FlowRouter:
+    """Stateful TempCon router driven by flow arrival and departure events.
+
+    Each arriving flow is routed clockwise or counter-clockwise against the
+    current load using the same normalized score as calculate_arc_scores.
+    Its load is then added to every link of the chosen arc, to the
+    congestion of the arc's nodes, and (scaled by ``heat_per_load``) to
+    their temperature. Departures undo exactly that. Routing and updates
+    are range queries/updates on Fenwick trees, so each event costs
+    O(log N) regardless of arc length.
+
+    Load is accounted per physical link, i.e. a flow loads link ``i``
+    (joining ``i`` and ``i + 1``) in both directions. ``sync_state`` writes
+    the accumulated state back into the RingState.
+    """
+
+    def __init__(self, state, wc, wt, heat_per_load=0.5):
+        check_weights(wc, wt)
+        self.state = state
+        self.wc = wc
+        self.wt = wt
+        self.heat_per_load = heat_per_load
+        self.num_nodes = n = state.num_nodes
+
+        # Initial link utilization is static and answered by the arc index;
+        # flow load is shared by both directions of a physical link
+        self._base_index = state.arc_index()
+        self._cw_initial = state.cw_utilization.copy()
+        self._ccw_initial = state.ccw_utilization.copy()
+        self._link_load = RangeFenwick(np.zeros(n))
+        self._temperature = RangeFenwick(state.temperature)
+        self._congestion = RangeFenwick(state.congestion)
+
+        self._utilization_total = float(state.cw_utilization.sum() + state.ccw_utilization.sum())
+        self._temperature_total = float(state.temperature.sum())
+        self.flows = {}
+
+    def _arc_totals(self, source, target, clockwise):
+        """Returns (hops, congestion, temperature) of an arc under current load."""
+        n = self.num_nodes
+        congestion = self._base_index.congestion(source, target, clockwise)
+        if clockwise:
+            hops = (target - source) % n
+            congestion += self._link_load.sum_circular(source, hops)
+            first_node = source
+        else:
+            hops = (source - target) % n
+            # ccw links target+1 -> target ... source -> source-1 are the
+            # physical links target .. source-1
+            congestion += self._link_load.sum_circular(target, hops)
+            first_node = target
+        temperature = self._temperature.sum_circular(first_node, hops + 1)
+        return hops, congestion, temperature
+
+    def score(self, source, target, clockwise):
+        """Score of routing source -> target in one direction under current load."""
+        hops, congestion, temperature = self._arc_totals(source, target, clockwise)
+        n = self.num_nodes
+        avg_congestion = self._utilization_total / (2 * n)
+        avg_temperature = self._temperature_total / n
+        length = hops + 1
+        return (self.wc * congestion / (length * avg_congestion) +
+                self.wt * temperature / (length * avg_temperature))
+
+    def route(self, source, target):
+        """Chooses a direction for source -> target without changing any load."""
+        clock_score = self.score(source, target, True)
+        counter_score = self.score(source, target, False)
+        if clock_score <= counter_score:
+            return True, clock_score
+        return False, counter_score
+
+    def _apply(self, source, target, clockwise, load):
+        n = self.num_nodes
+        if clockwise:
+            hops = (target - source) % n
+            first_link = first_node = source
+        else:
+            hops = (source - target) % n
+            first_link = first_node = target
+        self._link_load.add_circular(first_link, hops, load)
+        self._congestion.add_circular(first_node, hops + 1, load)
+        self._temperature.add_circular(first_node, hops + 1, load * self.heat_per_load)
+        self._utilization_total += 2 * load * hops
+        self._temperature_total += load * self.heat_per_load * (hops + 1)
+
+    def arrive(self, flow_id, source, target, load=1.0):
+        """Routes a new flow against the current state and adds its load.
+
+        Returns the chosen path as a lazy RingArc.
+        """
+        if flow_id in self.flows:
+            raise ValueError(f"Flow {flow_id} is already active")
+        if not (0 <= source < self.num_nodes and 0 <= target < self.num_nodes):
+            raise ValueError("Source and target must be nodes of the ring")
+
+        clockwise, _ = self.route(source, target)
+        self._apply(source, target, clockwise, load)
+        self.flows[flow_id] = (source, target, clockwise, load)
+        return RingArc(source, target, clockwise, self.num_nodes)
+
+    def depart(self, flow_id):
+        """Removes an active flow and its load."""
+        source, target, clockwise, load = self.flows.pop(flow_id)
+        self._apply(source, target, clockwise, -load)
+
+    def process(self, events):
+        """Applies a stream of events, yielding ``(flow_id, path)`` for each arrival.
+
+        Events are tuples ``('arrive', flow_id, source, target, load)`` or
+        ``('depart', flow_id)``.
+        """
+        for event in events:
+            kind, flow_id = event[0], event[1]
+            if kind == 'arrive':
+                yield flow_id, self.arrive(flow_id, *event[2:])
+            elif kind == 'depart':
+                self.depart(flow_id)
+            else:
+                raise ValueError(f"Unknown flow event: {kind}")
+
+    def link_load(self):
+        """Current flow load per physical link."""
+        return self._link_load.values()
+
+    def sync_state(self):
+        """Writes the accumulated utilization, congestion and temperature into the RingState."""
+        load = self._link_load.values()
+        state = self.state
+        state.cw_utilization[:] = self._cw_initial + load
+        state.ccw_utilization[:] = self._ccw_initial + np.roll(load, 1)
+        state.temperature[:] = self._temperature.values()
+        state.congestion[:] = self._congestion.values()
+        state.mark_changed()
+        state.push_to_graph()
+        return state
@@ -0,0 +1,236 @@
+"""Hierarchical ring topology: local rings per partition joined by a global ring.
+
+Partition ``p`` owns the global node ids ``p * m .. p * m + m - 1`` (``m``
+nodes per partition) and forms its own local ring. One node per partition
+acts as its gateway, and the gateways form the global ring. A route
+between partitions therefore has up to three segments: source to its
+gateway, gateway to gateway on the global ring, and gateway to target.
+Each segment's direction is chosen by the TempCon arc score of its own
+ring, so local legs of different partitions can be resolved independently
+and in parallel.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.core.arcs import RingArc
+from src.core.metrics import calculate_arc_scores, check_weights
+from src.core.ring_state import RingState
+from src.core.topology import create_ring_state
+
+
+class HierarchicalRing:
+    """Local ``RingState`` per partition plus a global ``RingState`` of gateways."""
+
+    def __init__(self, local_rings, global_ring, gateway=0):
+        sizes = {ring.num_nodes for ring in local_rings}
+        if len(sizes) != 1:
+            raise ValueError("All local rings must have the same number of nodes")
+        if global_ring.num_nodes != len(local_rings):
+            raise ValueError("The global ring needs one node per local ring")
+
+        self.local_rings = list(local_rings)
+        self.global_ring = global_ring
+        self.num_partitions = len(local_rings)
+        self.partition_size = sizes.pop()
+        self.num_nodes = self.num_partitions * self.partition_size
+        if not 0 <= gateway < self.partition_size:
+            raise ValueError("Gateway must be a local node index")
+        self.gateway = gateway
+
+    def locate(self, nodes):
+        """Splits global node ids into (partition, local index)."""
+        return np.divmod(np.asarray(nodes), self.partition_size)
+
+    def gateways(self):
+        """Global node ids of the gateways, indexed by partition."""
+        return np.arange(self.num_partitions) * self.partition_size + self.gateway
+
+    def partitions(self):
+        """Node ids per partition, in the format returned by partition_nodes."""
+        return [list(range(p * self.partition_size, (p + 1) * self.partition_size))
+                for p in range(self.num_partitions)]
+
+    def route(self, source, target, wc, wt):
+        """Routes one request; see route_batch."""
+        return self.route_batch([source], [target], wc, wt)[0]
+
+    def route_batch(self, sources, targets, wc, wt, workers=None):
+        """Routes many source/target pairs with the two-level router.
+
+        Local legs are grouped by partition and every partition's group is
+        scored in one vectorized call; with ``workers`` the groups run on a
+        thread pool. Global legs are scored in one call on the global ring.
+        """
+        check_weights(wc, wt)
+        sources = np.asarray(sources, dtype=np.intp)
+        targets = np.asarray(targets, dtype=np.intp)
+        if len(sources) != len(targets):
+            raise ValueError("Sources and targets must have the same length")
+        if len(sources) and (min(sources.min(), targets.min()) < 0 or
+                             max(sources.max(), targets.max()) >= self.num_nodes):
+            raise ValueError("Source and target must be nodes of the topology")
+
+        source_partition, source_local = self.locate(sources)
+        target_partition, target_local = self.locate(targets)
+        inter = source_partition != target_partition
+
+        # Leg 1: source to its gateway (or straight to the target inside a partition)
+        first_target = np.where(inter, self.gateway, target_local)
+        # Leg 3: target partition's gateway to the target, only between partitions
+        last_source = np.full(len(targets), self.gateway)
+
+        legs_partition = np.concatenate((source_partition, target_partition[inter]))
+        legs_source = np.concatenate((source_local, last_source[inter]))
+        legs_target = np.concatenate((first_target, target_local[inter]))
+        legs_clockwise, legs_score = self._route_local(legs_partition, legs_source, legs_target,
+                                                      wc, wt, workers)
+
+        global_clockwise, global_score = _choose_direction(
+            self.global_ring, source_partition[inter], target_partition[inter], wc, wt)
+
+        count = len(sources)
+        return RouteBatch(self, sources, targets, inter, first_target,
+                          legs_clockwise[:count], legs_score[:count],
+                          global_clockwise, global_score,
+                          legs_clockwise[count:], legs_score[count:])
+
+    def _route_local(self, partition, source, target, wc, wt, workers):
+        clockwise = np.zeros(len(partition), dtype=bool)
+        score = np.zeros(len(partition))
+        order = np.argsort(partition, kind='stable')
+        bounds = np.flatnonzero(np.diff(partition[order])) + 1
+        groups = np.split(order, bounds) if len(order) else []
+
+        def solve(group):
+            ring = self.local_rings[partition[group[0]]]
+            return group, _choose_direction(ring, source[group], target[group], wc, wt)
+
+        if workers and len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(solve, groups))
+        else:
+            results = map(solve, groups)
+        for group, (group_clockwise, group_score) in results:
+            clockwise[group] = group_clockwise
+            score[group] = group_score
+        return clockwise, score
+
+    def to_graph(self):
+        """Builds a NetworkX graph of all local and global links for visualization.
+
+        Local edges carry ``level='local'``, gateway links ``level='global'``.
+        """
+        import networkx as nx
+
+        graph = nx.Graph()
+        m = self.partition_size
+        for p, ring in enumerate(self.local_rings):
+            for local in range(m):
+                graph.add_node(p * m + local, temperature=float(ring.temperature[local]),
+                               congestion=float(ring.congestion[local]), partition=p)
+            for local in range(m):
+                graph.add_edge(p * m + local, p * m + (local + 1) % m, level='local',
+                               utilization=float(ring.cw_utilization[local]))
+        gateways = self.gateways()
+        for p in range(self.num_partitions):
+            graph.add_edge(int(gateways[p]), int(gateways[(p + 1) % self.num_partitions]),
+                           level='global',
+                           utilization=float(self.global_ring.cw_utilization[p]))
+        return graph
+
+
+def _choose_direction(ring, sources, targets, wc, wt):
+    """Picks the lower-scoring direction per arc; ties go clockwise like multicast_search."""
+    if not len(sources):
+        return np.zeros(0, dtype=bool), np.zeros(0)
+    clock_scores = calculate_arc_scores(ring, sources, targets, True, wc, wt)
+    counter_scores = calculate_arc_scores(ring, sources, targets, False, wc, wt)
+    clockwise = clock_scores <= counter_scores
+    return clockwise, np.where(clockwise, clock_scores, counter_scores)
+
+
+class RouteBatch:
+    """Result of HierarchicalRing.route_batch, kept as arrays.
+
+    ``score`` is the sum of each route's segment scores; indexing returns
+    a route's segments as ``(level, ring, RingArc)`` tuples in local or
+    global ring coordinates.
+    """
+
+    def __init__(self, topology, sources, targets, inter, first_target, first_clockwise,
+                 first_score, global_clockwise, global_score, last_clockwise, last_score):
+        self.topology = topology
+        self.sources = sources
+        self.targets = targets
+        self.inter = inter
+        self.first_target = first_target
+        self.first_clockwise = first_clockwise
+        self.global_clockwise = global_clockwise
+        self.last_clockwise = last_clockwise
+        # Positions of each inter-partition route in the global/last leg arrays
+        self._inter_position = np.cumsum(inter) - 1
+
+        self.score = first_score.copy()
+        self.score[inter] += global_score + last_score
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __getitem__(self, i):
+        topology = self.topology
+        m = topology.partition_size
+        source_partition, source_local = divmod(int(self.sources[i]), m)
+        target_partition, target_local = divmod(int(self.targets[i]), m)
+
+        segments = [('local', source_partition,
+                     RingArc(source_local, self.first_target[i], self.first_clockwise[i], m))]
+        if self.inter[i]:
+            k = self._inter_position[i]
+            segments.append(('global', None,
+                             RingArc(source_partition, target_partition,
+                                     self.global_clockwise[k], topology.num_partitions)))
+            segments.append(('local', target_partition,
+                             RingArc(topology.gateway, target_local, self.last_clockwise[k], m)))
+        return segments
+
+    def nodes(self, i):
+        """Global node ids visited by route ``i``, gateways included once."""
+        m = self.topology.partition_size
+        gateway = self.topology.gateway
+        nodes = []
+        for level, ring, arc in self[i]:
+            ids = [ring * m + local for local in arc] if level == 'local' else \
+                  [partition * m + gateway for partition in arc]
+            nodes.extend(ids[1:] if nodes else ids)
+        return nodes
+
+
+def create_hierarchical_topology(num_partitions, partition_size, rng=None, profile='gaussian',
+                                 gateway=0, **options):
+    """Creates local rings and a global gateway ring from one topology profile.
+
+    Node state is drawn for all ``num_partitions * partition_size`` nodes at
+    once; the global ring's links get their own utilization draw and its
+    nodes share the gateways' temperature and congestion.
+    """
+    if num_partitions < 3 or partition_size < 3:
+        raise ValueError("Need at least 3 partitions of at least 3 nodes")
+    if not isinstance(rng, np.random.Generator):
+        # Both draws below must come from the same generator
+        rng = np.random.default_rng(np.random.randint(0, 2**63 - 1, dtype=np.int64)
+                                    if rng is None else rng)
+
+    flat = create_ring_state(num_partitions * partition_size, rng, profile, **options)
+    global_links = create_ring_state(num_partitions, rng, profile, **options)
+
+    local_rings = []
+    for p in range(num_partitions):
+        nodes = slice(p * partition_size, (p + 1) * partition_size)
+        local_rings.append(RingState(partition_size, flat.temperature[nodes],
+                                     flat.congestion[nodes], flat.cw_utilization[nodes]))
+
+    gateways = np.arange(num_partitions) * partition_size + gateway
+    global_ring = RingState(num_partitions, flat.temperature[gateways], flat.congestion[gateways],
+                            global_links.cw_utilization)
+    return HierarchicalRing(local_rings, global_ring, gateway)
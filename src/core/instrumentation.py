@@ -0,0 +1,149 @@
+"""Opt-in timing, call counting and memory tracking for simulation runs.
+
+Nothing is measured unless an ``Instrumentation`` is active::
+
+    with Instrumentation(profile_path='results/profile.prof') as instrumentation:
+        with instrumentation.stage('routing'):
+            ...
+    report = instrumentation.report()
+
+Functions decorated with ``counted`` (the scoring functions in
+``metrics.py``) report their call count and cumulative time to the active
+instrumentation; when none is active the decorator costs one global
+lookup per call. ``report`` lists every counted function, including the
+ones a run never called, with a count of zero.
+"""
+import contextlib
+import cProfile
+import functools
+import json
+import logging
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+_active = None
+_counted_names = []
+
+
+def counted(function):
+    """Counts calls and cumulative time of function while instrumentation is active."""
+    name = function.__name__
+    if name not in _counted_names:
+        _counted_names.append(name)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        instrumentation = _active
+        if instrumentation is None:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            instrumentation.record_call(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+class Instrumentation:
+    """Collects per-stage wall/CPU time, call counters and peak memory of one run.
+
+    ``trace_memory`` uses tracemalloc, which slows allocation-heavy code
+    down noticeably; ``profile_path`` additionally runs cProfile and dumps
+    its stats there when the instrumentation exits.
+    """
+
+    def __init__(self, trace_memory=True, profile_path=None):
+        self.trace_memory = trace_memory
+        self.profile_path = profile_path
+        self.stages = []
+        self.calls = {}
+        self.wall_time = None
+        self.cpu_time = None
+        self.peak_memory = None
+        self._profiler = None
+        self._started_tracing = False
+        self._previous = None
+
+    def __enter__(self):
+        global _active
+        self._previous, _active = _active, self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        self.wall_time = time.perf_counter() - self._wall_start
+        self.cpu_time = time.process_time() - self._cpu_start
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_path)
+            self._profiler = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory = max([tracemalloc.get_traced_memory()[1]] +
+                                   [stage['peak_memory'] for stage in self.stages
+                                    if stage['peak_memory'] is not None])
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        _active = self._previous
+        return False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Measures wall time, CPU time and (if traced) peak memory of a block."""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield self
+        finally:
+            self.stages.append({
+                'stage': name,
+                'wall_time': time.perf_counter() - wall_start,
+                'cpu_time': time.process_time() - cpu_start,
+                'peak_memory': tracemalloc.get_traced_memory()[1] if tracing else None,
+            })
+
+    def record_call(self, name, elapsed):
+        counter = self.calls.setdefault(name, {'count': 0, 'time': 0.0})
+        counter['count'] += 1
+        counter['time'] += elapsed
+
+    def report(self):
+        """All measurements as a JSON-serializable dict."""
+        calls = {name: {'count': 0, 'time': 0.0} for name in _counted_names}
+        calls.update((name, dict(counter)) for name, counter in self.calls.items())
+        return {
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'peak_memory': self.peak_memory,
+            'stages': list(self.stages),
+            'calls': calls,
+            'profile_path': self.profile_path,
+        }
+
+    def log(self, **context):
+        """Writes one JSON log record per stage and a summary record."""
+        for stage in self.stages:
+            logger.info(json.dumps(dict(context, event='stage', **stage)))
+        summary = {key: value for key, value in self.report().items() if key != 'stages'}
+        logger.info(json.dumps(dict(context, event='run', **summary)))
+
+
+def stage(instrumentation, name):
+    """``instrumentation.stage(name)``, or a no-op context if instrumentation is None."""
+    if instrumentation is None:
+        return contextlib.nullcontext()
+    return instrumentation.stage(name)
@@ -1,23 +1,35 @@
 from src.core.topology import create_ring_topology, partition_nodes
 from src.core.routing import multicast_search, shortest_path_first
-from src.visualization.visualizer import (visualize_topology, 
-                                        visualize_metrics_comparison,
-                                        create_interactive_visualization,
-                                        save_simulation_metrics,
-                                        save_node_partition_metrics)
-from src.test.test_scenarios import create_test_scenario_1, create_test_scenario_2
+from src.core.arcs import RingArc
+from src.core.ring_state import RingState, ring_state
+from src.core.results_store import ResultsStore
+from src.core.instrumentation import Instrumentation, stage
+from dataclasses import dataclass
+import contextlib
+import json
 import logging
 import os
+import numpy as np
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('results/simulation.log'),
-        logging.StreamHandler()
-    ]
-)
+# The visualization stack (matplotlib, pandas) is only imported by the
+# render/CSV functions below, so compute-only callers never load it.
+
+def setup_logging(log_file='results/simulation.log', level=logging.INFO):
+    """Configure logging to the console and, if given, a log file.
+    
+    Does nothing if the root logger already has handlers.
+    """
+    if logging.getLogger().handlers:
+        return
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
 
 def setup_directories():
     """Create necessary directories if they don't exist."""
@@ -31,43 +43,205 @@ def setup_directories():
     for directory in directories:
         os.makedirs(directory, exist_ok=True)
 
-def main(num_nodes, partition_size, wc, wt, sources, targets, test_scenario=None, test_name=None):
-    """Main simulation function with improved error handling and logging."""
-    setup_directories()
-    logging.info("Starting simulation with parameters: "
-                f"nodes={num_nodes}, partition_size={partition_size}, "
-                f"wc={wc}, wt={wt}")
+@dataclass
+class SimulationResult:
+    """Routing outcome of one simulation run, independent of any rendering."""
+    num_nodes: int
+    partition_size: int
+    wc: float
+    wt: float
+    sources: list
+    targets: list
+    ring: object
+    partitions: list
+    paths_tempcon: dict
+    scores_tempcon: dict
+    paths_spf: dict
+    scores_spf: dict
+    test_name: str = None
+    instrumentation: dict = None
+
+def _stage(instrumentation, progress, name):
+    """Reports the start of a stage to progress and times it with instrumentation."""
+    if progress:
+        progress(name)
+    return stage(instrumentation, name)
+
+def run_simulation(num_nodes, partition_size, wc, wt, sources, targets, test_scenario=None, test_name=None,
+                   rng=None, instrumentation=None, progress=None):
+    """Runs topology creation and both routing algorithms without any plotting or file output.
     
-    try:
-        # Create topology
-        ring = create_ring_topology(num_nodes)
-        logging.info("Ring topology created successfully")
-        
-        # Apply test scenario if provided
-        if test_scenario:
+    With an active Instrumentation, each step is recorded as a stage;
+    progress, if given, is called with each stage's name as it starts.
+    """
+    # Create topology
+    with _stage(instrumentation, progress, 'topology'):
+        ring = create_ring_topology(num_nodes, rng=rng)
+    logging.info("Ring topology created successfully")
+    
+    # Apply test scenario if provided
+    if test_scenario:
+        with _stage(instrumentation, progress, 'scenario'):
             ring = test_scenario(ring)
-            logging.info(f"Applied test scenario: {test_scenario.__name__}")
-        
-        # Partition nodes
+        logging.info(f"Applied test scenario: {test_scenario.__name__}")
+    
+    # Partition nodes
+    with _stage(instrumentation, progress, 'partition'):
         partitions = partition_nodes(ring, partition_size)
-        logging.info(f"Network partitioned into {len(partitions)} partitions")
-        
-        # Run algorithms
+    logging.info(f"Network partitioned into {len(partitions)} partitions")
+    
+    # Run algorithms
+    with _stage(instrumentation, progress, 'tempcon'):
         paths_tempcon, scores_tempcon = multicast_search(ring, sources, 
                                                        targets, wc, wt)
+    with _stage(instrumentation, progress, 'spf'):
         paths_spf, scores_spf = shortest_path_first(ring, sources, targets)
+    
+    return SimulationResult(num_nodes, partition_size, wc, wt, list(sources), list(targets),
+                            ring, partitions, paths_tempcon, scores_tempcon,
+                            paths_spf, scores_spf, test_name)
+
+def _pack_paths(paths_dict, scores_dict):
+    """Flattens {source: [RingArc, ...]} into (source, target, clockwise, score) columns."""
+    rows = [(source, path.target, path.clockwise, score)
+            for source in paths_dict
+            for path, score in zip(paths_dict[source], scores_dict[source])]
+    columns = list(zip(*rows)) if rows else [(), (), (), ()]
+    return [np.array(column, dtype=dtype) for column, dtype
+            in zip(columns, (np.intp, np.intp, bool, np.float64))]
+
+def _unpack_paths(sources, columns, num_nodes):
+    path_sources, path_targets, clockwise, scores = columns
+    paths_dict = {source: [] for source in sources}
+    scores_dict = {source: [] for source in sources}
+    for source, target, direction, score in zip(path_sources.tolist(), path_targets.tolist(),
+                                                clockwise.tolist(), scores.tolist()):
+        paths_dict[source].append(RingArc(source, target, direction, num_nodes))
+        scores_dict[source].append(score)
+    return paths_dict, scores_dict
+
+def save_result(result, path):
+    """Saves a SimulationResult to an .npz file for later rendering."""
+    state = ring_state(result.ring)
+    arrays = {
+        'temperature': state.temperature,
+        'congestion': state.congestion,
+        'cw_utilization': state.cw_utilization,
+        'ccw_utilization': state.ccw_utilization,
+        'params': np.array(json.dumps({
+            'num_nodes': result.num_nodes, 'partition_size': result.partition_size,
+            'wc': result.wc, 'wt': result.wt, 'sources': result.sources,
+            'targets': result.targets, 'test_name': result.test_name}))
+    }
+    for name, paths, scores in (('tempcon', result.paths_tempcon, result.scores_tempcon),
+                                ('spf', result.paths_spf, result.scores_spf)):
+        for key, column in zip(('source', 'target', 'clockwise', 'score'), _pack_paths(paths, scores)):
+            arrays[f'{name}_{key}'] = column
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.savez(path, **arrays)
+
+def load_result(path):
+    """Loads a SimulationResult saved by save_result, rebuilding the ring graph."""
+    with np.load(path) as data:
+        params = json.loads(str(data['params']))
+        state = RingState(params['num_nodes'], data['temperature'], data['congestion'],
+                          data['cw_utilization'], data['ccw_utilization'])
+        paths = {name: _unpack_paths(params['sources'],
+                                     [data[f'{name}_{key}'] for key in ('source', 'target', 'clockwise', 'score')],
+                                     params['num_nodes'])
+                 for name in ('tempcon', 'spf')}
+    
+    ring = state.to_graph()
+    partitions = partition_nodes(ring, params['partition_size'])
+    return SimulationResult(params['num_nodes'], params['partition_size'], params['wc'], params['wt'],
+                            params['sources'], params['targets'], ring, partitions,
+                            *paths['tempcon'], *paths['spf'], params['test_name'])
+
+def render_result(result, interactive=False):
+    """Renders the plots of a (possibly reloaded) SimulationResult."""
+    from src.visualization.visualizer import (visualize_topology,
+                                              visualize_metrics_comparison,
+                                              create_interactive_visualization)
+    visualize_topology(result.ring, result.paths_tempcon, result.paths_spf, result.sources,
+                       result.targets, result.partition_size)
+    visualize_metrics_comparison(result.ring, result.paths_tempcon, result.paths_spf,
+                                 result.wc, result.wt, result.test_name)
+    if interactive:
+        create_interactive_visualization(result.ring, result.paths_tempcon, result.paths_spf,
+                                         result.sources, result.targets)
+
+def save_result_metrics(result):
+    """Writes the per-path, node and partition metric CSVs of a SimulationResult."""
+    from src.visualization.visualizer import save_simulation_metrics, save_node_partition_metrics
+    save_simulation_metrics(result.ring, result.paths_tempcon, result.paths_spf,
+                            result.wc, result.wt, result.test_name)
+    save_node_partition_metrics(result.ring, result.partitions, result.test_name)
+
+def main(num_nodes, partition_size, wc, wt, sources, targets, test_scenario=None, test_name=None,
+         rng=None, render=True, interactive=True, save_csv=True, result_path=None, store=None,
+         instrument=False, profile_path=None, progress=None, log_file=None):
+    """Main simulation function with improved error handling and logging.
+    
+    With render=False and save_csv=False this is a compute-only run; pass
+    result_path to save the result and render it later with render_result.
+    Pass a ResultsStore directory as store to append the run's metrics to it.
+    rng (a np.random.Generator) seeds the topology for reproducible runs.
+    With instrument=True (or a profile_path for a cProfile dump), per-stage
+    timings, scoring call counters and peak memory are stored in
+    result.instrumentation and logged as JSON records. progress is called
+    with the name of each stage as it starts.
+    The results/ and docs/ directories and the results/simulation.log file
+    are only created when an output stage (render, save_csv, result_path or
+    store) is enabled; compute-only runs log to the console unless a
+    log_file is given.
+    Returns the SimulationResult.
+    """
+    if render or save_csv or result_path or store:
+        setup_directories()
+        setup_logging(log_file or 'results/simulation.log')
+    else:
+        setup_logging(log_file)
+    logging.info("Starting simulation with parameters: "
+                f"nodes={num_nodes}, partition_size={partition_size}, "
+                f"wc={wc}, wt={wt}")
+    
+    instrumentation = None
+    if instrument or profile_path:
+        instrumentation = Instrumentation(profile_path=profile_path)
+    
+    try:
+        with instrumentation or contextlib.nullcontext():
+            result = run_simulation(num_nodes, partition_size, wc, wt, sources, targets,
+                                    test_scenario, test_name, rng=rng, instrumentation=instrumentation,
+                                    progress=progress)
+            
+            if result_path:
+                with _stage(instrumentation, progress, 'save_result'):
+                    save_result(result, result_path)
+                logging.info(f"Saved simulation result to {result_path}")
+            
+            # Visualize results with test name if provided
+            if render:
+                with _stage(instrumentation, progress, 'render'):
+                    render_result(result, interactive)
+            
+            # Save metrics to CSV
+            if save_csv:
+                with _stage(instrumentation, progress, 'save_csv'):
+                    save_result_metrics(result)
+            
+            if store:
+                with _stage(instrumentation, progress, 'store'):
+                    run_id = ResultsStore(store).append_simulation(result)
+                logging.info(f"Stored run {run_id} in {store}")
         
-        # Visualize results with test name if provided
-        visualize_topology(ring, paths_tempcon, paths_spf, sources, 
-                         targets, partition_size)
-        visualize_metrics_comparison(ring, paths_tempcon, paths_spf, wc, wt, test_name)
-        create_interactive_visualization(ring, paths_tempcon, paths_spf, sources, targets)
-        
-        # Save metrics to CSV
-        save_simulation_metrics(ring, paths_tempcon, paths_spf, wc, wt, test_name)
-        save_node_partition_metrics(ring, partitions, test_name)
+        if instrumentation:
+            result.instrumentation = instrumentation.report()
+            instrumentation.log(num_nodes=num_nodes, partition_size=partition_size, wc=wc, wt=wt,
+                                test_name=test_name)
         
         logging.info("Simulation completed successfully")
+        return result
         
     except Exception as e:
         logging.error(f"Simulation failed: {str(e)}")
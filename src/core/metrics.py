@@ -1,39 +1,179 @@
 import numpy as np
+from src.core.instrumentation import counted
+from src.core.ring_state import ring_state
 
 def calculate_temperature(delta_lambda, alpha=1.86e-4, lambda_o=1550, T_o=25):
-    """Calculates the temperature from the resonant wavelength shift."""
-    if not isinstance(delta_lambda, (int, float)) or delta_lambda < 0:
-        raise ValueError("Invalid wavelength shift value")
+    """Calculates the temperature from the resonant wavelength shift.
+    
+    delta_lambda may be a scalar or an array of shifts, converted in one call.
+    """
+    if isinstance(delta_lambda, (int, float)):
+        if delta_lambda < 0:
+            raise ValueError("Invalid wavelength shift value")
+    else:
+        delta_lambda = np.asarray(delta_lambda)
+        if (delta_lambda.dtype.kind not in 'iuf' or not np.isfinite(delta_lambda).all()
+                or (delta_lambda < 0).any()):
+            raise ValueError("Invalid wavelength shift value")
     
     delta_T = delta_lambda / (lambda_o * alpha)
     return T_o + delta_T
 
+def check_weights(wc, wt):
+    """Validates the congestion/temperature weight pair."""
+    if not (0 <= wc <= 1 and 0 <= wt <= 1 and abs(wc + wt - 1) < 1e-6):
+        raise ValueError("Weights must be between 0 and 1 and sum to 1")
+
+@counted
 def calculate_congestion(graph, path):
     """Calculates the total congestion for a given path."""
     if len(path) < 2:
         return 0
         
+    state = ring_state(graph)
+    if state is not None:
+        return state.path_congestion(path)
+        
     congestion = 0
     for u, v in zip(path[:-1], path[1:]):
         if not graph.has_edge(u, v):
             raise ValueError(f"Invalid path: no edge between {u} and {v}")
-        congestion += graph[u][v]['utilization']
+        congestion += graph[u][v].get('utilization', 0.0)
     
     return congestion
 
+@counted
 def calculate_path_score(graph, path, wc, wt):
     """Calculates the weighted score for a given path."""
-    if not (0 <= wc <= 1 and 0 <= wt <= 1 and abs(wc + wt - 1) < 1e-6):
-        raise ValueError("Weights must be between 0 and 1 and sum to 1")
+    check_weights(wc, wt)
         
     congestion = calculate_congestion(graph, path)
-    temperature = sum(graph.nodes[node]['temperature'] for node in path)
     
-    # Normalize scores
-    avg_congestion = np.mean([graph[u][v]['utilization'] for u, v in graph.edges])
-    avg_temperature = np.mean([graph.nodes[n]['temperature'] for n in graph.nodes])
+    state = ring_state(graph)
+    if state is not None:
+        temperature = state.path_temperature(path)
+        # Normalize scores with the state's cached network-wide averages
+        avg_congestion, avg_temperature = state.normalization()
+    else:
+        temperature = sum(graph.nodes[node]['temperature'] for node in path)
+        # Normalize scores
+        avg_congestion = np.mean([graph[u][v].get('utilization', 0.0) for u, v in graph.edges])
+        avg_temperature = np.mean([graph.nodes[n]['temperature'] for n in graph.nodes])
     
     normalized_congestion = congestion / (len(path) * avg_congestion)
     normalized_temperature = temperature / (len(path) * avg_temperature)
     
     return wc * normalized_congestion + wt * normalized_temperature
+
+@counted
+def calculate_arc_scores(graph, source, targets, clockwise, wc, wt):
+    """Scores the ring arcs from source to every target in one direction.
+    
+    Equivalent to calling calculate_path_score on each arc's node list, but
+    answered in O(1) per target from the ring's prefix-sum arc index. The
+    source may also be an array matching targets element-wise.
+    """
+    check_weights(wc, wt)
+        
+    normalized_congestion, normalized_temperature = calculate_arc_terms(
+        graph, source, targets, clockwise)
+    
+    return wc * normalized_congestion + wt * normalized_temperature
+
+def calculate_arc_terms(graph, source, targets, clockwise):
+    """Returns the weight-independent (congestion, temperature) score terms of arcs.
+    
+    calculate_arc_scores combines them as wc * congestion + wt * temperature.
+    """
+    state = ring_state(graph)
+    if state is None:
+        raise ValueError("Arc scores require a ring topology")
+        
+    index = state.arc_index()
+    avg_congestion, avg_temperature = state.normalization()
+    source = np.asarray(source, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.intp)
+    length = index.hops(source, targets, clockwise) + 1
+    
+    normalized_congestion = (index.congestion(source, targets, clockwise) /
+                             (length * avg_congestion))
+    normalized_temperature = (index.temperature(source, targets, clockwise) /
+                              (length * avg_temperature))
+    
+    return normalized_congestion, normalized_temperature
+
+def grouped_sum(values, labels, num_groups):
+    """Sums values per integer label in one pass; labels outside 0..num_groups-1 are ignored."""
+    labels = np.asarray(labels)
+    valid = (labels >= 0) & (labels < num_groups)
+    return np.bincount(labels[valid], weights=np.asarray(values, dtype=np.float64)[valid],
+                       minlength=num_groups)
+
+def grouped_mean(values, labels, num_groups):
+    """Mean of values per integer label; empty groups give NaN."""
+    counts = grouped_sum(np.ones(len(labels)), labels, num_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return grouped_sum(values, labels, num_groups) / counts
+
+def grouped_max(values, labels, num_groups):
+    """Maximum of values per integer label; empty groups give NaN."""
+    labels = np.asarray(labels)
+    valid = np.flatnonzero((labels >= 0) & (labels < num_groups))
+    order = valid[np.argsort(labels[valid], kind='stable')]
+    sorted_labels = labels[order]
+    starts = np.searchsorted(sorted_labels, np.arange(num_groups))
+    nonempty = np.bincount(sorted_labels, minlength=num_groups) > 0
+    
+    result = np.full(num_groups, np.nan)
+    if nonempty.any():
+        result[nonempty] = np.maximum.reduceat(np.asarray(values, dtype=np.float64)[order],
+                                               starts[nonempty])
+    return result
+
+def node_edge_utilization(graph):
+    """Returns (sum of incident link utilization, degree) per node as arrays."""
+    state = ring_state(graph)
+    if state is not None:
+        # Node i touches clockwise links i and i - 1
+        return (state.cw_utilization + np.roll(state.cw_utilization, 1),
+                np.full(state.num_nodes, 2.0))
+    
+    edges = np.array([(u, v) for u, v in graph.edges], dtype=np.intp).reshape(-1, 2)
+    utilization = np.array([graph[u][v].get('utilization', 0.0) for u, v in graph.edges])
+    sums = np.zeros(len(graph))
+    np.add.at(sums, edges[:, 0], utilization)
+    np.add.at(sums, edges[:, 1], utilization)
+    degrees = np.bincount(edges.ravel(), minlength=len(graph)).astype(np.float64)
+    return sums, degrees
+
+def node_partition_metrics(graph, labels, num_partitions):
+    """Computes node and partition metrics with grouped reductions.
+    
+    labels holds the partition of each node (see partition_labels); returns
+    (node_columns, partition_columns) as dicts of arrays.
+    """
+    state = ring_state(graph)
+    if state is not None:
+        temperature = state.temperature
+    else:
+        temperature = np.array([graph.nodes[n]['temperature'] for n in range(len(graph))])
+    edge_sums, degrees = node_edge_utilization(graph)
+    
+    node_columns = {
+        'node_id': np.arange(len(temperature), dtype=np.int32),
+        'temperature': temperature.copy(),
+        'partition': np.asarray(labels, dtype=np.int32),
+        'avg_edge_congestion': edge_sums / degrees,
+    }
+    # Partition congestion averages every (node, neighbor) link entry, so
+    # it is weighted by node degree
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_congestion = (grouped_sum(edge_sums, labels, num_partitions) /
+                          grouped_sum(degrees, labels, num_partitions))
+    partition_columns = {
+        'partition_id': np.arange(num_partitions, dtype=np.int32),
+        'avg_temperature': grouped_mean(temperature, labels, num_partitions),
+        'max_temperature': grouped_max(temperature, labels, num_partitions),
+        'avg_congestion': avg_congestion,
+    }
+    return node_columns, partition_columns
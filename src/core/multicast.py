@@ -0,0 +1,120 @@
+import numpy as np
+from src.core.arcs import RingArc
+from src.core.metrics import check_weights
+from src.core.ring_state import ring_state
+
+
+class MulticastTree:
+    """Multicast tree of one source on a ring: a clockwise and a counter-clockwise branch.
+
+    The clockwise branch covers ``cw_reach`` hops from the source and the
+    counter-clockwise branch ``ccw_reach`` hops; either may be empty. Every
+    link and node of the tree is used (and scored) once, no matter how
+    many targets lie behind it.
+    """
+
+    __slots__ = ('source', 'num_nodes', 'cw_reach', 'ccw_reach', 'congestion', 'temperature',
+                 'score', 'targets')
+
+    def __init__(self, source, num_nodes, cw_reach, ccw_reach, congestion, temperature, score,
+                 targets):
+        self.source = int(source)
+        self.num_nodes = int(num_nodes)
+        self.cw_reach = int(cw_reach)
+        self.ccw_reach = int(ccw_reach)
+        self.congestion = float(congestion)
+        self.temperature = float(temperature)
+        self.score = float(score)
+        self.targets = targets
+
+    @property
+    def hops(self):
+        """Number of links in the tree."""
+        return self.cw_reach + self.ccw_reach
+
+    def branches(self):
+        """The non-empty branches as RingArcs."""
+        n = self.num_nodes
+        arcs = []
+        if self.cw_reach:
+            arcs.append(RingArc(self.source, (self.source + self.cw_reach) % n, True, n))
+        if self.ccw_reach:
+            arcs.append(RingArc(self.source, (self.source - self.ccw_reach) % n, False, n))
+        return arcs
+
+    def covers_clockwise(self, target):
+        """Whether the tree reaches target through its clockwise branch."""
+        return (target - self.source) % self.num_nodes <= self.cw_reach
+
+    def paths(self):
+        """Per-target RingArcs along the tree, like multicast_search returns them."""
+        return [RingArc(self.source, target, self.covers_clockwise(target), self.num_nodes)
+                for target in self.targets]
+
+    def links(self):
+        """Clockwise and counter-clockwise link indices of the tree (see RingState)."""
+        n = self.num_nodes
+        cw = (self.source + np.arange(self.cw_reach)) % n
+        ccw = (self.source - np.arange(self.ccw_reach)) % n
+        return cw, ccw
+
+    def __repr__(self):
+        return (f"MulticastTree(source={self.source}, cw_reach={self.cw_reach}, "
+                f"ccw_reach={self.ccw_reach}, score={self.score:.4f})")
+
+
+def plan_multicast_tree(graph, source, targets, wc, wt):
+    """Finds the cheapest tree reaching all targets from source.
+
+    Targets sorted by clockwise offset from the source can only be split
+    at one point: the nearer ones go clockwise, the rest counter-clockwise.
+    All T + 1 split points are scored at once from the ring's prefix-sums,
+    so planning costs O(T log T) for the sort. A tree is scored as
+
+        wc * (link utilization of the tree) / avg_utilization +
+        wt * (node temperature of the tree) / avg_temperature
+
+    i.e. the union of its links and nodes in units of network averages.
+    """
+    check_weights(wc, wt)
+    state = ring_state(graph)
+    if state is None:
+        raise ValueError("Multicast trees require a ring topology")
+
+    n = state.num_nodes
+    index = state.arc_index()
+    avg_congestion, avg_temperature = state.normalization()
+    targets = list(targets)
+
+    offsets = np.unique((np.asarray(targets, dtype=np.intp) - source) % n)
+    offsets = offsets[offsets > 0]
+    # Split j sends the first j offsets clockwise and the rest counter-clockwise
+    cw_reach = np.concatenate(([0], offsets))
+    ccw_reach = np.concatenate((n - offsets, [0]))
+
+    congestion = (index.congestion(source, source + cw_reach, True) +
+                  index.congestion(source, source - ccw_reach, False))
+    # Both branches include the source node, count it once
+    temperature = (index.temperature(source, source + cw_reach, True) +
+                   index.temperature(source, source - ccw_reach, False) -
+                   state.temperature[source])
+    scores = wc * congestion / avg_congestion + wt * temperature / avg_temperature
+
+    best = int(np.argmin(scores))
+    return MulticastTree(source, n, cw_reach[best], ccw_reach[best], congestion[best],
+                         temperature[best], scores[best], targets)
+
+
+def multicast_tree_search(graph, sources, targets, wc, wt):
+    """Plans a multicast tree per source.
+
+    Returns (paths_dict, trees): per-target RingArcs along each tree, in the
+    shape multicast_search returns, and the MulticastTree of each source.
+    """
+    paths_dict = {}
+    trees = {}
+    for source in sources:
+        tree = plan_multicast_tree(graph, source, targets, wc, wt)
+        trees[source] = tree
+        paths_dict[source] = tree.paths()
+    return paths_dict, trees
@@ -0,0 +1,141 @@
+"""Routing decisions of a multicast workload over the whole wc range at once.
+
+For a fixed ring state the congestion and temperature terms of both
+directions of every multicast group do not depend on the weights, and a
+group's score difference between the directions is linear in wc (with
+wt = 1 - wc). Each group therefore flips its direction at most once. A
+``DecisionCurve`` computes the terms once and answers decisions for any
+wc, the flip breakpoints, and the supported frontier of the workload's
+total (congestion, temperature) without rescanning any path.
+
+The supported frontier holds the non-dominated totals that some weighting
+selects. The full Pareto set can contain further totals that no single wc
+selects (mixed choices inside the convex hull); enumerating it is a
+bi-objective subset-sum problem, exponential in the number of groups in
+general, so it is not computed here.
+"""
+import numpy as np
+
+from src.core.metrics import calculate_arc_terms
+from src.core.routing import _expand_groups
+
+
+class DecisionCurve:
+    """Per-group direction terms of a CSR multicast workload, see decision_curve.
+
+    Group g's score in a direction is ``wc * congestion + (1 - wc) *
+    temperature`` with the summed normalized terms of its targets, the
+    quantity batch_multicast_search compares. ``breakpoints[g]`` is the wc
+    in (0, 1) where the group's chosen direction flips, NaN if it never
+    does; at the breakpoint itself both directions tie up to rounding, and
+    an exact tie goes to clockwise.
+    """
+
+    def __init__(self, sources, cw_congestion, cw_temperature, ccw_congestion, ccw_temperature):
+        self.sources = sources
+        self.cw_congestion = cw_congestion
+        self.cw_temperature = cw_temperature
+        self.ccw_congestion = ccw_congestion
+        self.ccw_temperature = ccw_temperature
+
+        # Clockwise minus counter-clockwise score is offset + slope * wc
+        self._offset = cw_temperature - ccw_temperature
+        self._slope = (cw_congestion - ccw_congestion) - self._offset
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = -self._offset / self._slope
+        self.breakpoints = np.where((crossing > 0) & (crossing < 1), crossing, np.nan)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def _check(self, wc):
+        if not 0 <= wc <= 1:
+            raise ValueError("Weights must be between 0 and 1 and sum to 1")
+
+    def clockwise(self, wc):
+        """Chosen direction of every group at wc (wt = 1 - wc)."""
+        self._check(wc)
+        clock = wc * self.cw_congestion + (1 - wc) * self.cw_temperature
+        counter = wc * self.ccw_congestion + (1 - wc) * self.ccw_temperature
+        return clock <= counter
+
+    def costs(self, wc):
+        """Score of every group in its chosen direction at wc."""
+        clockwise = self.clockwise(wc)
+        congestion = np.where(clockwise, self.cw_congestion, self.ccw_congestion)
+        temperature = np.where(clockwise, self.cw_temperature, self.ccw_temperature)
+        return wc * congestion + (1 - wc) * temperature
+
+    def totals(self, wc):
+        """Workload (congestion, temperature) totals of the decisions at wc."""
+        clockwise = self.clockwise(wc)
+        return (float(np.where(clockwise, self.cw_congestion, self.ccw_congestion).sum()),
+                float(np.where(clockwise, self.cw_temperature, self.ccw_temperature).sum()))
+
+    def supported_frontier(self):
+        """Non-dominated workload totals selected by some wc, as a dict of arrays.
+
+        The breakpoints split [0, 1] into intervals of constant decisions;
+        each row describes one interval: ``wc_low``/``wc_high``, the total
+        ``congestion`` and ``temperature`` and the number of clockwise
+        groups. Rows are sorted by wc, so congestion falls and temperature
+        rises from row to row; intervals whose totals are dominated or
+        repeated are dropped. Non-dominated totals that no weighting
+        selects (points inside the convex hull) are not included, so this
+        is a subset of the full Pareto set.
+        """
+        flipping = np.flatnonzero(~np.isnan(self.breakpoints))
+        flipping = flipping[np.argsort(self.breakpoints[flipping], kind='stable')]
+        edges, starts = np.unique(self.breakpoints[flipping], return_index=True)
+        wc_low = np.concatenate(([0.0], edges))
+        wc_high = np.concatenate((edges, [1.0]))
+
+        # Decisions inside the first interval, then one flip per breakpoint
+        first = self.clockwise(wc_high[0] / 2)
+        congestion = np.where(first, self.cw_congestion, self.ccw_congestion)
+        temperature = np.where(first, self.cw_temperature, self.ccw_temperature)
+        flip_congestion = np.where(first, self.ccw_congestion, self.cw_congestion) - congestion
+        flip_temperature = np.where(first, self.ccw_temperature, self.cw_temperature) - temperature
+        flip_clockwise = np.where(first, -1, 1)
+
+        def running(initial, deltas):
+            steps = np.add.reduceat(deltas[flipping], starts) if len(flipping) else np.zeros(0)
+            return initial + np.concatenate(([0], np.cumsum(steps)))
+
+        rows = {
+            'wc_low': wc_low,
+            'wc_high': wc_high,
+            'congestion': running(congestion.sum(), flip_congestion),
+            'temperature': running(temperature.sum(), flip_temperature),
+            'clockwise': running(int(first.sum()), flip_clockwise).astype(np.intp),
+        }
+
+        # Keep the rows not dominated by a row with lower (or equal) totals
+        order = np.lexsort((rows['temperature'], rows['congestion']))
+        best = np.minimum.accumulate(rows['temperature'][order])
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = rows['temperature'][order][1:] < best[:-1]
+        keep = np.sort(order[keep])
+        return {name: column[keep] for name, column in rows.items()}
+
+
+def decision_curve(graph, sources, target_indptr, target_indices):
+    """Computes the weight-independent direction terms of a CSR multicast workload.
+
+    Takes the same CSR groups as batch_multicast_search; every arc is
+    scored once per direction, after which decisions for any wc cost O(G)
+    for G groups and the supported frontier O(G log G).
+    """
+    sources, group_ids, pair_sources, targets = _expand_groups(
+        sources, target_indptr, target_indices)
+    terms = []
+    for clockwise in (True, False):
+        congestion, temperature = calculate_arc_terms(graph, pair_sources, targets, clockwise)
+        terms.append(np.bincount(group_ids, congestion, minlength=len(sources)))
+        terms.append(np.bincount(group_ids, temperature, minlength=len(sources)))
+    return DecisionCurve(sources, *terms)
+
+
+def supported_frontier(graph, sources, target_indptr, target_indices):
+    """Totals of a workload selected by some wc; see DecisionCurve.supported_frontier."""
+    return decision_curve(graph, sources, target_indptr, target_indices).supported_frontier()
@@ -0,0 +1,248 @@
+"""Columnar on-disk store for per-run path, node and partition metrics.
+
+Layout::
+
+    <root>/num_nodes=<n>/wc=<wc>/run_id=<id>/
+        params.json
+        paths/<column>.npy
+        nodes/<column>.npy
+        partitions/<column>.npy
+
+Every column is a typed ``.npy`` array, so reads can be memory-mapped.
+Variable-length values such as path node lists are stored as a pair of
+columns ``<name>_offsets`` (one entry per row plus one) and
+``<name>_nodes``; row ``i`` is ``nodes[offsets[i]:offsets[i + 1]]``.
+Each run is written to a temporary directory and renamed into place, so
+concurrent writers (e.g. sweep workers) never see half-written runs.
+"""
+import glob
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from src.core.arcs import RingArc
+from src.core.metrics import node_partition_metrics
+from src.core.ring_state import ring_state
+from src.core.topology import partition_labels
+
+ALGORITHMS = ('tempcon', 'spf')
+PARTITION_KEYS = ('num_nodes', 'wc')
+
+
+def _ragged(sequences, dtype=np.int32):
+    """Packs a list of node sequences into ``(offsets, nodes)`` arrays."""
+    lengths = np.fromiter((len(seq) for seq in sequences), dtype=np.int64, count=len(sequences))
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if not sequences:
+        return offsets, np.zeros(0, dtype=dtype)
+    return offsets, np.concatenate([np.asarray(seq, dtype=dtype) for seq in sequences])
+
+
+def _arc_nodes(sources, clockwise, lengths, num_nodes):
+    """Node arrays of many ring arcs at once, as ``(offsets, nodes)``."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    step = np.where(clockwise, 1, -1)
+    position = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+    nodes = (np.repeat(sources, lengths) + np.repeat(step, lengths) * position) % num_nodes
+    return offsets, nodes.astype(np.int32)
+
+
+def _segment_reduce(ufunc, values, offsets):
+    """Applies ``ufunc.reduceat`` per segment; empty segments give NaN."""
+    result = np.full(len(offsets) - 1, np.nan)
+    nonempty = offsets[1:] > offsets[:-1]
+    if nonempty.any():
+        result[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return result
+
+
+def path_table(graph, paths_by_algorithm, wc, wt):
+    """Builds the typed path metric columns of one run.
+
+    ``paths_by_algorithm`` maps an algorithm name from ``ALGORITHMS`` to a
+    ``{source: [path, ...]}`` dict as returned by the routing functions.
+    The metrics match those written by ``save_simulation_metrics``.
+    """
+    state = ring_state(graph)
+    if state is None:
+        raise ValueError("The results store needs a ring topology")
+    n = state.num_nodes
+
+    algorithm, sources, paths = [], [], []
+    for name, paths_dict in paths_by_algorithm.items():
+        code = ALGORITHMS.index(name)
+        for source, source_paths in paths_dict.items():
+            for path in source_paths:
+                algorithm.append(code)
+                sources.append(source)
+                paths.append(path)
+
+    sources = np.array(sources, dtype=np.int32)
+    if all(isinstance(path, RingArc) and path.num_nodes == n for path in paths):
+        clockwise = np.array([path.clockwise for path in paths], dtype=bool)
+        lengths = np.array([len(path) for path in paths], dtype=np.int64)
+        offsets, nodes = _arc_nodes(sources, clockwise, lengths, n)
+    else:
+        offsets, nodes = _ragged(paths)
+        lengths = np.diff(offsets)
+        clockwise = np.array([len(path) < 2 or (path[1] - path[0]) % n == 1 for path in paths],
+                             dtype=bool)
+
+    # Per-hop link utilization; graph edges are undirected, so a hop
+    # u -> v reads clockwise link u if v == u + 1 and link v otherwise
+    hop_mask = np.ones(len(nodes), dtype=bool)
+    hop_mask[offsets[1:] - 1] = False
+    u = nodes[hop_mask]
+    v = nodes[np.flatnonzero(hop_mask) + 1]
+    links = np.where((v - u) % n == 1, u, v)
+    hop_utilization = state.cw_utilization[links]
+    hop_offsets = offsets - np.arange(len(offsets))
+
+    node_temperature = state.temperature[nodes]
+    avg_temperature = np.add.reduceat(node_temperature, offsets[:-1]) / lengths if len(paths) else np.zeros(0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_congestion = _segment_reduce(np.add, hop_utilization, hop_offsets) / (lengths - 1)
+
+    return {
+        'algorithm': np.array(algorithm, dtype=np.uint8),
+        'source': sources,
+        'target': nodes[offsets[1:] - 1] if len(paths) else np.zeros(0, dtype=np.int32),
+        'clockwise': clockwise,
+        'length': lengths.astype(np.int32),
+        'avg_temperature': avg_temperature,
+        'max_temperature': _segment_reduce(np.maximum, node_temperature, offsets),
+        'avg_congestion': avg_congestion,
+        'max_congestion': _segment_reduce(np.maximum, hop_utilization, hop_offsets),
+        'weighted_score': wc * avg_congestion + wt * avg_temperature,
+        'path_offsets': offsets,
+        'path_nodes': nodes,
+    }
+
+
+def node_table(graph, partitions):
+    """Builds the node and partition metric columns of one run."""
+    if ring_state(graph) is None:
+        raise ValueError("The results store needs a ring topology")
+
+    labels = partition_labels(partitions, len(graph))
+    nodes, partition_columns = node_partition_metrics(graph, labels, len(partitions))
+    member_offsets, members = _ragged(partitions)
+    partition_columns['member_offsets'] = member_offsets
+    partition_columns['member_nodes'] = members
+    return nodes, partition_columns
+
+
+class ResultsStore:
+    """Directory of runs partitioned by ``PARTITION_KEYS`` and run id."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def run_directory(self, run_id, params):
+        parts = [f'{key}={params.get(key)}' for key in PARTITION_KEYS]
+        return os.path.join(self.root, *parts, f'run_id={run_id}')
+
+    def append_run(self, run_id, params, tables):
+        """Writes one run's tables (``{table: {column: array}}``) atomically.
+
+        Returns ``False`` without writing if the run is already stored.
+        """
+        directory = self.run_directory(run_id, params)
+        if os.path.isdir(directory):
+            return False
+        parent = os.path.dirname(directory)
+        os.makedirs(parent, exist_ok=True)
+        tmp = os.path.join(parent, f'.tmp-{run_id}-{uuid.uuid4().hex}')
+        os.makedirs(tmp)
+        try:
+            with open(os.path.join(tmp, 'params.json'), 'w') as f:
+                json.dump(dict(params, run_id=run_id), f)
+            for table, columns in tables.items():
+                os.makedirs(os.path.join(tmp, table))
+                for column, values in columns.items():
+                    np.save(os.path.join(tmp, table, f'{column}.npy'), np.asarray(values))
+            os.rename(tmp, directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if os.path.isdir(directory):
+                return False
+            raise
+        return True
+
+    def append_simulation(self, result, run_id=None, **extra_params):
+        """Stores the path, node and partition metrics of a SimulationResult."""
+        params = {
+            'num_nodes': result.num_nodes, 'partition_size': result.partition_size,
+            'wc': result.wc, 'wt': result.wt, 'sources': list(result.sources),
+            'targets': list(result.targets), 'test_name': result.test_name,
+        }
+        params.update(extra_params)
+        if run_id is None:
+            run_id = uuid.uuid4().hex[:16]
+        paths = path_table(result.ring, {'tempcon': result.paths_tempcon, 'spf': result.paths_spf},
+                           result.wc, result.wt)
+        nodes, partitions = node_table(result.ring, result.partitions)
+        self.append_run(run_id, params, {'paths': paths, 'nodes': nodes, 'partitions': partitions})
+        return run_id
+
+    def _directories(self):
+        pattern = os.path.join(self.root, *['*'] * len(PARTITION_KEYS), 'run_id=*')
+        return sorted(glob.glob(pattern))
+
+    def runs(self, **filters):
+        """Returns ``{run_id: params}`` of stored runs matching ``filters``."""
+        runs = {}
+        for directory in self._directories():
+            with open(os.path.join(directory, 'params.json')) as f:
+                params = json.load(f)
+            if all(params.get(key) == value for key, value in filters.items()):
+                runs[params['run_id']] = params
+        return runs
+
+    def read_run(self, run_id, table, mmap=True):
+        """Returns one run's table as ``{column: array}``, memory-mapped by default."""
+        matches = glob.glob(os.path.join(self.root, *['*'] * len(PARTITION_KEYS),
+                                         f'run_id={run_id}'))
+        if not matches:
+            raise KeyError(f"Run {run_id} is not stored")
+        columns = sorted(glob.glob(os.path.join(matches[0], table, '*.npy')))
+        return {os.path.basename(path)[:-4]: np.load(path, mmap_mode='r' if mmap else None)
+                for path in columns}
+
+    def read_table(self, table, mmap=True, **filters):
+        """Concatenates ``table`` over all runs matching ``filters``.
+
+        Adds a ``run_id`` column and rebases ``*_offsets`` columns so ragged
+        values stay addressable in the concatenated arrays.
+        """
+        loaded = [(run_id, self.read_run(run_id, table, mmap)) for run_id in self.runs(**filters)]
+        if not loaded:
+            return {}
+
+        combined = {}
+        for column in loaded[0][1]:
+            if column.endswith('_offsets'):
+                shifted, base = [np.zeros(1, dtype=np.int64)], 0
+                for _, data in loaded:
+                    shifted.append(data[column][1:] + base)
+                    base += int(data[column][-1])
+                combined[column] = np.concatenate(shifted)
+            else:
+                combined[column] = np.concatenate([data[column] for _, data in loaded])
+
+        rows = [len(_row_column(data)) for _, data in loaded]
+        combined['run_id'] = np.repeat([run_id for run_id, _ in loaded], rows)
+        return combined
+
+
+def _row_column(columns):
+    """Any column with one entry per row."""
+    for name, values in columns.items():
+        if not name.endswith(('_offsets', '_nodes')):
+            return values
+    raise ValueError("Table has no per-row column")
@@ -0,0 +1,173 @@
+"""NetworkX ring graph that records direct edits for its bound RingState.
+
+``RingState.to_graph`` builds a ``RingGraph``. Its node and edge attribute
+dicts come from NetworkX's ``node_attr_dict_factory`` and
+``edge_attr_dict_factory`` hooks and log writes of the ring attributes
+(``temperature``, ``congestion``, ``utilization``). Its structural
+mutators log that links or nodes changed. ``ring_state`` applies the log
+before the state is used, so direct edits such as
+``graph.nodes[i]['temperature'] = t`` or a chord added with ``add_edge``
+are never silently ignored by the array-backed scorers.
+"""
+import networkx as nx
+
+NODE_KEYS = frozenset(('temperature', 'congestion'))
+LINK_KEYS = frozenset(('utilization',))
+
+
+class RingChanges:
+    """Edits of a RingGraph not yet applied to its RingState.
+
+    ``nodes`` and ``links`` map ``id(attribute_dict)`` to the edited dicts;
+    ``structure`` is set once a link or node was added or removed.
+    """
+
+    __slots__ = ('nodes', 'links', 'structure')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.nodes = {}
+        self.links = {}
+        self.structure = False
+
+    def __bool__(self):
+        return self.structure or bool(self.nodes) or bool(self.links)
+
+
+class _TrackedAttributes(dict):
+    """Attribute dict that logs writes of ring attributes to a RingChanges."""
+
+    __slots__ = ('_changes',)
+
+    KEYS = frozenset()
+
+    def __init__(self, changes, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._changes = changes
+
+    def _log(self):
+        raise NotImplementedError
+
+    def _touched(self, keys):
+        if not self.KEYS.isdisjoint(keys):
+            self._log()[id(self)] = self
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._touched((key,))
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._touched((key,))
+
+    def update(self, *args, **kwargs):
+        values = dict(*args, **kwargs)
+        dict.update(self, values)
+        self._touched(values)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *default):
+        self._touched((key,))
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._touched((key,))
+        return key, value
+
+    def clear(self):
+        self._touched(tuple(self))
+        dict.clear(self)
+
+    def __reduce__(self):
+        return type(self), (self._changes, dict(self))
+
+
+class _NodeAttributes(_TrackedAttributes):
+    __slots__ = ()
+    KEYS = NODE_KEYS
+
+    def _log(self):
+        return self._changes.nodes
+
+
+class _LinkAttributes(_TrackedAttributes):
+    __slots__ = ()
+    KEYS = LINK_KEYS
+
+    def _log(self):
+        return self._changes.links
+
+
+class RingGraph(nx.Graph):
+    """``nx.Graph`` whose attribute and structure edits are recorded in ``ring_changes``.
+
+    It behaves like any undirected NetworkX graph; see the module docstring.
+    """
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.ring_changes = RingChanges()
+        super().__init__(incoming_graph_data, **attr)
+
+    def node_attr_dict_factory(self):
+        return _NodeAttributes(self.ring_changes)
+
+    def edge_attr_dict_factory(self):
+        return _LinkAttributes(self.ring_changes)
+
+    def _structure_changed(self):
+        self.ring_changes.structure = True
+
+    def add_node(self, node_for_adding, **attr):
+        if node_for_adding not in self:
+            self._structure_changed()
+        super().add_node(node_for_adding, **attr)
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        count = len(self)
+        super().add_nodes_from(nodes_for_adding, **attr)
+        if len(self) != count:
+            self._structure_changed()
+
+    def remove_node(self, n):
+        super().remove_node(n)
+        self._structure_changed()
+
+    def remove_nodes_from(self, nodes):
+        super().remove_nodes_from(nodes)
+        self._structure_changed()
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        if not self.has_edge(u_of_edge, v_of_edge):
+            self._structure_changed()
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        super().add_edges_from(ebunch_to_add, **attr)
+        self._structure_changed()
+
+    def remove_edge(self, u, v):
+        super().remove_edge(u, v)
+        self._structure_changed()
+
+    def remove_edges_from(self, ebunch):
+        super().remove_edges_from(ebunch)
+        self._structure_changed()
+
+    def clear(self):
+        super().clear()
+        self._structure_changed()
+
+    def clear_edges(self):
+        super().clear_edges()
+        self._structure_changed()
@@ -0,0 +1,383 @@
+import itertools
+
+import numpy as np
+from src.core.arcs import RingArc, RingArcIndex
+
+# Process-unique ids of RingState instances, see RingState.token
+_tokens = itertools.count()
+
+
+class RingState:
+    """Array-backed node and link state of a ring topology.
+
+    Node ``i`` is joined to ``(i + 1) % n`` by clockwise link ``i``.  The
+    arrays are indexed by node id:
+
+    - ``temperature[i]`` / ``congestion[i]``: state of node ``i``
+    - ``cw_utilization[i]``: utilization of the link ``i -> i + 1``
+    - ``ccw_utilization[i]``: utilization of the link ``i -> i - 1``
+
+    A state can be bound to a NetworkX graph so that every write through the
+    setters below is mirrored into the graph's attribute dicts, which keeps
+    the NetworkX based API and the visualizer working unchanged. Graphs
+    built by ``to_graph`` are ``RingGraph``s, which record direct edits of
+    their attributes and structure; ``ring_state`` applies them before the
+    state is used, and unbinds the state once a chord or extra node makes
+    the graph more than a ring. Direct edits of any other bound graph must
+    be followed by ``refresh_ring_state``.
+
+    ``version`` increases on every write so derived structures such as the
+    arc index and the normalization cache can tell when they are stale.
+    Code that edits the arrays directly must call ``mark_changed()``
+    afterwards. Together with ``token``, which is unique per instance, it
+    identifies a snapshot of the state for caches.
+    """
+
+    __slots__ = ('num_nodes', 'temperature', 'congestion',
+                 'cw_utilization', 'ccw_utilization', 'graph',
+                 'version', 'token', '_arc_index', '_normalization')
+
+    def __init__(self, num_nodes, temperature=None, congestion=None,
+                 cw_utilization=None, ccw_utilization=None):
+        if num_nodes < 3:
+            raise ValueError("A ring needs at least 3 nodes")
+
+        self.num_nodes = num_nodes
+        self.temperature = self._as_array(temperature)
+        self.congestion = self._as_array(congestion)
+        self.cw_utilization = self._as_array(cw_utilization)
+        if ccw_utilization is None:
+            # Symmetric links: i -> i-1 is the same link as (i-1) -> i
+            ccw_utilization = np.roll(self.cw_utilization, 1)
+        self.ccw_utilization = self._as_array(ccw_utilization)
+        self.graph = None
+        self.version = 0
+        self.token = next(_tokens)
+        self._arc_index = None
+        self._normalization = None
+
+    def __getstate__(self):
+        # Copies are detached from the graph and get their own token, since
+        # they change independently of this instance
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state['graph'] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.token = next(_tokens)
+
+    def _as_array(self, values):
+        if values is None:
+            return np.zeros(self.num_nodes)
+        array = np.array(values, dtype=np.float64)
+        if array.shape != (self.num_nodes,):
+            raise ValueError(f"Expected {self.num_nodes} values, got shape {array.shape}")
+        return array
+
+    def __len__(self):
+        return self.num_nodes
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Builds a state from a ring graph labelled ``0..n-1``."""
+        n = len(graph)
+        if not is_ring_graph(graph):
+            raise ValueError("Graph is not a ring labelled 0..n-1")
+
+        nodes = graph.nodes
+        temperature = [nodes[i]['temperature'] for i in range(n)]
+        congestion = [nodes[i].get('congestion', 0.0) for i in range(n)]
+        cw = [graph[i][(i + 1) % n].get('utilization', 0.0) for i in range(n)]
+        ccw = [graph[i][(i - 1) % n].get('utilization', 0.0) for i in range(n)]
+        return cls(n, temperature, congestion, cw, ccw)
+
+    def to_graph(self):
+        """Builds a bound ``RingGraph`` cycle carrying this state's attributes."""
+        import networkx as nx
+        from src.core.ring_graph import RingGraph
+        graph = nx.cycle_graph(self.num_nodes, create_using=RingGraph)
+        self.bind(graph)
+        self.push_to_graph()
+        return graph
+
+    def bind(self, graph):
+        """Attaches this state to ``graph`` and mirrors future writes into it."""
+        if len(graph) != self.num_nodes or not is_ring_graph(graph):
+            raise ValueError(f"Graph is not a ring labelled 0..{self.num_nodes - 1}")
+        self.unbind()
+        graph.graph['ring_state'] = self
+        self.graph = graph
+        changes = getattr(graph, 'ring_changes', None)
+        if changes is not None:
+            changes.clear()
+        return self
+
+    def unbind(self):
+        """Detaches this state from its graph, which keeps its current attribute values."""
+        if self.graph is not None and self.graph.graph.get('ring_state') is self:
+            del self.graph.graph['ring_state']
+        self.graph = None
+
+    def apply_graph_changes(self):
+        """Applies the edits a bound RingGraph recorded since the last call.
+
+        Edited nodes and links are read back through the setters. After a
+        structural change the whole state is reloaded if the graph is still
+        a ring, and otherwise unbound. Returns whether the state is still
+        bound.
+        """
+        graph = self.graph
+        changes = graph.ring_changes
+        if not changes:
+            return True
+        n = self.num_nodes
+        if changes.structure:
+            changes.clear()
+            if len(graph) != n or not is_ring_graph(graph):
+                self.unbind()
+                return False
+            fresh = RingState.from_graph(graph)
+            self.temperature[:] = fresh.temperature
+            self.congestion[:] = fresh.congestion
+            self.cw_utilization[:] = fresh.cw_utilization
+            self.ccw_utilization[:] = fresh.ccw_utilization
+            self.mark_changed()
+            return True
+
+        if changes.nodes:
+            edited = [node for node, attributes in graph.nodes(data=True)
+                      if id(attributes) in changes.nodes]
+            nodes = graph.nodes
+            self.set_temperature(edited, [nodes[i]['temperature'] for i in edited])
+            self.set_congestion(edited, [nodes[i].get('congestion', 0.0) for i in edited])
+        if changes.links:
+            edited = []
+            for u, v, attributes in graph.edges(data=True):
+                if id(attributes) in changes.links:
+                    edited.append(u if (v - u) % n == 1 else v)
+            self.set_utilization(edited, [graph[u][(u + 1) % n].get('utilization', 0.0)
+                                          for u in edited])
+        changes.clear()
+        return True
+
+    def push_to_graph(self):
+        """Copies all arrays into the bound graph's attribute dicts."""
+        if self.graph is None:
+            return
+        nodes = self.graph.nodes
+        for node, temp, cong in zip(range(self.num_nodes), self.temperature.tolist(),
+                                    self.congestion.tolist()):
+            _store(nodes[node], 'temperature', temp)
+            _store(nodes[node], 'congestion', cong)
+        for u, util in enumerate(self.cw_utilization.tolist()):
+            _store(self.graph[u][(u + 1) % self.num_nodes], 'utilization', util)
+
+    def set_temperature(self, nodes, values):
+        """Sets the temperature of one node or an array of nodes."""
+        self._set_node_values(self.temperature, 'temperature', nodes, values)
+
+    def set_congestion(self, nodes, values):
+        """Sets the congestion of one node or an array of nodes."""
+        self._set_node_values(self.congestion, 'congestion', nodes, values)
+
+    def _set_node_values(self, array, key, nodes, values):
+        nodes = np.atleast_1d(np.asarray(nodes, dtype=np.intp))
+        touched = np.unique(nodes)
+        before = array[touched].sum()
+        array[nodes] = values
+        delta = array[touched].sum() - before
+        self._record_change(temperature_delta=delta if array is self.temperature else 0.0)
+        if self.graph is not None:
+            graph_nodes = self.graph.nodes
+            for node, value in zip(nodes.tolist(), array[nodes].tolist()):
+                _store(graph_nodes[node], key, value)
+
+    def set_utilization(self, links, values):
+        """Sets the utilization of clockwise link(s) ``i -> i + 1``.
+
+        Graph edges are undirected, so the matching counter-clockwise entry
+        ``i + 1 -> i`` is updated to the same value.
+        """
+        links = np.atleast_1d(np.asarray(links, dtype=np.intp))
+        touched = np.unique(links)
+        reverse = (touched + 1) % self.num_nodes
+        before = self.cw_utilization[touched].sum() + self.ccw_utilization[reverse].sum()
+        self.cw_utilization[links] = values
+        self.ccw_utilization[(links + 1) % self.num_nodes] = self.cw_utilization[links]
+        after = self.cw_utilization[touched].sum() + self.ccw_utilization[reverse].sum()
+        self._record_change(utilization_delta=after - before)
+        if self.graph is not None:
+            for u, util in zip(links.tolist(), self.cw_utilization[links].tolist()):
+                _store(self.graph[u][(u + 1) % self.num_nodes], 'utilization', util)
+
+    def mark_changed(self):
+        """Records a change of the arrays, invalidating derived indexes."""
+        self.version += 1
+
+    def _record_change(self, utilization_delta=0.0, temperature_delta=0.0):
+        """Bumps the version, carrying a still-valid normalization cache along."""
+        cache = self._normalization
+        if cache is not None and cache.version == self.version:
+            cache.adjust(utilization_delta, temperature_delta)
+        self.version += 1
+
+    def normalization(self):
+        """Returns ``(avg_utilization, avg_temperature)`` for score normalization.
+
+        The underlying sums are cached per state version and adjusted by the
+        setters, so repeated scoring does not rescan the whole ring.
+        """
+        cache = self._normalization
+        if cache is None or cache.version != self.version:
+            cache = self._normalization = NormalizationCache(self)
+        return (cache.utilization_sum / (2 * self.num_nodes),
+                cache.temperature_sum / self.num_nodes)
+
+    def arc_index(self):
+        """Returns the prefix-sum arc index, rebuilding it if the state changed."""
+        if self._arc_index is None or self._arc_index.version != self.version:
+            self._arc_index = RingArcIndex(self, self.version)
+        return self._arc_index
+
+    def arc(self, source, target, clockwise):
+        """Returns the lazy ``RingArc`` from ``source`` to ``target``."""
+        return RingArc(source, target, clockwise, self.num_nodes)
+
+    def link_index(self, u, v):
+        """Returns ``(link, clockwise)`` for the ring link between ``u`` and ``v``."""
+        step = (v - u) % self.num_nodes
+        if step == 1:
+            return u, True
+        if step == self.num_nodes - 1:
+            return u, False
+        raise ValueError(f"Invalid path: no edge between {u} and {v}")
+
+    def link_utilization(self, u, v):
+        """Returns the utilization of the directed link ``u -> v``."""
+        link, clockwise = self.link_index(u, v)
+        return self.cw_utilization[link] if clockwise else self.ccw_utilization[link]
+
+    def path_congestion(self, path):
+        """Sums link utilization along ``path`` with vectorized lookups."""
+        if self._is_own_arc(path):
+            return self.arc_index().congestion(path.source, path.target, path.clockwise)
+
+        nodes = self.path_array(path)
+        if len(nodes) < 2:
+            return 0.0
+
+        u, v = nodes[:-1], nodes[1:]
+        steps = (v - u) % self.num_nodes
+        clockwise = steps == 1
+        counter_clockwise = steps == self.num_nodes - 1
+        invalid = ~(clockwise | counter_clockwise)
+        if invalid.any():
+            i = int(np.argmax(invalid))
+            raise ValueError(f"Invalid path: no edge between {u[i]} and {v[i]}")
+
+        return float(self.cw_utilization[u[clockwise]].sum() +
+                     self.ccw_utilization[u[counter_clockwise]].sum())
+
+    def path_temperature(self, path):
+        """Sums node temperature along ``path``."""
+        if self._is_own_arc(path):
+            return self.arc_index().temperature(path.source, path.target, path.clockwise)
+        return float(self.temperature[self.path_array(path)].sum())
+
+    def _is_own_arc(self, path):
+        return isinstance(path, RingArc) and path.num_nodes == self.num_nodes
+
+    def path_array(self, path):
+        """Converts a node sequence into a validated index array."""
+        nodes = np.asarray(path, dtype=np.intp)
+        if len(nodes) and (nodes.min() < 0 or nodes.max() >= self.num_nodes):
+            raise ValueError("Invalid path: node outside the ring")
+        return nodes
+
+    def mean_utilization(self):
+        """Network-wide average link utilization."""
+        return self.normalization()[0]
+
+    def mean_temperature(self):
+        """Network-wide average node temperature."""
+        return self.normalization()[1]
+
+
+class NormalizationCache:
+    """Running sums behind the network-wide averages of a ``RingState``.
+
+    Incremental adjustments accumulate rounding error, so the cache gives
+    itself up after ``MAX_ADJUSTMENTS`` of them and is rebuilt from the
+    arrays on the next lookup.
+    """
+
+    MAX_ADJUSTMENTS = 4096
+
+    __slots__ = ('version', 'utilization_sum', 'temperature_sum', 'adjustments')
+
+    def __init__(self, state):
+        self.version = state.version
+        self.utilization_sum = state.cw_utilization.sum() + state.ccw_utilization.sum()
+        self.temperature_sum = state.temperature.sum()
+        self.adjustments = 0
+
+    def adjust(self, utilization_delta, temperature_delta):
+        self.utilization_sum += utilization_delta
+        self.temperature_sum += temperature_delta
+        self.adjustments += 1
+        # Follow the state to its next version unless a resync is due
+        self.version = self.version + 1 if self.adjustments < self.MAX_ADJUSTMENTS else -1
+
+
+def _store(attributes, key, value):
+    """Mirrors a state write into a graph attribute dict.
+
+    ``dict.__setitem__`` skips a RingGraph's edit log, which only records
+    edits that did not come from the state.
+    """
+    dict.__setitem__(attributes, key, value)
+
+
+def is_ring_graph(graph):
+    """Checks that ``graph`` is a simple cycle over the nodes ``0..n-1``."""
+    n = len(graph)
+    if n < 3 or graph.number_of_edges() != n:
+        return False
+    return all(graph.has_edge(i, (i + 1) % n) for i in range(n))
+
+
+def ring_state(graph):
+    """Returns the array state of ``graph``, or ``None`` if it is not a plain ring.
+
+    The state is built from the graph's attributes on first use and bound
+    to it. For a RingGraph, pending direct edits are applied first; once a
+    chord, express link or extra node is added the state is dropped and
+    callers fall back to the graph's own neighbors and attributes. Direct
+    edits of other graphs need ``refresh_ring_state``.
+    """
+    if isinstance(graph, RingState):
+        return graph
+
+    state = graph.graph.get('ring_state')
+    if state is not None and state.graph is not graph:
+        # Carried over from another graph, e.g. by graph.copy()
+        state = None
+    changes = getattr(graph, 'ring_changes', None)
+    if state is not None and changes and not state.apply_graph_changes():
+        state = None
+    if state is None and is_ring_graph(graph):
+        state = RingState.from_graph(graph).bind(graph)
+    elif state is None and changes:
+        changes.clear()
+    return state
+
+
+def refresh_ring_state(graph):
+    """Rebuilds the attached state from the graph's attribute values."""
+    state = graph.graph.get('ring_state')
+    if state is not None and state.graph is graph:
+        state.unbind()
+    graph.graph.pop('ring_state', None)
+    return ring_state(graph)
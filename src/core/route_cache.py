@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+from src.core.arcs import RingArc
+from src.core.metrics import calculate_arc_scores, check_weights
+from src.core.ring_state import ring_state
+from src.core.routing import find_best_path
+
+
+class RouteCache:
+    """Bounded LRU cache of routing decisions on ring states.
+
+    Keys contain the state's ``token`` and ``version``, so any write to the
+    ring's utilization or temperature makes older entries unreachable
+    without explicit invalidation; they age out of the LRU order. Graphs
+    without a ring state have no version and are never cached.
+
+    ``multicast_search`` caches each source's decision separately, so
+    overlapping source sets share entries.
+    """
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncached = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key, compute):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self._entries[key] = compute()
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def multicast_search(self, graph, sources, targets, wc, wt):
+        """Cached equivalent of routing.multicast_search."""
+        check_weights(wc, wt)
+        state = ring_state(graph)
+        if state is None:
+            raise ValueError("Multicast search requires a ring topology")
+        targets = tuple(int(target) for target in targets)
+        paths_dict = {}
+        scores_dict = {}
+
+        for source in sources:
+            key = ('multicast', state.token, state.version, int(source), targets, wc, wt)
+            clockwise, scores = self._lookup(
+                key, lambda: _multicast_decision(state, source, targets, wc, wt))
+            paths_dict[source] = [RingArc(source, target, clockwise, state.num_nodes)
+                                  for target in targets]
+            scores_dict[source] = list(scores)
+
+        return paths_dict, scores_dict
+
+    def find_best_path(self, graph, source, target, wc, wt, bidirectional=False):
+        """Cached equivalent of routing.find_best_path."""
+        state = ring_state(graph)
+        if state is None:
+            self.uncached += 1
+            return find_best_path(graph, source, target, wc, wt, bidirectional)
+
+        key = ('best_path', state.token, state.version, source, target, wc, wt, bidirectional)
+        path, score = self._lookup(
+            key, lambda: _frozen(find_best_path(graph, source, target, wc, wt, bidirectional)))
+        return (list(path) if path is not None else None), score
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters and the current fill."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'uncached': self.uncached,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _multicast_decision(state, source, targets, wc, wt):
+    """Direction and per-target scores chosen by multicast_search for one source."""
+    clock_scores = calculate_arc_scores(state, source, targets, True, wc, wt)
+    counter_scores = calculate_arc_scores(state, source, targets, False, wc, wt)
+    clockwise = bool(clock_scores.sum() <= counter_scores.sum())
+    return clockwise, tuple((clock_scores if clockwise else counter_scores).tolist())
+
+
+def _frozen(result):
+    path, score = result
+    return (tuple(path) if path is not None else None), score
@@ -1,102 +1,275 @@
 from heapq import heappop, heappush
-from src.core.metrics import calculate_path_score
-import networkx as nx
+from src.core.arcs import RingArc
+from src.core.metrics import calculate_path_score, calculate_arc_scores, check_weights
+from src.core.ring_state import ring_state
+import numpy as np
 
-def find_best_path(graph, source, target, wc, wt):
-    """Finds the best path using a weighted metric."""
-    queue = [(0, source, [])]
-    visited = set()
-    best_path = None
-    best_score = float('inf')
+def _edge_costs(graph, wc, wt):
+    """Returns (neighbors, start_cost, cost) callables for a cost-ordered search.
+    
+    Traversing u -> v costs wc * utilization(u, v) / avg_utilization +
+    wt * temperature(v) / avg_temperature, and a path additionally pays the
+    temperature term of its first node. The total is therefore len(path)
+    times the path's calculate_path_score. The ring state's arrays are only
+    used while the graph is a plain ring; with chords or express links the
+    graph's own neighbors and edge attributes are used (links without a
+    utilization count as idle).
+    """
+    state = ring_state(graph)
+    if state is not None:
+        avg_congestion, avg_temperature = state.normalization()
+        temperature = state.temperature
+        n = state.num_nodes
+        
+        def neighbors(u):
+            return ((u + 1) % n, (u - 1) % n)
+        
+        def start_cost(u):
+            return wt * temperature[u] / avg_temperature
+        
+        def cost(u, v):
+            return (wc * state.link_utilization(u, v) / avg_congestion +
+                    wt * temperature[v] / avg_temperature)
+    else:
+        avg_congestion = np.mean([graph[u][v].get('utilization', 0.0) for u, v in graph.edges])
+        avg_temperature = np.mean([graph.nodes[n]['temperature'] for n in graph.nodes])
+        neighbors = graph.neighbors
+        
+        def start_cost(u):
+            return wt * graph.nodes[u]['temperature'] / avg_temperature
+        
+        def cost(u, v):
+            return (wc * graph[u][v].get('utilization', 0.0) / avg_congestion +
+                    wt * graph.nodes[v]['temperature'] / avg_temperature)
+    
+    return neighbors, start_cost, cost
+
+def _walk_parents(parent, node):
+    """Follows parent pointers from node back to the search root."""
+    path = []
+    while node != -1:
+        path.append(int(node))
+        node = parent[node]
+    return path
+
+def find_best_path(graph, source, target, wc, wt, bidirectional=False):
+    """Finds the best path using a weighted metric.
+    
+    Runs a cost-ordered (Dijkstra) search with per-edge weights derived from
+    wc/wt, keeping parent-pointer arrays instead of copied path lists and
+    stopping as soon as the target is settled. With bidirectional=True the
+    search grows from both ends and stops once the frontiers meet. Works
+    on any graph labelled 0..n-1, including rings with chords or express
+    links. Returns (path, calculate_path_score(path)), or (None, inf) if
+    the target is unreachable.
+    """
+    check_weights(wc, wt)
+    n = len(graph)
+    if not (0 <= source < n and 0 <= target < n):
+        raise ValueError("Source and target must be nodes of the graph")
+    
+    neighbors, start_cost, cost = _edge_costs(graph, wc, wt)
+    if source == target:
+        path = [source]
+    elif bidirectional:
+        path = _bidirectional_dijkstra(n, source, target, neighbors, start_cost, cost)
+    else:
+        path = _dijkstra(n, source, target, neighbors, start_cost, cost)
+    
+    if path is None:
+        return None, float('inf')
+    return path, calculate_path_score(graph, path, wc, wt)
 
+def _dijkstra(n, source, target, neighbors, start_cost, cost):
+    dist = np.full(n, np.inf)
+    parent = np.full(n, -1, dtype=np.intp)
+    settled = np.zeros(n, dtype=bool)
+    dist[source] = start_cost(source)
+    queue = [(dist[source], source)]
+    
     while queue:
-        score, current, path = heappop(queue)
-        if current in visited:
+        d, current = heappop(queue)
+        if settled[current]:
             continue
-        visited.add(current)
-        path = path + [current]
-
+        settled[current] = True
         if current == target:
-            path_score = calculate_path_score(graph, path, wc, wt)
-            if path_score < best_score:
-                best_score = path_score
-                best_path = path
-            continue
-
-        for neighbor in graph.neighbors(current):
-            heappush(queue, (score, neighbor, path))
+            return _walk_parents(parent, target)[::-1]
+        
+        for neighbor in neighbors(current):
+            candidate = d + cost(current, neighbor)
+            if candidate < dist[neighbor]:
+                dist[neighbor] = candidate
+                parent[neighbor] = current
+                heappush(queue, (candidate, neighbor))
+    
+    return None
 
-    return best_path, best_score
+def _bidirectional_dijkstra(n, source, target, neighbors, start_cost, cost):
+    # Index 0 grows forward from the source, index 1 backward from the target
+    dist = [np.full(n, np.inf), np.full(n, np.inf)]
+    parent = [np.full(n, -1, dtype=np.intp), np.full(n, -1, dtype=np.intp)]
+    settled = [np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)]
+    dist[0][source] = start_cost(source)
+    dist[1][target] = 0.0
+    queues = [[(dist[0][source], source)], [(0.0, target)]]
+    best, meeting = float('inf'), -1
+    
+    while queues[0] and queues[1]:
+        # Stop once no shorter connection can still be found
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        d, current = heappop(queues[side])
+        if settled[side][current]:
+            continue
+        settled[side][current] = True
+        
+        for neighbor in neighbors(current):
+            # Backward edges are walked against their direction of travel
+            edge = cost(current, neighbor) if side == 0 else cost(neighbor, current)
+            candidate = d + edge
+            if candidate < dist[side][neighbor]:
+                dist[side][neighbor] = candidate
+                parent[side][neighbor] = current
+                heappush(queues[side], (candidate, neighbor))
+            through = dist[side][neighbor] + dist[1 - side][neighbor]
+            if through < best:
+                best, meeting = through, neighbor
+    
+    if meeting == -1:
+        return None
+    forward = _walk_parents(parent[0], meeting)[::-1]
+    backward = _walk_parents(parent[1], meeting)
+    return forward + backward[1:]
 
 def bidirectional_search(graph, source, target, wc, wt):
     """Performs a bidirectional search and selects the optimal path."""
-    clockwise_path, clockwise_score = find_best_path(graph, source, target, wc, wt)
-    counterclockwise_path, counterclockwise_score = find_best_path(graph, target, source, wc, wt)
-
-    if clockwise_score < counterclockwise_score:
-        return clockwise_path, clockwise_score
-    else:
-        return counterclockwise_path[::-1], counterclockwise_score
+    return find_best_path(graph, source, target, wc, wt, bidirectional=True)
 
 def multicast_search(graph, sources, targets, wc, wt):
-    """Performs multicast search from each source to all targets."""
+    """Performs multicast search from each source to all targets.
+    
+    Paths are returned as lazy RingArc sequences; their node lists are only
+    built when a caller iterates or indexes them.
+    """
     paths_dict = {}
     scores_dict = {}
     
     for source in sources:
-        # Calculate total scores for both directions
-        clock_paths = [get_clockwise_path(graph, source, target) for target in targets]
-        counter_paths = [get_counter_clockwise_path(graph, source, target) for target in targets]
-        
-        # Calculate combined scores for all paths in each direction
-        clock_total_score = sum(calculate_path_score(graph, path, wc, wt) for path in clock_paths)
-        counter_total_score = sum(calculate_path_score(graph, path, wc, wt) for path in counter_paths)
+        # Score both directions from the arc index without building paths
+        clock_scores = calculate_arc_scores(graph, source, targets, True, wc, wt)
+        counter_scores = calculate_arc_scores(graph, source, targets, False, wc, wt)
         
         # Choose direction based on total score
-        if clock_total_score <= counter_total_score:
-            paths_dict[source] = clock_paths
-            scores_dict[source] = [calculate_path_score(graph, path, wc, wt) for path in clock_paths]
-        else:
-            paths_dict[source] = counter_paths
-            scores_dict[source] = [calculate_path_score(graph, path, wc, wt) for path in counter_paths]
+        clockwise = clock_scores.sum() <= counter_scores.sum()
+        paths_dict[source] = get_ring_arcs(graph, source, targets, clockwise)
+        scores_dict[source] = (clock_scores if clockwise else counter_scores).tolist()
     
     return paths_dict, scores_dict
 
+def get_ring_arcs(graph, source, targets, clockwise):
+    """Returns lazy RingArc paths from source to each target in one direction."""
+    return [RingArc(source, target, clockwise, len(graph)) for target in targets]
+
 def get_clockwise_path(graph, start, end):
-    path = [start]
-    current = start
-    while current != end:
-        current = (current + 1) % len(graph)
-        path.append(current)
-    return path
+    n = len(graph)
+    steps = (end - start) % n
+    return [(start + k) % n for k in range(steps + 1)]
 
 def get_counter_clockwise_path(graph, start, end):
-    path = [start]
-    current = start
-    while current != end:
-        current = (current - 1) % len(graph)
-        path.append(current)
-    return path
+    n = len(graph)
+    steps = (start - end) % n
+    return [(start - k) % n for k in range(steps + 1)]
 
 def shortest_path_first(graph, sources, targets):
     """Implements Shortest Path First algorithm for multicast routing."""
     paths_dict = {}
     scores_dict = {}
     
+    n = len(graph)
+    targets = np.asarray(targets, dtype=np.intp)
+    
     for source in sources:
-        # Calculate total path lengths for both directions
-        clock_paths = [get_clockwise_path(graph, source, target) for target in targets]
-        counter_paths = [get_counter_clockwise_path(graph, source, target) for target in targets]
+        # Path lengths in both directions follow directly from ring offsets
+        clock_lengths = (targets - source) % n + 1
+        counter_lengths = (source - targets) % n + 1
         
         # Choose direction based on total path length
-        clock_total_length = sum(len(path) for path in clock_paths)
-        counter_total_length = sum(len(path) for path in counter_paths)
-        
-        if clock_total_length <= counter_total_length:
-            paths_dict[source] = clock_paths
-            scores_dict[source] = [len(path) for path in clock_paths]
-        else:
-            paths_dict[source] = counter_paths
-            scores_dict[source] = [len(path) for path in counter_paths]
-    
-    return paths_dict, scores_dict
\ No newline at end of file
+        clockwise = clock_lengths.sum() <= counter_lengths.sum()
+        paths_dict[source] = get_ring_arcs(graph, source, targets.tolist(), clockwise)
+        scores_dict[source] = (clock_lengths if clockwise else counter_lengths).tolist()
+    
+    return paths_dict, scores_dict
+
+def targets_to_csr(target_lists):
+    """Packs per-group target lists into CSR arrays (indptr, indices)."""
+    counts = np.fromiter((len(targets) for targets in target_lists), dtype=np.intp)
+    indptr = np.zeros(len(counts) + 1, dtype=np.intp)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.fromiter((t for targets in target_lists for t in targets),
+                          dtype=np.intp, count=indptr[-1])
+    return indptr, indices
+
+def _expand_groups(sources, target_indptr, target_indices):
+    """Validates a CSR batch and returns (sources, group ids, per-target sources)."""
+    sources = np.asarray(sources, dtype=np.intp)
+    target_indptr = np.asarray(target_indptr, dtype=np.intp)
+    target_indices = np.asarray(target_indices, dtype=np.intp)
+    
+    if len(target_indptr) != len(sources) + 1:
+        raise ValueError("target_indptr must have one more entry than sources")
+    if target_indptr[0] != 0 or target_indptr[-1] != len(target_indices):
+        raise ValueError("target_indptr must span target_indices")
+    counts = np.diff(target_indptr)
+    if (counts < 0).any():
+        raise ValueError("target_indptr must be non-decreasing")
+    
+    group_ids = np.repeat(np.arange(len(sources)), counts)
+    return sources, group_ids, sources[group_ids], target_indices
+
+def batch_multicast_search(graph, sources, target_indptr, target_indices, wc, wt):
+    """Vectorized multicast_search over many multicast groups at once.
+    
+    Group g sends from sources[g] to
+    target_indices[target_indptr[g]:target_indptr[g + 1]] (CSR layout).
+    Returns NumPy arrays (clockwise, scores, costs): the chosen direction
+    per group, the score of every target aligned with target_indices, and
+    each group's summed score in the chosen direction.
+    """
+    sources, group_ids, pair_sources, targets = _expand_groups(
+        sources, target_indptr, target_indices)
+    
+    # Score both directions for every (source, target) pair in one pass
+    clock_scores = calculate_arc_scores(graph, pair_sources, targets, True, wc, wt)
+    counter_scores = calculate_arc_scores(graph, pair_sources, targets, False, wc, wt)
+    
+    # Choose direction based on total score per group
+    clock_totals = np.bincount(group_ids, clock_scores, minlength=len(sources))
+    counter_totals = np.bincount(group_ids, counter_scores, minlength=len(sources))
+    clockwise = clock_totals <= counter_totals
+    
+    scores = np.where(clockwise[group_ids], clock_scores, counter_scores)
+    costs = np.where(clockwise, clock_totals, counter_totals)
+    return clockwise, scores, costs
+
+def batch_shortest_path_first(graph, sources, target_indptr, target_indices):
+    """Vectorized shortest_path_first over CSR multicast groups.
+    
+    Returns (clockwise, lengths, total_lengths) like batch_multicast_search,
+    with path lengths counted in nodes.
+    """
+    sources, group_ids, pair_sources, targets = _expand_groups(
+        sources, target_indptr, target_indices)
+    n = len(graph)
+    
+    clock_lengths = (targets - pair_sources) % n + 1
+    counter_lengths = (pair_sources - targets) % n + 1
+    
+    clock_totals = np.bincount(group_ids, clock_lengths, minlength=len(sources))
+    counter_totals = np.bincount(group_ids, counter_lengths, minlength=len(sources))
+    clockwise = clock_totals <= counter_totals
+    
+    lengths = np.where(clockwise[group_ids], clock_lengths, counter_lengths)
+    total_lengths = np.where(clockwise, clock_totals, counter_totals).astype(np.intp)
+    return clockwise, lengths, total_lengths
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""Parallel parameter sweeps over ring size, partition size, wc and seed.
+
+Usage:
+
+    python -m src.core.sweep --nodes 16 256 4096 --partition-size 4 16 \
+        --wc 0 0.25 0.5 0.75 1 --seeds 0 1 2 --workers 8 \
+        --output results/sweeps/example
+
+Every grid point runs in a worker process with its own seed derived from
+the point's parameters, so results do not depend on which worker ran them.
+Finished runs are streamed into numbered ``part-*.npz`` column files in the
+output directory; re-running the same command skips runs already stored.
+"""
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.core.results_store import ResultsStore, node_table, path_table
+from src.core.ring_state import ring_state
+from src.core.routing import multicast_search, shortest_path_first
+from src.core.topology import create_ring_topology, partition_nodes
+
+GRID_KEYS = ('num_nodes', 'partition_size', 'wc', 'seed', 'num_sources', 'num_targets')
+
+
+def run_key(config):
+    """Stable id of a grid point, used for seeding and for resuming."""
+    payload = json.dumps({key: config[key] for key in GRID_KEYS}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def expand_grid(num_nodes, partition_size, wc, seeds, num_sources=2, num_targets=2):
+    """Expands parameter lists into run configurations, skipping invalid points."""
+    configs = []
+    for n, size, weight, seed, s, t in itertools.product(
+            num_nodes, partition_size, wc, seeds, _as_list(num_sources), _as_list(num_targets)):
+        if size > n or s > n or t > n:
+            continue
+        config = {'num_nodes': int(n), 'partition_size': int(size), 'wc': float(weight),
+                  'seed': int(seed), 'num_sources': int(s), 'num_targets': int(t)}
+        config['run_id'] = run_key(config)
+        configs.append(config)
+    return configs
+
+
+def _as_list(values):
+    return list(values) if isinstance(values, (list, tuple)) else [values]
+
+
+def _seed_run(config):
+    """Seeds the global RNGs from the run's own parameters."""
+    sequence = np.random.SeedSequence(config['seed'], spawn_key=(int(config['run_id'], 16),))
+    seed = int(sequence.generate_state(1)[0])
+    np.random.seed(seed)
+    random.seed(seed)
+    return np.random.default_rng(sequence)
+
+
+def _path_totals(state, paths_dict):
+    """Sums hops, link utilization and node temperature over all paths."""
+    hops = congestion = temperature = 0.0
+    for paths in paths_dict.values():
+        for path in paths:
+            hops += len(path) - 1
+            congestion += state.path_congestion(path)
+            temperature += state.path_temperature(path)
+    return hops, congestion, temperature
+
+
+def run_configuration(config):
+    """Runs one grid point without plotting and returns a row of scalar results."""
+    start = time.perf_counter()
+    rng = _seed_run(config)
+
+    num_nodes = config['num_nodes']
+    ring = create_ring_topology(num_nodes, rng=rng)
+    partitions = partition_nodes(ring, config['partition_size'])
+    sources = rng.choice(num_nodes, config['num_sources'], replace=False).tolist()
+    targets = rng.choice(num_nodes, config['num_targets'], replace=False).tolist()
+
+    wc = config['wc']
+    paths_tempcon, scores_tempcon = multicast_search(ring, sources, targets, wc, 1 - wc)
+    paths_spf, _ = shortest_path_first(ring, sources, targets)
+
+    state = ring_state(ring)
+    row = dict(config)
+    row['wt'] = 1 - wc
+    row['num_partitions'] = len(partitions)
+    row['tempcon_score'] = float(sum(sum(scores) for scores in scores_tempcon.values()))
+    for name, paths in (('tempcon', paths_tempcon), ('spf', paths_spf)):
+        hops, congestion, temperature = _path_totals(state, paths)
+        row[f'{name}_hops'] = hops
+        row[f'{name}_congestion'] = congestion
+        row[f'{name}_temperature'] = temperature
+
+    if config.get('store'):
+        # Per-path and per-node detail goes to the columnar store, one
+        # directory per run, so workers can write without coordination
+        params = {key: config[key] for key in GRID_KEYS}
+        params.update(wt=1 - wc, sources=sources, targets=targets)
+        nodes, partition_columns = node_table(ring, partitions)
+        ResultsStore(config['store']).append_run(config['run_id'], params, {
+            'paths': path_table(ring, {'tempcon': paths_tempcon, 'spf': paths_spf}, wc, 1 - wc),
+            'nodes': nodes,
+            'partitions': partition_columns,
+        })
+    row.pop('store', None)
+    row['elapsed'] = time.perf_counter() - start
+    return row
+
+
+class ColumnWriter:
+    """Buffers result rows and flushes them as numbered ``.npz`` column files."""
+
+    def __init__(self, directory, flush_every=256):
+        self.directory = directory
+        self.flush_every = flush_every
+        self.rows = []
+        os.makedirs(directory, exist_ok=True)
+        self.next_part = len(self._parts())
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.directory, 'part-*.npz')))
+
+    def append(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        columns = {key: np.array([row[key] for row in self.rows]) for key in self.rows[0]}
+        path = os.path.join(self.directory, f'part-{self.next_part:05d}.npz')
+        # Write under a temporary name so an interrupted sweep never leaves a torn part
+        with open(path + '.tmp', 'wb') as f:
+            np.savez(f, **columns)
+        os.replace(path + '.tmp', path)
+        self.next_part += 1
+        self.rows = []
+
+    def completed_runs(self):
+        """Run ids already present in the output directory."""
+        done = set()
+        for part in self._parts():
+            with np.load(part) as data:
+                done.update(data['run_id'].tolist())
+        return done
+
+
+def load_sweep(directory):
+    """Loads all stored runs of a sweep as a dict of concatenated columns."""
+    parts = sorted(glob.glob(os.path.join(directory, 'part-*.npz')))
+    if not parts:
+        return {}
+    loaded = [np.load(part) for part in parts]
+    try:
+        return {key: np.concatenate([data[key] for data in loaded]) for key in loaded[0].files}
+    finally:
+        for data in loaded:
+            data.close()
+
+
+def run_sweep(configs, output, workers=None, flush_every=256, store=None):
+    """Runs all configurations not yet stored in ``output`` across a process pool.
+
+    With ``store`` set, each run's path, node and partition metrics are
+    also written to a ResultsStore at that directory.
+    Returns the number of runs executed by this call.
+    """
+    writer = ColumnWriter(output, flush_every)
+    done = writer.completed_runs()
+    pending = [dict(config, store=store) if store else config
+               for config in configs if config['run_id'] not in done]
+    logging.info(f"Sweep: {len(configs)} runs, {len(configs) - len(pending)} already stored, "
+                 f"{len(pending)} to run")
+
+    try:
+        if workers == 1:
+            for row in map(run_configuration, pending):
+                writer.append(row)
+        else:
+            max_workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                chunksize = max(1, len(pending) // (4 * max_workers))
+                for row in executor.map(run_configuration, pending, chunksize=chunksize):
+                    writer.append(row)
+    finally:
+        writer.flush()
+    return len(pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel ONoC ring parameter sweep")
+    parser.add_argument('--nodes', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--partition-size', type=int, nargs='+', default=[4])
+    parser.add_argument('--wc', type=float, nargs='+', default=[0.0, 0.25, 0.5, 0.75, 1.0])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument('--sources', type=int, nargs='+', default=[2])
+    parser.add_argument('--targets', type=int, nargs='+', default=[2])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--flush-every', type=int, default=256)
+    parser.add_argument('--output', default='results/sweeps/default')
+    parser.add_argument('--store', default=None,
+                        help="also store per-path and per-node metrics in this directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    configs = expand_grid(args.nodes, args.partition_size, args.wc, args.seeds,
+                          args.sources, args.targets)
+    executed = run_sweep(configs, args.output, args.workers, args.flush_every, args.store)
+    logging.info(f"Sweep finished: {executed} runs executed, results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
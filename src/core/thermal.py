@@ -0,0 +1,117 @@
+import numpy as np
+
+
+class ThermalModel:
+    """Lumped RC thermal model of a ring, advanced in fixed time steps.
+
+    Every node exchanges heat with its two ring neighbors through
+    ``conductance``, leaks heat to the ambient temperature through
+    ``leakage`` and is heated by its dissipated power::
+
+        C dT_i/dt = k (T_{i-1} - 2 T_i + T_{i+1}) - h (T_i - T_amb) + P_i
+
+    The neighbor coupling is a circular stencil, so an explicit step is a
+    few shifted-slice additions. Its system matrix is circulant, so an
+    implicit (backward Euler) step is solved exactly with one real FFT
+    pair and stays stable for any step size.
+    """
+
+    def __init__(self, num_nodes, conductance=0.5, leakage=0.1, heat_capacity=1.0, ambient=25.0):
+        if num_nodes < 3:
+            raise ValueError("A ring needs at least 3 nodes")
+        if conductance < 0 or leakage < 0 or heat_capacity <= 0:
+            raise ValueError("Conductance and leakage must be non-negative, heat capacity positive")
+
+        self.num_nodes = num_nodes
+        self.conductance = conductance
+        self.leakage = leakage
+        self.heat_capacity = heat_capacity
+        self.ambient = ambient
+        # Eigenvalues of the (negated) stencil operator -L for the rfft modes
+        modes = np.arange(num_nodes // 2 + 1)
+        self._decay = (2 * conductance * (1 - np.cos(2 * np.pi * modes / num_nodes)) + leakage)
+        self._gain = None
+        self._gain_scale = None
+
+    def max_stable_dt(self):
+        """Largest time step for which explicit stepping is stable."""
+        return 2 * self.heat_capacity / (4 * self.conductance + self.leakage)
+
+    def derivative(self, temperature, power):
+        """Returns dT/dt for the given temperatures and node power."""
+        # Circular stencil T[i-1] - 2 T[i] + T[i+1] without np.roll copies
+        coupling = np.empty_like(temperature)
+        np.add(temperature[:-2], temperature[2:], out=coupling[1:-1])
+        coupling[0] = temperature[-1] + temperature[1]
+        coupling[-1] = temperature[-2] + temperature[0]
+        coupling -= 2 * temperature
+        coupling *= self.conductance
+        coupling -= self.leakage * (temperature - self.ambient)
+        coupling += power
+        coupling /= self.heat_capacity
+        return coupling
+
+    def step(self, temperature, power, dt, implicit=False):
+        """Advances temperatures by one step of length dt and returns the new array."""
+        temperature = np.asarray(temperature, dtype=np.float64)
+        if not implicit:
+            if dt > self.max_stable_dt():
+                raise ValueError(f"Explicit step dt={dt} exceeds the stable limit "
+                                 f"{self.max_stable_dt():.4g}; use implicit=True")
+            return temperature + dt * self.derivative(temperature, power)
+
+        # (I + dt/C * (-L)) T' = T + dt/C * (P + h T_amb), diagonal in Fourier space
+        scale = dt / self.heat_capacity
+        rhs = temperature + scale * (np.asarray(power, dtype=np.float64) + self.leakage * self.ambient)
+        spectrum = np.fft.rfft(rhs)
+        spectrum *= self._implicit_gain(scale)
+        return np.fft.irfft(spectrum, n=self.num_nodes)
+
+    def _implicit_gain(self, scale):
+        """Per-mode inverse of the implicit system matrix, cached for the last step size."""
+        if self._gain_scale != scale:
+            self._gain = 1 / (1 + scale * self._decay)
+            self._gain_scale = scale
+        return self._gain
+
+    def run(self, temperature, power, dt, steps, implicit=False, record_every=0):
+        """Advances ``steps`` steps and returns the final temperatures.
+
+        ``power`` is an array or a callable ``power(step, temperature)``
+        re-evaluated every step, e.g. to couple heating to routing. With
+        ``record_every`` set, also returns the temperatures every that many
+        steps as a 2-D array.
+        """
+        temperature = np.asarray(temperature, dtype=np.float64)
+        history = []
+        for step in range(steps):
+            step_power = power(step, temperature) if callable(power) else power
+            temperature = self.step(temperature, step_power, dt, implicit)
+            if record_every and (step + 1) % record_every == 0:
+                history.append(temperature)
+        if record_every:
+            return temperature, np.array(history).reshape(-1, self.num_nodes)
+        return temperature
+
+    def steady_state(self, power):
+        """Temperatures the ring settles at under constant power (needs leakage > 0)."""
+        if self.leakage <= 0:
+            raise ValueError("Without leakage there is no steady state")
+        rhs = np.asarray(power, dtype=np.float64) + self.leakage * self.ambient
+        return np.fft.irfft(np.fft.rfft(rhs) / self._decay, n=self.num_nodes)
+
+    def advance(self, state, power, dt, steps=1, implicit=False):
+        """Advances a RingState's temperatures in place.
+
+        The bound graph is updated once at the end rather than every step.
+        """
+        state.temperature[:] = self.run(state.temperature, power, dt, steps, implicit)
+        state.mark_changed()
+        state.push_to_graph()
+        return state
+
+
+def traffic_power(state, per_utilization=0.01, per_congestion=0.0):
+    """Node power from traffic: the mean utilization of its incident links plus its congestion."""
+    link_utilization = (state.cw_utilization + state.ccw_utilization) / 2
+    return per_utilization * link_utilization + per_congestion * state.congestion
@@ -1,25 +1,93 @@
-import networkx as nx
-import random
 import numpy as np
+from src.core.ring_state import RingState
 
-def create_ring_topology(num_nodes):
-    """Creates a ring topology with the given number of nodes."""
-    ring = nx.cycle_graph(num_nodes)
+def uniform_profile(rng, num_nodes, temperature=(25, 50), congestion=(20, 60), utilization=(20, 60)):
+    """Node temperature, node congestion and link utilization drawn uniformly."""
+    return (rng.uniform(*temperature, num_nodes),
+            rng.uniform(*congestion, num_nodes),
+            rng.uniform(*utilization, num_nodes))
+
+def gaussian_profile(rng, num_nodes, mean=35, std=5, clip=(25, 50), congestion=(20, 60),
+                     utilization=(20, 60)):
+    """Gaussian temperatures (mean 35°C, std 5°C, clipped to 25-50°C), uniform load."""
+    temperatures = np.clip(rng.normal(mean, std, num_nodes), *clip)
+    return (temperatures,
+            rng.uniform(*congestion, num_nodes),
+            rng.uniform(*utilization, num_nodes))
+
+def half_ring_stress(num_nodes, hot=85.0, cool=65.0, busy=90.0, idle=30.0):
+    """High temperature and congestion on the first half of the ring.
     
-    # Initialize with more realistic temperature distribution
-    temperatures = np.random.normal(35, 5, num_nodes)  # Mean 35°C, std 5°C
-    temperatures = np.clip(temperatures, 25, 50)  # Clip between 25-50°C
+    Returns (temperature, utilization); link i joins i and i + 1 and is busy
+    only if both endpoints are in the hot half.
+    """
+    half = num_nodes // 2
+    nodes = np.arange(num_nodes)
+    links_in_half = (nodes < half) & ((nodes + 1) % num_nodes < half)
+    return np.where(nodes < half, hot, cool), np.where(links_in_half, busy, idle)
+
+def hotspot_clusters(num_nodes, hotspots, radius=0, hot=90.0, cool=60.0, busy=85.0, idle=25.0):
+    """Hot nodes within radius hops of each hotspot, with busy links around them.
     
-    for node in ring.nodes:
-        ring.nodes[node]['temperature'] = temperatures[node]
-        ring.nodes[node]['congestion'] = random.uniform(20, 60)  # More realistic congestion range
+    Hotspots outside the ring are ignored. Returns (temperature,
+    utilization). Link i takes the state of node i + 1,
+    except the closing link n-1 -> 0, which takes the state of node n-1.
+    """
+    nodes = np.arange(num_nodes)
+    is_hot = np.zeros(num_nodes, dtype=bool)
+    hotspots = np.asarray(hotspots, dtype=np.intp)
+    hotspots = hotspots[(hotspots >= 0) & (hotspots < num_nodes)]
+    for offset in range(-radius, radius + 1):
+        is_hot[(hotspots + offset) % num_nodes] = True
     
-    # Initialize edges with realistic utilization
-    for u, v in ring.edges:
-        ring[u][v]['utilization'] = random.uniform(20, 60)
-        ring[v][u]['utilization'] = ring[u][v]['utilization']  # Symmetric utilization
-        
-    return ring
+    link_owner = (nodes + 1) % num_nodes
+    link_owner[-1] = num_nodes - 1
+    return np.where(is_hot, hot, cool), np.where(is_hot[link_owner], busy, idle)
+
+def hotspot_profile(rng, num_nodes, hotspots=None, num_hotspots=3, radius=0, congestion=(20, 60),
+                    **levels):
+    """Hotspot clusters like test scenario 2; hotspots are drawn from rng if not given."""
+    if hotspots is None:
+        hotspots = rng.choice(num_nodes, min(num_hotspots, num_nodes), replace=False)
+    temperatures, utilization = hotspot_clusters(num_nodes, hotspots, radius, **levels)
+    return temperatures, rng.uniform(*congestion, num_nodes), utilization
+
+def half_ring_profile(rng, num_nodes, congestion=(20, 60), **levels):
+    """Half-ring stress like test scenario 1, with uniform node congestion."""
+    temperatures, utilization = half_ring_stress(num_nodes, **levels)
+    return temperatures, rng.uniform(*congestion, num_nodes), utilization
+
+PROFILES = {
+    'uniform': uniform_profile,
+    'gaussian': gaussian_profile,
+    'hotspot': hotspot_profile,
+    'half_ring_stress': half_ring_profile,
+}
+
+def create_ring_state(num_nodes, rng=None, profile='gaussian', **options):
+    """Builds the array state of a ring in bulk from a thermal/traffic profile.
+    
+    profile is a name from PROFILES or a callable (rng, num_nodes, **options)
+    returning (temperature, congestion, utilization) arrays. Without rng, a
+    generator is seeded from the global NumPy RNG, so np.random.seed keeps
+    runs reproducible.
+    """
+    if rng is None:
+        rng = np.random.default_rng(np.random.randint(0, 2**63 - 1, dtype=np.int64))
+    elif not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+    
+    if not callable(profile):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {sorted(PROFILES)}")
+        profile = PROFILES[profile]
+    
+    temperatures, congestion, utilization = profile(rng, num_nodes, **options)
+    return RingState(num_nodes, temperatures, congestion, utilization)
+
+def create_ring_topology(num_nodes, rng=None, profile='gaussian', **options):
+    """Creates a ring topology with the given number of nodes."""
+    return create_ring_state(num_nodes, rng, profile, **options).to_graph()
 
 def partition_nodes(graph, partition_size):
     """Partitions the nodes into groups of the given size."""
@@ -29,9 +97,19 @@ def partition_nodes(graph, partition_size):
     nodes = list(graph.nodes)
     partitions = [nodes[i:i + partition_size] for i in range(0, len(nodes), partition_size)]
     
-    # Store partition information in graph
-    for i, partition in enumerate(partitions):
-        for node in partition:
-            graph.nodes[node]['partition'] = i
+    # Store partition information in graph, both per node and as a label array
+    labels = partition_labels(partitions, len(graph))
+    graph.graph['partition_labels'] = labels
+    for node, label in zip(nodes, (np.arange(len(nodes)) // partition_size).tolist()):
+        graph.nodes[node]['partition'] = label
             
     return partitions
+
+def partition_labels(partitions, num_nodes):
+    """Returns the partition index of every node as an array (-1 if unassigned)."""
+    labels = np.full(num_nodes, -1, dtype=np.int32)
+    sizes = [len(partition) for partition in partitions]
+    if sum(sizes):
+        members = np.concatenate([np.asarray(partition, dtype=np.intp) for partition in partitions])
+        labels[members] = np.repeat(np.arange(len(partitions), dtype=np.int32), sizes)
+    return labels
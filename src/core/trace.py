@@ -0,0 +1,427 @@
+"""Trace-driven replay of multicast workloads.
+
+A trace is a sequence of multicast requests ``(timestamp, source,
+targets)`` in timestamp order, stored either as text or in the binary
+column layout written by ``TraceWriter``:
+
+- text, optionally gzip-compressed: one request per line,
+  ``timestamp,source,target target ...``; blank lines and ``#`` comments
+  are skipped
+- binary: a directory with ``trace.json`` and raw little-endian columns
+  ``timestamp.bin`` (float64), ``source.bin``, ``target_count.bin`` and
+  ``targets.bin`` (int32), read through memory maps
+
+Both readers yield ``TraceChunk``s of at most ``chunk_size`` requests, so a
+trace is never loaded as a whole. ``replay`` routes the requests in
+batches of ``batch_size`` with batch_multicast_search, adds each batch's
+traffic to the ring state before routing the next and yields one
+aggregate row per time window. The read chunk size only affects I/O, not
+the routing results.
+
+Usage:
+
+    python -m src.core.trace convert capture.csv.gz results/traces/capture
+    python -m src.core.trace replay results/traces/capture --nodes 4096 --wc 0.7 \
+        --window 1000 --batch-size 64 --output results/traces/capture_windows.csv
+"""
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import logging
+import os
+
+import numpy as np
+
+from src.core.metrics import check_weights
+from src.core.ring_state import ring_state
+from src.core.routing import batch_multicast_search, batch_shortest_path_first
+from src.core.thermal import traffic_power
+from src.core.topology import PROFILES, create_ring_state
+
+COLUMNS = (('timestamp', np.float64), ('source', np.int32), ('target_count', np.int32),
+           ('targets', np.int32))
+
+WINDOW_FIELDS = ('window_start', 'window_end', 'requests', 'targets', 'tempcon_cost',
+                 'mean_target_score', 'spf_length', 'clockwise_fraction', 'mean_tree_hops',
+                 'max_link_utilization', 'mean_link_utilization', 'max_temperature',
+                 'mean_temperature')
+
+
+def _little_endian(dtype):
+    return np.dtype(dtype).newbyteorder('<')
+
+
+class TraceChunk:
+    """Consecutive trace requests; targets in CSR layout as batch_multicast_search takes them."""
+
+    __slots__ = ('timestamps', 'sources', 'target_indptr', 'target_indices')
+
+    def __init__(self, timestamps, sources, target_indptr, target_indices):
+        self.timestamps = timestamps
+        self.sources = sources
+        self.target_indptr = target_indptr
+        self.target_indices = target_indices
+
+    def __len__(self):
+        return len(self.sources)
+
+    def slice(self, start, stop):
+        """Requests ``start <= i < stop`` as a new chunk."""
+        indptr = self.target_indptr[start:stop + 1]
+        return TraceChunk(self.timestamps[start:stop], self.sources[start:stop],
+                          indptr - indptr[0], self.target_indices[indptr[0]:indptr[-1]])
+
+    @classmethod
+    def concatenate(cls, chunks):
+        """Joins consecutive chunks into one."""
+        if len(chunks) == 1:
+            return chunks[0]
+        indptr = np.zeros(sum(len(chunk) for chunk in chunks) + 1, dtype=np.intp)
+        np.cumsum(np.concatenate([np.diff(chunk.target_indptr) for chunk in chunks]),
+                  out=indptr[1:])
+        return cls(np.concatenate([chunk.timestamps for chunk in chunks]),
+                   np.concatenate([chunk.sources for chunk in chunks]), indptr,
+                   np.concatenate([chunk.target_indices for chunk in chunks]))
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt')
+    return open(path)
+
+
+def _parse_lines(lines):
+    timestamps, sources, counts, targets = [], [], [], []
+    for line in lines:
+        try:
+            timestamp, source, target_list = line.split(',', 2)
+            request_targets = [int(t) for t in target_list.replace(';', ' ').split()]
+            timestamps.append(float(timestamp))
+            sources.append(int(source))
+        except ValueError:
+            raise ValueError(f"Malformed trace line: {line!r}")
+        counts.append(len(request_targets))
+        targets.extend(request_targets)
+
+    indptr = np.zeros(len(counts) + 1, dtype=np.intp)
+    np.cumsum(counts, out=indptr[1:])
+    return TraceChunk(np.array(timestamps, dtype=np.float64), np.array(sources, dtype=np.intp),
+                      indptr, np.array(targets, dtype=np.intp))
+
+
+def read_text_trace(path, chunk_size=65536):
+    """Yields TraceChunks of a text trace, parsing ``chunk_size`` requests at a time."""
+    with _open_text(path) as f:
+        requests = (line.strip() for line in f)
+        requests = (line for line in requests if line and not line.startswith('#'))
+        while True:
+            lines = list(itertools.islice(requests, chunk_size))
+            if not lines:
+                return
+            yield _parse_lines(lines)
+
+
+def read_binary_trace(directory, chunk_size=65536):
+    """Yields TraceChunks of a binary trace from memory-mapped columns."""
+    with open(os.path.join(directory, 'trace.json')) as f:
+        meta = json.load(f)
+    num_requests, num_targets = meta['num_requests'], meta['num_targets']
+    if not num_requests:
+        return
+
+    def column(name, dtype, length):
+        if not length:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(directory, f'{name}.bin'), dtype=_little_endian(dtype),
+                         mode='r', shape=(length,))
+
+    timestamps = column('timestamp', np.float64, num_requests)
+    sources = column('source', np.int32, num_requests)
+    counts = column('target_count', np.int32, num_requests)
+    targets = column('targets', np.int32, num_targets)
+
+    offset = 0
+    for start in range(0, num_requests, chunk_size):
+        stop = min(start + chunk_size, num_requests)
+        indptr = np.zeros(stop - start + 1, dtype=np.intp)
+        np.cumsum(counts[start:stop], out=indptr[1:])
+        yield TraceChunk(np.asarray(timestamps[start:stop]),
+                         np.asarray(sources[start:stop], dtype=np.intp), indptr,
+                         np.asarray(targets[offset:offset + indptr[-1]], dtype=np.intp))
+        offset += int(indptr[-1])
+
+
+def read_trace(path, chunk_size=65536):
+    """Reads a binary trace directory or a (gzipped) text trace in chunks."""
+    if os.path.isdir(path):
+        return read_binary_trace(path, chunk_size)
+    return read_text_trace(path, chunk_size)
+
+
+class TraceWriter:
+    """Appends requests to a binary trace directory; ``close`` writes ``trace.json``."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.num_requests = 0
+        self.num_targets = 0
+        self._files = {name: open(os.path.join(directory, f'{name}.bin'), 'wb')
+                       for name, _ in COLUMNS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def append(self, chunk):
+        columns = (chunk.timestamps, chunk.sources, np.diff(chunk.target_indptr),
+                   chunk.target_indices)
+        for (name, dtype), values in zip(COLUMNS, columns):
+            self._files[name].write(np.asarray(values, dtype=_little_endian(dtype)).tobytes())
+        self.num_requests += len(chunk)
+        self.num_targets += len(chunk.target_indices)
+
+    def close(self):
+        if self._files is None:
+            return
+        for f in self._files.values():
+            f.close()
+        self._files = None
+        with open(os.path.join(self.directory, 'trace.json'), 'w') as f:
+            json.dump({'num_requests': self.num_requests, 'num_targets': self.num_targets,
+                       'columns': {name: _little_endian(dtype).str for name, dtype in COLUMNS}}, f)
+
+
+def convert_text_trace(path, directory, chunk_size=65536):
+    """Converts a text trace to the binary layout without loading it; returns the request count."""
+    with TraceWriter(directory) as writer:
+        for chunk in read_text_trace(path, chunk_size):
+            writer.append(chunk)
+    return writer.num_requests
+
+
+def _circular_add(values, starts, counts, weight):
+    """Adds weight to ``counts[k]`` consecutive entries of values from ``starts[k]``, wrapping."""
+    n = len(values)
+    diff = np.zeros(2 * n + 1)
+    np.add.at(diff, starts, weight)
+    np.add.at(diff, starts + counts, -weight)
+    total = np.cumsum(diff[:-1])
+    values += total[:n] + total[n:]
+
+
+class _Window:
+    """Running aggregates of one replay window."""
+
+    def __init__(self, index, width):
+        self.index = index
+        self.start = index * width
+        self.end = self.start + width
+        self.requests = 0
+        self.targets = 0
+        self.cost = 0.0
+        self.score = 0.0
+        self.spf_length = 0
+        self.clockwise = 0
+        self.tree_hops = 0
+
+    def row(self, state):
+        utilization = np.maximum(state.cw_utilization, state.ccw_utilization)
+        return {
+            'window_start': self.start, 'window_end': self.end,
+            'requests': self.requests, 'targets': self.targets,
+            'tempcon_cost': self.cost,
+            'mean_target_score': self.score / self.targets if self.targets else 0.0,
+            'spf_length': self.spf_length,
+            'clockwise_fraction': self.clockwise / self.requests if self.requests else 0.0,
+            'mean_tree_hops': self.tree_hops / self.requests if self.requests else 0.0,
+            'max_link_utilization': float(utilization.max()),
+            'mean_link_utilization': float(state.mean_utilization()),
+            'max_temperature': float(state.temperature.max()),
+            'mean_temperature': float(state.mean_temperature()),
+        }
+
+
+def _batches(chunks, window, batch_size, num_nodes):
+    """Regroups a stream of TraceChunks into routing batches as (window index, chunk).
+
+    Batch k holds requests ``k * batch_size`` to ``(k + 1) * batch_size`` of
+    the whole trace, split further at window boundaries, so the batches do
+    not depend on how the trace was chunked for reading.
+    """
+    pending, pending_key = [], None
+    offset = 0
+    last_timestamp = -np.inf
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        timestamps = chunk.timestamps
+        if timestamps[0] < last_timestamp or (np.diff(timestamps) < 0).any():
+            raise ValueError("Trace timestamps must be non-decreasing")
+        last_timestamp = timestamps[-1]
+        for nodes in (chunk.sources, chunk.target_indices):
+            if len(nodes) and (nodes.min() < 0 or nodes.max() >= num_nodes):
+                raise ValueError("Trace node ids must be nodes of the ring")
+
+        window_ids = np.floor(timestamps / window).astype(np.int64)
+        batch_ids = (offset + np.arange(len(chunk))) // batch_size
+        offset += len(chunk)
+        changes = (np.diff(window_ids) != 0) | (np.diff(batch_ids) != 0)
+        bounds = np.concatenate(([0], np.flatnonzero(changes) + 1, [len(chunk)]))
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            key = (int(window_ids[start]), int(batch_ids[start]))
+            if pending and key != pending_key:
+                yield pending_key[0], TraceChunk.concatenate(pending)
+                pending = []
+            # The batch may continue in the next chunk
+            pending.append(chunk.slice(start, stop))
+            pending_key = key
+
+    if pending:
+        yield pending_key[0], TraceChunk.concatenate(pending)
+
+
+def replay(graph, chunks, wc, wt, window, load=1.0, decay=0.0, thermal=None, thermal_dt=1.0,
+           batch_size=64):
+    """Routes a stream of TraceChunks and yields one aggregate dict per time window.
+
+    Requests are routed with batch_multicast_search in batches of
+    ``batch_size`` consecutive requests (never spanning a window boundary).
+    The requests of a batch see the same state; the batch's multicast trees
+    then add ``load`` to the utilization of the links they use before the
+    next batch is routed. Smaller batches follow the load more closely at
+    a higher per-request cost, and ``batch_size=1`` routes every request
+    against the traffic of all earlier ones. The results depend on the
+    batch size and window, not on the chunking of the input.
+    At each window boundary the added traffic is scaled by
+    ``decay`` per elapsed window (0 clears it) and, if a ThermalModel is
+    given, temperatures advance by ``thermal_dt`` per window with the
+    traffic as power. Windows without requests are not reported.
+
+    The ring state is updated in place.
+    """
+    check_weights(wc, wt)
+    if window <= 0:
+        raise ValueError("Window must be positive")
+    if batch_size < 1:
+        raise ValueError("Batch size must be positive")
+    state = ring_state(graph)
+    if state is None:
+        raise ValueError("Trace replay requires a ring topology")
+
+    n = state.num_nodes
+    base_cw = state.cw_utilization.copy()
+    base_ccw = state.ccw_utilization.copy()
+    traffic_cw = np.zeros(n)
+    traffic_ccw = np.zeros(n)
+    current = None
+
+    for index, part in _batches(chunks, window, batch_size, n):
+        if current is not None and index != current.index:
+            yield current.row(state)
+            elapsed = index - current.index
+            traffic_cw *= decay ** elapsed
+            traffic_ccw *= decay ** elapsed
+            state.cw_utilization[:] = base_cw + traffic_cw
+            state.ccw_utilization[:] = base_ccw + traffic_ccw
+            state.mark_changed()
+            if thermal is not None:
+                thermal.advance(state, traffic_power(state), thermal_dt, steps=elapsed,
+                                implicit=True)
+            current = None
+        if current is None:
+            current = _Window(index, window)
+
+        clockwise, scores, costs = batch_multicast_search(
+            state, part.sources, part.target_indptr, part.target_indices, wc, wt)
+        spf_lengths = batch_shortest_path_first(
+            state, part.sources, part.target_indptr, part.target_indices)[2]
+
+        # A multicast tree in one direction spans the arc to its farthest target
+        group_ids = np.repeat(np.arange(len(part)), np.diff(part.target_indptr))
+        pair_sources = part.sources[group_ids]
+        hops = np.where(clockwise[group_ids], part.target_indices - pair_sources,
+                        pair_sources - part.target_indices) % n
+        tree_hops = np.zeros(len(part), dtype=np.intp)
+        np.maximum.at(tree_hops, group_ids, hops)
+
+        # Clockwise trees use cw links source.., counter-clockwise ones ccw links ..source
+        _circular_add(traffic_cw, part.sources[clockwise], tree_hops[clockwise], load)
+        _circular_add(traffic_ccw, (part.sources[~clockwise] - tree_hops[~clockwise] + 1) % n,
+                      tree_hops[~clockwise], load)
+        state.cw_utilization[:] = base_cw + traffic_cw
+        state.ccw_utilization[:] = base_ccw + traffic_ccw
+        state.mark_changed()
+
+        current.requests += len(part)
+        current.targets += len(part.target_indices)
+        current.cost += float(costs.sum())
+        current.score += float(scores.sum())
+        current.spf_length += int(spf_lengths.sum())
+        current.clockwise += int(clockwise.sum())
+        current.tree_hops += int(tree_hops.sum())
+
+    if current is not None:
+        yield current.row(state)
+    state.push_to_graph()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay multicast traces on an ONoC ring")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help="convert a text trace to the binary layout")
+    convert.add_argument('trace')
+    convert.add_argument('output')
+    convert.add_argument('--chunk-size', type=int, default=65536)
+
+    run = commands.add_parser('replay', help="replay a trace and write per-window aggregates")
+    run.add_argument('trace', help="text trace file or binary trace directory")
+    run.add_argument('--nodes', type=int, required=True)
+    run.add_argument('--profile', choices=sorted(PROFILES), default='gaussian')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--wc', type=float, default=0.7)
+    run.add_argument('--window', type=float, required=True)
+    run.add_argument('--load', type=float, default=1.0)
+    run.add_argument('--decay', type=float, default=0.0)
+    run.add_argument('--chunk-size', type=int, default=65536)
+    run.add_argument('--batch-size', type=int, default=64,
+                     help="requests routed against the same state")
+    run.add_argument('--output', default=None, help="CSV file for the window aggregates")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == 'convert':
+        count = convert_text_trace(args.trace, args.output, args.chunk_size)
+        logging.info(f"Converted {count} requests to {args.output}")
+        return
+
+    state = create_ring_state(args.nodes, np.random.default_rng(args.seed), args.profile)
+    windows = replay(state, read_trace(args.trace, args.chunk_size), args.wc, 1 - args.wc,
+                     args.window, args.load, args.decay, batch_size=args.batch_size)
+    output = None
+    try:
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            output = open(args.output, 'w', newline='')
+            writer = csv.DictWriter(output, fieldnames=WINDOW_FIELDS)
+            writer.writeheader()
+        for row in windows:
+            logging.info(f"Window [{row['window_start']:g}, {row['window_end']:g}): "
+                         f"{row['requests']} requests, cost {row['tempcon_cost']:.2f}, "
+                         f"max link utilization {row['max_link_utilization']:.1f}")
+            if output:
+                writer.writerow(row)
+                output.flush()
+    finally:
+        if output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import numpy as np
+from src.core.arcs import RingArc
+
+POLICIES = ('first_fit', 'most_used', 'thermal')
+
+
+def _unpack(words, num_channels):
+    """Expands bitset words (last axis) into a boolean array of channels."""
+    bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1, bitorder='little')
+    return bits[..., :num_channels].astype(bool)
+
+
+class WavelengthAllocator:
+    """Per-link WDM channel occupancy of a ring, stored as uint64 bitsets.
+
+    Clockwise link ``i`` carries ``i -> i + 1`` and counter-clockwise link
+    ``i`` carries ``i -> i - 1``, as in ``RingState``. Each link owns
+    ``ceil(num_channels / 64)`` words, bit ``c`` of the row being channel
+    ``c``. A multicast tree (all arcs chosen for one source) needs one
+    channel that is free on every link of the tree; the channels free on
+    an arc are the bitwise AND of its links' free masks.
+    """
+
+    def __init__(self, num_nodes, num_channels=64, channel_spacing=0.8, lambda_o=1550,
+                 alpha=1.86e-4, T_o=25):
+        if num_nodes < 3:
+            raise ValueError("A ring needs at least 3 nodes")
+        if num_channels < 1:
+            raise ValueError("At least one channel is required")
+
+        self.num_nodes = num_nodes
+        self.num_channels = num_channels
+        # Thermal drift model for the 'thermal' policy, see calculate_temperature
+        self.channel_spacing = channel_spacing
+        self.lambda_o = lambda_o
+        self.alpha = alpha
+        self.T_o = T_o
+
+        words = (num_channels + 63) // 64
+        self.cw = np.zeros((num_nodes, words), dtype=np.uint64)
+        self.ccw = np.zeros((num_nodes, words), dtype=np.uint64)
+        self.mask = np.full(words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if num_channels % 64:
+            self.mask[-1] = np.uint64((1 << (num_channels % 64)) - 1)
+
+        self.channel_usage = np.zeros(num_channels, dtype=np.int64)
+        self.allocations = {}
+        self.requests = 0
+        self.blocked = 0
+
+    def arc_links(self, source, target, clockwise):
+        """Link indices of an arc, in its own direction's link array."""
+        if clockwise:
+            hops = (target - source) % self.num_nodes
+            return (source + np.arange(hops)) % self.num_nodes
+        # Counter-clockwise links source -> source-1, ..., target+1 -> target
+        hops = (source - target) % self.num_nodes
+        return (target + 1 + np.arange(hops)) % self.num_nodes
+
+    def tree_links(self, paths):
+        """Unique (clockwise, counter-clockwise) links used by a set of arcs."""
+        cw, ccw = [np.zeros(0, dtype=np.intp)], [np.zeros(0, dtype=np.intp)]
+        for path in paths:
+            if not isinstance(path, RingArc):
+                path = self._as_arc(path)
+            links = self.arc_links(path.source, path.target, path.clockwise)
+            (cw if path.clockwise else ccw).append(links)
+        return np.unique(np.concatenate(cw)), np.unique(np.concatenate(ccw))
+
+    def _as_arc(self, path):
+        path = list(path)
+        if len(path) < 2:
+            return RingArc(path[0], path[0], True, self.num_nodes)
+        clockwise = (path[1] - path[0]) % self.num_nodes == 1
+        arc = RingArc(path[0], path[-1], clockwise, self.num_nodes)
+        if arc != path:
+            raise ValueError("Path is not a ring arc")
+        return arc
+
+    def occupied(self, cw_links, ccw_links):
+        """Bitset of channels in use on any of the given links (bitwise OR)."""
+        return (np.bitwise_or.reduce(self.cw[cw_links], axis=0) |
+                np.bitwise_or.reduce(self.ccw[ccw_links], axis=0))
+
+    def free(self, cw_links, ccw_links):
+        """Bitset of channels free on all of the given links.
+
+        The AND of the links' free masks, computed as the complement of the
+        OR of their occupancy.
+        """
+        return ~self.occupied(cw_links, ccw_links) & self.mask
+
+    def arc_free_channels(self, source, target, clockwise):
+        """Boolean array of the channels free along one arc."""
+        links = self.arc_links(source, target, clockwise)
+        empty = np.zeros(0, dtype=np.intp)
+        words = self.free(links, empty) if clockwise else self.free(empty, links)
+        return _unpack(words, self.num_channels)
+
+    def drift_channels(self, temperature):
+        """Number of channel spacings a resonance drifts at ``temperature``."""
+        delta_lambda = max(temperature - self.T_o, 0.0) * self.lambda_o * self.alpha
+        return int(np.ceil(delta_lambda / self.channel_spacing))
+
+    def choose(self, free, policy='first_fit', temperature=None):
+        """Picks a channel from a boolean free-channel array, or None if blocked.
+
+        - ``first_fit``: the lowest free channel
+        - ``most_used``: the free channel already used on the most links,
+          packing load onto few channels
+        - ``thermal``: the lowest channel whose thermal drift range at
+          ``temperature`` (the hottest node of the tree) is free as well,
+          falling back to first fit
+        """
+        candidates = np.flatnonzero(free)
+        if not len(candidates):
+            return None
+        if policy == 'first_fit':
+            return int(candidates[0])
+        if policy == 'most_used':
+            # argmax returns the lowest channel among equally used ones
+            return int(candidates[np.argmax(self.channel_usage[candidates])])
+        if policy == 'thermal':
+            if temperature is None:
+                raise ValueError("The thermal policy needs the tree temperature")
+            window = self.drift_channels(temperature) + 1
+            # A channel fits if it and the next window-1 channels are all free
+            run = np.concatenate(([0], np.cumsum(free)))
+            fits = np.flatnonzero(run[window:] - run[:-window] == window) if window <= len(free) else []
+            return int(fits[0]) if len(fits) else int(candidates[0])
+        raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+
+    def allocate(self, request_id, paths, policy='first_fit', temperature=None):
+        """Assigns one channel to all arcs of a multicast tree.
+
+        ``temperature`` is a node temperature array, needed by the thermal
+        policy. Returns the channel, or None if the request is blocked.
+        """
+        if request_id in self.allocations:
+            raise ValueError(f"Request {request_id} is already allocated")
+        paths = list(paths)
+        cw_links, ccw_links = self.tree_links(paths)
+        tree_temperature = None
+        if policy == 'thermal':
+            if temperature is None:
+                raise ValueError("The thermal policy needs node temperatures")
+            nodes = np.concatenate([np.asarray(path, dtype=np.intp) for path in paths])
+            tree_temperature = float(np.asarray(temperature)[nodes].max())
+
+        self.requests += 1
+        free = _unpack(self.free(cw_links, ccw_links), self.num_channels)
+        channel = self.choose(free, policy, tree_temperature)
+        if channel is None:
+            self.blocked += 1
+            return None
+
+        word, bit = divmod(channel, 64)
+        self.cw[cw_links, word] |= np.uint64(1 << bit)
+        self.ccw[ccw_links, word] |= np.uint64(1 << bit)
+        self.channel_usage[channel] += len(cw_links) + len(ccw_links)
+        self.allocations[request_id] = (channel, cw_links, ccw_links)
+        return channel
+
+    def release(self, request_id):
+        """Frees the channel of an allocated request."""
+        channel, cw_links, ccw_links = self.allocations.pop(request_id)
+        word, bit = divmod(channel, 64)
+        self.cw[cw_links, word] &= ~np.uint64(1 << bit)
+        self.ccw[ccw_links, word] &= ~np.uint64(1 << bit)
+        self.channel_usage[channel] -= len(cw_links) + len(ccw_links)
+
+    def assign_multicast(self, paths_dict, policy='first_fit', temperature=None):
+        """Allocates one channel per source tree of a multicast_search result.
+
+        Returns ``{source: channel or None}``; trees are keyed by source.
+        """
+        return {source: self.allocate(source, paths, policy, temperature)
+                for source, paths in paths_dict.items()}
+
+    def link_load(self):
+        """Number of occupied channels per (clockwise, counter-clockwise) link."""
+        return (_unpack(self.cw, self.num_channels).sum(axis=1),
+                _unpack(self.ccw, self.num_channels).sum(axis=1))
+
+    def blocking_probability(self):
+        """Fraction of allocation requests that found no free channel."""
+        return self.blocked / self.requests if self.requests else 0.0
@@ -6,7 +6,7 @@ import os
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.core.main import main
+from src.gui.worker import STAGES, SimulationRunner
 
 def validate_inputs(values):
     """Validates user inputs and returns processed values."""
@@ -19,8 +19,8 @@ def validate_inputs(values):
         targets = [int(x.strip()) for x in values['targets'].split(',')]
         
         # Additional validation
-        if num_nodes < max(sources + targets + [1]):
-            raise ValueError("Node indices must be less than total number of nodes")
+        if num_nodes <= max(sources + targets + [0]) or min(sources + targets) < 0:
+            raise ValueError("Node indices must be between 0 and the number of nodes - 1")
         if partition_size >= num_nodes:
             raise ValueError("Partition size must be less than number of nodes")
         if not (0 <= wc <= 1 and 0 <= wt <= 1 and abs(wc + wt - 1) < 1e-6):
@@ -31,63 +31,143 @@ def validate_inputs(values):
         messagebox.showerror("Input Error", str(e))
         return None
 
+runner = SimulationRunner()
+POLL_INTERVAL_MS = 100
+
 def run_simulation():
-    """Runs the simulation with user-specified parameters."""
-    try:
-        num_nodes = int(entry_nodes.get())
-        partition_size = int(entry_partition.get())
-        wc = float(entry_wc.get())
-        wt = float(entry_wt.get())
-        sources = [int(x.strip()) for x in entry_sources.get().split(',')]
-        targets = [int(x.strip()) for x in entry_targets.get().split(',')]
-        
-        main(num_nodes, partition_size, wc, wt, sources, targets)
-        messagebox.showinfo("Success", "Simulation completed successfully!")
-    except Exception as e:
-        messagebox.showerror("Error", f"Simulation failed: {str(e)}")
-
-# Create main window
-root = tk.Tk()
-root.title("ONoC Ring Topology Simulator")
-
-# Create and pack the main frame
-frame = ttk.Frame(root, padding="10")
-frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-
-# Create input fields with better default values
-ttk.Label(frame, text="Number of Nodes:").grid(column=0, row=0, sticky=tk.W)
-entry_nodes = ttk.Entry(frame, width=20)
-entry_nodes.grid(column=1, row=0)
-entry_nodes.insert(0, "20")
-
-ttk.Label(frame, text="Source Nodes (comma-separated):").grid(column=0, row=1, sticky=tk.W)
-entry_sources = ttk.Entry(frame, width=20)
-entry_sources.grid(column=1, row=1)
-entry_sources.insert(0, "0,10")
-
-ttk.Label(frame, text="Target Nodes (comma-separated):").grid(column=0, row=2, sticky=tk.W)
-entry_targets = ttk.Entry(frame, width=20)
-entry_targets.grid(column=1, row=2)
-entry_targets.insert(0, "5,15")
-
-ttk.Label(frame, text="Partition Size:").grid(column=0, row=3, sticky=tk.W)
-entry_partition = ttk.Entry(frame, width=20)
-entry_partition.grid(column=1, row=3)
-entry_partition.insert(0, "5")
-
-ttk.Label(frame, text="Weight for Congestion (wc):").grid(column=0, row=4, sticky=tk.W)
-entry_wc = ttk.Entry(frame, width=20)
-entry_wc.grid(column=1, row=4)
-entry_wc.insert(0, "0.7")
-
-ttk.Label(frame, text="Weight for Temperature (wt):").grid(column=0, row=5, sticky=tk.W)
-entry_wt = ttk.Entry(frame, width=20)
-entry_wt.grid(column=1, row=5)
-entry_wt.insert(0, "0.3")
-
-# Create the Run button
-run_button = ttk.Button(frame, text="Run Simulation", command=run_simulation)
-run_button.grid(column=0, row=6, columnspan=2, pady=10)
+    """Queues a simulation with the user-specified parameters; it runs in a worker process."""
+    values = validate_inputs({
+        'nodes': entry_nodes.get(), 'partition': entry_partition.get(),
+        'wc': entry_wc.get(), 'wt': entry_wt.get(),
+        'sources': entry_sources.get(), 'targets': entry_targets.get()
+    })
+    if values is None:
+        return
+    job = runner.submit(*values)
+    num_nodes, partition_size, wc, wt, _, _ = values
+    queue_list.insert(tk.END, f"#{job}: {num_nodes} nodes, partition {partition_size}, "
+                              f"wc={wc}, wt={wt} - queued")
+
+def cancel_simulation():
+    """Cancels the running simulation; queued ones still run."""
+    runner.cancel()
+
+def clear_queue():
+    """Removes all simulations that have not started yet."""
+    for job, _ in runner.pending():
+        set_job_status(job, "removed")
+    runner.clear()
+
+def set_job_status(job, status):
+    for index in range(queue_list.size()):
+        entry = queue_list.get(index)
+        if entry.startswith(f"#{job}:"):
+            queue_list.delete(index)
+            queue_list.insert(index, entry.rsplit(" - ", 1)[0] + f" - {status}")
+            return
+
+def show_interactive(result_path):
+    """Opens the interactive view of a finished run in a separate process."""
+    runner.show(result_path)
+
+def poll_runner():
+    """Applies the worker's events to the UI and reschedules itself."""
+    # Reschedule first: error dialogs below run a nested event loop
+    root.after(POLL_INTERVAL_MS, poll_runner)
+    for job, kind, payload in runner.poll():
+        if kind == 'started':
+            progress['value'] = 0
+            status.set(f"Running simulation #{job}...")
+            set_job_status(job, "running")
+        elif kind == 'stage':
+            progress['value'] = STAGES.index(payload) if payload in STAGES else progress['value']
+            status.set(f"Simulation #{job}: {payload}")
+        elif kind == 'done':
+            progress['value'] = len(STAGES)
+            status.set(f"Simulation #{job} completed (TempCon score {payload['tempcon_score']:.2f}, "
+                       f"SPF score {payload['spf_score']:.2f})")
+            set_job_status(job, "done")
+            if show_view.get():
+                show_interactive(payload['result_path'])
+        elif kind == 'cancelled':
+            progress['value'] = 0
+            status.set(f"Simulation #{job} cancelled")
+            set_job_status(job, "cancelled")
+        elif kind == 'error':
+            progress['value'] = 0
+            status.set(f"Simulation #{job} failed")
+            set_job_status(job, "failed")
+            messagebox.showerror("Error", f"Simulation #{job} failed: {payload}")
+    cancel_button.state(['!disabled'] if runner.busy else ['disabled'])
+
+def close():
+    runner.shutdown()
+    root.destroy()
 
 if __name__ == "__main__":
+    # The window is only built when run as a script: worker processes
+    # re-import this module and must not open one.
+    # Create main window
+    root = tk.Tk()
+    root.title("ONoC Ring Topology Simulator")
+
+    # Create and pack the main frame
+    frame = ttk.Frame(root, padding="10")
+    frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+    # Create input fields with better default values
+    ttk.Label(frame, text="Number of Nodes:").grid(column=0, row=0, sticky=tk.W)
+    entry_nodes = ttk.Entry(frame, width=20)
+    entry_nodes.grid(column=1, row=0)
+    entry_nodes.insert(0, "20")
+
+    ttk.Label(frame, text="Source Nodes (comma-separated):").grid(column=0, row=1, sticky=tk.W)
+    entry_sources = ttk.Entry(frame, width=20)
+    entry_sources.grid(column=1, row=1)
+    entry_sources.insert(0, "0,10")
+
+    ttk.Label(frame, text="Target Nodes (comma-separated):").grid(column=0, row=2, sticky=tk.W)
+    entry_targets = ttk.Entry(frame, width=20)
+    entry_targets.grid(column=1, row=2)
+    entry_targets.insert(0, "5,15")
+
+    ttk.Label(frame, text="Partition Size:").grid(column=0, row=3, sticky=tk.W)
+    entry_partition = ttk.Entry(frame, width=20)
+    entry_partition.grid(column=1, row=3)
+    entry_partition.insert(0, "5")
+
+    ttk.Label(frame, text="Weight for Congestion (wc):").grid(column=0, row=4, sticky=tk.W)
+    entry_wc = ttk.Entry(frame, width=20)
+    entry_wc.grid(column=1, row=4)
+    entry_wc.insert(0, "0.7")
+
+    ttk.Label(frame, text="Weight for Temperature (wt):").grid(column=0, row=5, sticky=tk.W)
+    entry_wt = ttk.Entry(frame, width=20)
+    entry_wt.grid(column=1, row=5)
+    entry_wt.insert(0, "0.3")
+
+    show_view = tk.BooleanVar(value=True)
+    ttk.Checkbutton(frame, text="Show interactive view when done",
+                    variable=show_view).grid(column=0, row=6, columnspan=2, sticky=tk.W)
+
+    # Create the Run, Cancel and Clear buttons
+    buttons = ttk.Frame(frame)
+    buttons.grid(column=0, row=7, columnspan=2, pady=10)
+    run_button = ttk.Button(buttons, text="Run Simulation", command=run_simulation)
+    run_button.grid(column=0, row=0, padx=2)
+    cancel_button = ttk.Button(buttons, text="Cancel", command=cancel_simulation, state='disabled')
+    cancel_button.grid(column=1, row=0, padx=2)
+    ttk.Button(buttons, text="Clear Queue", command=clear_queue).grid(column=2, row=0, padx=2)
+
+    # Progress of the running simulation and the queue of submitted ones
+    progress = ttk.Progressbar(frame, maximum=len(STAGES), length=300)
+    progress.grid(column=0, row=8, columnspan=2, sticky=(tk.W, tk.E))
+    status = tk.StringVar(value="Idle")
+    ttk.Label(frame, textvariable=status).grid(column=0, row=9, columnspan=2, sticky=tk.W)
+    queue_list = tk.Listbox(frame, height=6, width=60)
+    queue_list.grid(column=0, row=10, columnspan=2, pady=(5, 0), sticky=(tk.W, tk.E))
+
+    root.protocol("WM_DELETE_WINDOW", close)
+
+    root.after(POLL_INTERVAL_MS, poll_runner)
     root.mainloop()
@@ -0,0 +1,149 @@
+"""Runs GUI simulations in a separate process so the Tk event loop never blocks.
+
+Each queued configuration is run by ``main()`` in its own process (rendering
+with the Agg backend), which reports its stages, result or error through a
+multiprocessing queue. The GUI polls ``SimulationRunner.poll`` from
+``root.after``; cancelling terminates the process. The interactive view of
+a finished run also gets its own process, since ``plt.show()`` blocks
+until its window is closed.
+"""
+import itertools
+import multiprocessing
+import queue
+from collections import deque
+
+STAGES = ('topology', 'partition', 'tempcon', 'spf', 'save_result', 'render', 'save_csv')
+"""Stages a GUI run goes through, in order, for progress reporting."""
+
+
+def _run(config, messages):
+    import matplotlib
+    matplotlib.use('Agg')
+    from src.core.main import main
+
+    try:
+        result = main(config['num_nodes'], config['partition_size'], config['wc'], config['wt'],
+                      config['sources'], config['targets'], render=True, interactive=False,
+                      save_csv=True, result_path=config['result_path'],
+                      progress=lambda name: messages.put(('stage', name)))
+        messages.put(('done', {
+            'result_path': config['result_path'],
+            'tempcon_score': float(sum(sum(scores) for scores in result.scores_tempcon.values())),
+            'spf_score': float(sum(sum(scores) for scores in result.scores_spf.values())),
+        }))
+    except Exception as e:
+        messages.put(('error', f"{type(e).__name__}: {e}"))
+
+
+def _show(result_path):
+    from src.core.main import load_result
+    from src.visualization.visualizer import create_interactive_visualization
+    result = load_result(result_path)
+    create_interactive_visualization(result.ring, result.paths_tempcon, result.paths_spf,
+                                     result.sources, result.targets)
+
+
+class SimulationRunner:
+    """Runs queued simulation configurations one at a time, each in its own process.
+
+    ``poll`` returns the events since the last call as ``(job, kind,
+    payload)`` tuples, where kind is one of ``'started'``, ``'stage'``,
+    ``'done'``, ``'error'`` or ``'cancelled'``, and starts the next job
+    once the current one has finished.
+    """
+
+    def __init__(self, result_dir='results/gui'):
+        self.result_dir = result_dir
+        self._context = multiprocessing.get_context('spawn')
+        self._jobs = itertools.count(1)
+        self._pending = deque()
+        self._current = None
+        self._process = None
+        self._messages = None
+        self._viewers = []
+
+    @property
+    def busy(self):
+        return self._current is not None
+
+    def pending(self):
+        """Queued (job, config) pairs that have not started yet."""
+        return list(self._pending)
+
+    def submit(self, num_nodes, partition_size, wc, wt, sources, targets):
+        """Queues a configuration and returns its job id."""
+        job = next(self._jobs)
+        self._pending.append((job, {
+            'num_nodes': num_nodes, 'partition_size': partition_size, 'wc': wc, 'wt': wt,
+            'sources': list(sources), 'targets': list(targets),
+            'result_path': f"{self.result_dir}/run_{job}.npz",
+        }))
+        return job
+
+    def cancel(self):
+        """Terminates the running job; its 'cancelled' event is reported by the next poll."""
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+
+    def clear(self):
+        """Drops all queued jobs that have not started."""
+        self._pending.clear()
+
+    def show(self, result_path):
+        """Opens the interactive view of a saved result in its own process."""
+        self._viewers = [viewer for viewer in self._viewers if viewer.is_alive()]
+        viewer = self._context.Process(target=_show, args=(result_path,), daemon=True)
+        viewer.start()
+        self._viewers.append(viewer)
+
+    def shutdown(self):
+        self.clear()
+        self.cancel()
+        if self._process is not None:
+            self._process.join()
+        for viewer in self._viewers:
+            viewer.terminate()
+            viewer.join()
+        self._viewers = []
+
+    def poll(self):
+        events = []
+        if self._current is not None:
+            events.extend(self._collect())
+        if self._current is None and self._pending:
+            job, config = self._pending.popleft()
+            self._messages = self._context.Queue()
+            self._process = self._context.Process(target=_run, args=(config, self._messages),
+                                                  daemon=True)
+            self._process.start()
+            self._current = job
+            events.append((job, 'started', config))
+        return events
+
+    def _collect(self):
+        job = self._current
+        # Check liveness before draining, so a finished process's last message is not missed
+        alive = self._process.is_alive()
+        events = []
+        finished = False
+        while True:
+            try:
+                kind, payload = self._messages.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                break
+            events.append((job, kind, payload))
+            finished = finished or kind in ('done', 'error')
+
+        if not finished and not alive:
+            self._process.join()
+            if self._process.exitcode < 0:
+                events.append((job, 'cancelled', None))
+            else:
+                events.append((job, 'error', f"Worker exited with code {self._process.exitcode}"))
+            finished = True
+
+        if finished:
+            self._process.join()
+            self._messages.close()
+            self._current = self._process = self._messages = None
+        return events
@@ -0,0 +1,250 @@
+"""Benchmarks for the routing, scoring and reporting hot paths.
+
+Usage:
+
+    python -m src.test.benchmark run --sizes 64 1024 16384 --fanouts 4 64 \
+        --output results/benchmarks/current.json
+    python -m src.test.benchmark compare results/benchmarks/base.json \
+        results/benchmarks/current.json --threshold 0.1
+
+Every case is set up from a fixed seed, warmed up, and then timed with
+``time.perf_counter`` in samples of enough calls to last at least
+``--min-time`` seconds. Results are written as JSON together with the
+interpreter, library versions and git commit, so runs of different
+versions can be compared with ``compare``.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.core.metrics import calculate_path_score
+from src.core.routing import batch_multicast_search, multicast_search, shortest_path_first, targets_to_csr
+from src.core.topology import create_ring_topology, partition_nodes
+
+
+@contextlib.contextmanager
+def _scratch_directory():
+    """Runs the metric writers in a throwaway working directory."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(cwd)
+
+
+def _case(size, fanout, seed=0):
+    rng = np.random.default_rng(seed)
+    ring = create_ring_topology(size, rng)
+    sources = rng.choice(size, 2, replace=False).tolist()
+    targets = rng.choice(size, min(fanout, size), replace=False).tolist()
+    return ring, sources, targets
+
+
+def bench_create_ring_topology(size, fanout):
+    return lambda: create_ring_topology(size, np.random.default_rng(0))
+
+
+def bench_partition_nodes(size, fanout):
+    ring, _, _ = _case(size, fanout)
+    return lambda: partition_nodes(ring, 4)
+
+
+def bench_calculate_path_score(size, fanout):
+    ring, sources, _ = _case(size, fanout)
+    path = [(sources[0] + k) % size for k in range(size // 2 + 1)]
+    return lambda: calculate_path_score(ring, path, 0.7, 0.3)
+
+
+def bench_multicast_search(size, fanout):
+    ring, sources, targets = _case(size, fanout)
+    return lambda: multicast_search(ring, sources, targets, 0.7, 0.3)
+
+
+def bench_batch_multicast_search(size, fanout):
+    ring, sources, targets = _case(size, fanout)
+    indptr, indices = targets_to_csr([targets] * len(sources))
+    return lambda: batch_multicast_search(ring, sources, indptr, indices, 0.7, 0.3)
+
+
+def bench_shortest_path_first(size, fanout):
+    ring, sources, targets = _case(size, fanout)
+    return lambda: shortest_path_first(ring, sources, targets)
+
+
+def bench_save_simulation_metrics(size, fanout):
+    from src.visualization.visualizer import save_simulation_metrics
+    ring, sources, targets = _case(size, fanout)
+    paths_tempcon, _ = multicast_search(ring, sources, targets, 0.7, 0.3)
+    paths_spf, _ = shortest_path_first(ring, sources, targets)
+    return lambda: save_simulation_metrics(ring, paths_tempcon, paths_spf, 0.7, 0.3)
+
+
+def bench_save_node_partition_metrics(size, fanout):
+    from src.visualization.visualizer import save_node_partition_metrics
+    ring, _, _ = _case(size, fanout)
+    partitions = partition_nodes(ring, 4)
+    return lambda: save_node_partition_metrics(ring, partitions)
+
+
+BENCHMARKS = {
+    'create_ring_topology': (bench_create_ring_topology, False),
+    'partition_nodes': (bench_partition_nodes, False),
+    'calculate_path_score': (bench_calculate_path_score, False),
+    'multicast_search': (bench_multicast_search, True),
+    'batch_multicast_search': (bench_batch_multicast_search, True),
+    'shortest_path_first': (bench_shortest_path_first, True),
+    'save_simulation_metrics': (bench_save_simulation_metrics, True),
+    'save_node_partition_metrics': (bench_save_node_partition_metrics, False),
+}
+"""Benchmark name -> (setup function, whether it depends on the fan-out)."""
+
+
+def time_callable(function, warmup=2, repeat=7, min_time=0.005):
+    """Times ``function`` and returns per-call statistics in seconds.
+
+    After ``warmup`` untimed calls, the number of calls per sample is
+    doubled until a sample takes at least ``min_time``; ``repeat`` samples
+    are then taken.
+    """
+    for _ in range(warmup):
+        function()
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        samples.append((time.perf_counter() - start) / loops)
+
+    return {
+        'loops': loops,
+        'samples': samples,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def _environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    import networkx
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'networkx': networkx.__version__,
+        'commit': commit or None,
+    }
+
+
+def run_benchmarks(sizes, fanouts, names=None, warmup=2, repeat=7, min_time=0.005):
+    """Runs the selected benchmarks over all sizes (and fan-outs) and returns the report."""
+    names = names or list(BENCHMARKS)
+    results = []
+    with _scratch_directory():
+        for name in names:
+            setup, uses_fanout = BENCHMARKS[name]
+            for size in sizes:
+                for fanout in (fanouts if uses_fanout else [None]):
+                    function = setup(size, fanout or 1)
+                    stats = time_callable(function, warmup, repeat, min_time)
+                    results.append(dict(name=name, size=size, fanout=fanout, **stats))
+                    print(f"{name:<28} size={size:<7} fanout={str(fanout):<5} "
+                          f"median={stats['median'] * 1e3:10.4f} ms")
+    return {'environment': _environment(), 'results': results}
+
+
+def compare(baseline, current, threshold=0.1):
+    """Compares two reports by median time; returns (rows, regressions).
+
+    A case regresses when its median grows by more than ``threshold``
+    (relative) over the baseline.
+    """
+    def key(result):
+        return result['name'], result['size'], result['fanout']
+
+    base = {key(result): result for result in baseline['results']}
+    rows, regressions = [], []
+    for result in current['results']:
+        before = base.get(key(result))
+        if before is None:
+            continue
+        ratio = result['median'] / before['median']
+        row = key(result) + (before['median'], result['median'], ratio)
+        rows.append(row)
+        if ratio > 1 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ONoC ring routing benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run benchmarks and write a JSON report")
+    run.add_argument('--sizes', type=int, nargs='+', default=[64, 1024, 16384])
+    run.add_argument('--fanouts', type=int, nargs='+', default=[4, 64])
+    run.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=None)
+    run.add_argument('--warmup', type=int, default=2)
+    run.add_argument('--repeat', type=int, default=7)
+    run.add_argument('--min-time', type=float, default=0.005)
+    run.add_argument('--output', default=None)
+
+    diff = commands.add_parser('compare', help="compare two JSON reports")
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    diff.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        report = run_benchmarks(args.sizes, args.fanouts, args.only, args.warmup, args.repeat,
+                                args.min_time)
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressions = compare(baseline, current, args.threshold)
+    for name, size, fanout, before, after, ratio in rows:
+        flag = '  REGRESSION' if ratio > 1 + args.threshold else ''
+        print(f"{name:<28} size={size:<7} fanout={str(fanout):<5} "
+              f"{before * 1e3:10.4f} ms -> {after * 1e3:10.4f} ms  x{ratio:5.2f}{flag}")
+    print(f"{len(regressions)} of {len(rows)} cases regressed by more than {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
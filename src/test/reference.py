@@ -0,0 +1,71 @@
+"""Straightforward reference implementations the tests compare against.
+
+These are the original NetworkX routing and scoring functions: they read
+every value from the graph's attribute dicts and build every path as a
+list, so they are slow but easy to check by eye.
+"""
+import numpy as np
+
+
+def congestion(graph, path):
+    """Total link utilization along path."""
+    total = 0.0
+    for u, v in zip(path[:-1], path[1:]):
+        if not graph.has_edge(u, v):
+            raise ValueError(f"Invalid path: no edge between {u} and {v}")
+        total += graph[u][v].get('utilization', 0.0)
+    return total
+
+
+def path_score(graph, path, wc, wt):
+    """Weighted, normalized congestion and temperature score of path."""
+    temperature = sum(graph.nodes[node]['temperature'] for node in path)
+    avg_congestion = np.mean([graph[u][v].get('utilization', 0.0) for u, v in graph.edges])
+    avg_temperature = np.mean([graph.nodes[n]['temperature'] for n in graph.nodes])
+    return (wc * congestion(graph, path) / (len(path) * avg_congestion) +
+            wt * temperature / (len(path) * avg_temperature))
+
+
+def clockwise_path(graph, start, end):
+    path = [start]
+    while path[-1] != end:
+        path.append((path[-1] + 1) % len(graph))
+    return path
+
+
+def counter_clockwise_path(graph, start, end):
+    path = [start]
+    while path[-1] != end:
+        path.append((path[-1] - 1) % len(graph))
+    return path
+
+
+def multicast_search(graph, sources, targets, wc, wt):
+    """Routes each source to all targets in the direction with the lower total score."""
+    paths_dict = {}
+    scores_dict = {}
+    for source in sources:
+        clock_paths = [clockwise_path(graph, source, target) for target in targets]
+        counter_paths = [counter_clockwise_path(graph, source, target) for target in targets]
+        clock_scores = [path_score(graph, path, wc, wt) for path in clock_paths]
+        counter_scores = [path_score(graph, path, wc, wt) for path in counter_paths]
+        if sum(clock_scores) <= sum(counter_scores):
+            paths_dict[source], scores_dict[source] = clock_paths, clock_scores
+        else:
+            paths_dict[source], scores_dict[source] = counter_paths, counter_scores
+    return paths_dict, scores_dict
+
+
+def shortest_path_first(graph, sources, targets):
+    """Routes each source to all targets in the direction with fewer total nodes."""
+    paths_dict = {}
+    scores_dict = {}
+    for source in sources:
+        clock_paths = [clockwise_path(graph, source, target) for target in targets]
+        counter_paths = [counter_clockwise_path(graph, source, target) for target in targets]
+        if sum(map(len, clock_paths)) <= sum(map(len, counter_paths)):
+            paths_dict[source] = clock_paths
+        else:
+            paths_dict[source] = counter_paths
+        scores_dict[source] = [len(path) for path in paths_dict[source]]
+    return paths_dict, scores_dict
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+from src.core.admission import RangeMaxTree, ThermalAdmissionRouter
+from src.core.ring_state import RingState
+
+
+def make_state(num_nodes=20, seed=30):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes))
+
+
+def arc_nodes(n, source, target, clockwise):
+    step = 1 if clockwise else -1
+    nodes = [source]
+    while nodes[-1] != target:
+        nodes.append((nodes[-1] + step) % n)
+    return nodes
+
+
+def expected_temperature(router, initial, injected):
+    """Node temperatures rebuilt from the initial state, injected heat and the active flows."""
+    temperature = initial + injected
+    for source, target, clockwise, load in router.flows.values():
+        temperature[arc_nodes(router.num_nodes, source, target, clockwise)] += \
+            load * router.heat_per_load
+    return temperature
+
+
+def test_range_max_tree_matches_a_plain_array():
+    rng = np.random.default_rng(31)
+    values = rng.uniform(0, 10, 13)
+    tree = RangeMaxTree(values)
+    for _ in range(400):
+        start, count = int(rng.integers(0, 13)), int(rng.integers(1, 14))
+        positions = (start + np.arange(count)) % 13
+        if rng.random() < 0.5:
+            delta = float(rng.uniform(-5, 5))
+            tree.add_circular(start, count, delta)
+            values[positions] += delta
+        else:
+            assert tree.max_circular(start, count) == pytest.approx(values[positions].max())
+        stop = int(rng.integers(start, 14))
+        expected = values[start:stop].max() if stop > start else -np.inf
+        assert tree.max(start, stop) == pytest.approx(expected)
+        threshold = float(rng.uniform(values.min(), values.max()))
+        assert tree.above(threshold).tolist() == np.flatnonzero(values > threshold).tolist()
+
+
+@pytest.mark.parametrize('policy', ['reject', 'defer'])
+def test_admitted_flows_stay_within_the_limit(policy):
+    state = make_state()
+    initial = state.temperature.copy()
+    injected = np.zeros(20)
+    router = ThermalAdmissionRouter(state, 0.5, 0.5, limit=65.0, policy=policy, heat_per_load=2.0)
+    rng = np.random.default_rng(32)
+    arrivals = displaced = 0
+
+    for flow_id in range(600):
+        action = rng.random()
+        if action < 0.6:
+            source, target = rng.integers(0, 20, 2).tolist()
+            path = router.arrive(flow_id, source, target, float(rng.uniform(1, 5)))
+            arrivals += 1
+            assert (path is not None) == (flow_id in router.flows)
+        elif action < 0.9:
+            active = list(router.flows) + list(router.deferred)
+            if active:
+                for admitted_id, _ in router.depart(active[rng.integers(len(active))]):
+                    assert admitted_id in router.flows
+        else:
+            nodes = np.unique(rng.integers(0, 20, 3))
+            delta = float(rng.uniform(-10, 15))
+            router.heat(nodes, delta)
+            injected[nodes] += delta
+            report = router.reroute_hotspots()
+            displaced += report['displaced']
+            assert report['affected'] == (report['rerouted'] + report['unchanged'] +
+                                          report['displaced'])
+
+        temperature = expected_temperature(router, initial, injected)
+        for node in range(20):
+            assert router.arc_temperature(node, node, True) == pytest.approx(temperature[node])
+        for source, target, clockwise, _ in router.flows.values():
+            assert temperature[arc_nodes(20, source, target, clockwise)].max() <= 65.0 + 1e-9
+        counts = router.counts
+        assert counts['admitted'] + counts['rejected'] + counts['deferred'] == arrivals
+
+    assert displaced > 0
+    assert counts['rejected' if policy == 'reject' else 'deferred'] > 0
+    if policy == 'defer':
+        assert counts['admitted_after_defer'] > 0
+    else:
+        assert not router.deferred and counts['deferred'] == 0
+
+
+def test_departing_every_flow_restores_the_initial_state():
+    state = make_state()
+    initial = [state.temperature.copy(), state.congestion.copy(), state.cw_utilization.copy(),
+               state.ccw_utilization.copy()]
+    router = ThermalAdmissionRouter(state, 0.7, 0.3, limit=60.0, policy='defer',
+                                    heat_per_load=2.0)
+    rng = np.random.default_rng(33)
+    for flow_id in range(200):
+        source, target = rng.integers(0, 20, 2).tolist()
+        router.arrive(flow_id, source, target, float(rng.uniform(1, 5)))
+    assert router.flows and router.deferred
+    while router.flows or router.deferred:
+        router.depart(next(iter(router.flows or router.deferred)))
+
+    np.testing.assert_allclose(router.link_load(), 0.0, atol=1e-9)
+    assert not len(router.hot_nodes())
+    router.sync_state()
+    for value, expected in zip([state.temperature, state.congestion, state.cw_utilization,
+                                state.ccw_utilization], initial):
+        np.testing.assert_allclose(value, expected)
+
+
+def test_deferred_flow_is_admitted_once_heat_is_freed():
+    state = RingState(8, np.full(8, 40.0), np.full(8, 30.0), np.full(8, 30.0))
+    router = ThermalAdmissionRouter(state, 0.5, 0.5, limit=50.0, policy='defer', heat_per_load=1.0)
+    assert router.arrive('a', 0, 4, 6.0) is not None
+    # Either direction of 2 -> 6 crosses nodes that 'a' heated to 46
+    assert router.arrive('c', 2, 6, 6.0) is None
+    assert list(router.deferred) == ['c']
+    assert [flow_id for flow_id, _ in router.depart('a')] == ['c']
+    assert not router.deferred and 'c' in router.flows
+    assert router.counts == {'admitted': 2, 'rejected': 0, 'deferred': 0,
+                             'admitted_after_defer': 1}
+
+    # Cooling from outside frees the heat as well
+    assert router.arrive('d', 2, 6, 6.0) is None
+    router.heat(range(8), -10.0)
+    assert [flow_id for flow_id, _ in router.retry_deferred()] == ['d']
+    assert router.counts['admitted'] == 3 and router.counts['deferred'] == 0
+    with pytest.raises(ValueError):
+        router.arrive('d', 1, 2)
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from src.core.arcs import RingArc, RingArcIndex
+from src.core.metrics import calculate_arc_scores, calculate_path_score
+from src.core.ring_state import RingState
+from src.core.routing import multicast_search, shortest_path_first
+from src.test import reference
+
+
+def make_state(num_nodes=13, seed=1):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes))
+
+
+@pytest.mark.parametrize('clockwise', [True, False])
+def test_ring_arc_behaves_like_the_node_list(clockwise):
+    n = 7
+    walk = reference.clockwise_path if clockwise else reference.counter_clockwise_path
+    for source in range(n):
+        for target in range(n):
+            arc = RingArc(source, target, clockwise, n)
+            nodes = walk(range(n), source, target)
+            assert list(arc) == nodes
+            assert arc == nodes
+            assert len(arc) == len(nodes)
+            assert arc[-1] == target and arc[1:3] == nodes[1:3]
+            np.testing.assert_array_equal(np.asarray(arc), nodes)
+    with pytest.raises(IndexError):
+        RingArc(0, 2, True, n)[3]
+
+
+def test_index_matches_brute_force_sums():
+    state = make_state()
+    graph = state.to_graph()
+    index = RingArcIndex(state)
+    n = state.num_nodes
+    for clockwise, walk in ((True, reference.clockwise_path),
+                            (False, reference.counter_clockwise_path)):
+        for source in range(n):
+            for target in range(n):
+                nodes = walk(graph, source, target)
+                assert index.hops(source, target, clockwise) == len(nodes) - 1
+                assert (index.congestion(source, target, clockwise) ==
+                        pytest.approx(reference.congestion(graph, nodes)))
+                assert (index.temperature(source, target, clockwise) ==
+                        pytest.approx(sum(state.temperature[nodes])))
+
+
+def test_index_answers_arrays_of_endpoints():
+    state = make_state()
+    index = RingArcIndex(state)
+    sources = np.array([0, 5, 12, 3])
+    targets = np.array([9, 5, 1, 2])
+    for clockwise in (True, False):
+        expected = [index.congestion(s, t, clockwise) for s, t in zip(sources, targets)]
+        np.testing.assert_allclose(index.congestion(sources, targets, clockwise), expected)
+
+
+def test_state_rebuilds_a_stale_index():
+    state = make_state()
+    before = state.arc_index()
+    assert state.arc_index() is before
+    state.set_utilization(2, 100.0)
+    after = state.arc_index()
+    assert after is not before
+    assert after.congestion(2, 3, True) == 100.0
+
+
+def test_arc_scores_match_path_scores():
+    state = make_state()
+    graph = state.to_graph()
+    targets = list(range(state.num_nodes))
+    for clockwise in (True, False):
+        scores = calculate_arc_scores(graph, 4, targets, clockwise, 0.7, 0.3)
+        for target, score in zip(targets, scores):
+            arc = RingArc(4, target, clockwise, state.num_nodes)
+            assert score == pytest.approx(reference.path_score(graph, list(arc), 0.7, 0.3))
+            assert score == pytest.approx(calculate_path_score(graph, arc, 0.7, 0.3))
+
+
+def test_routing_matches_the_reference():
+    state = make_state(40, seed=2)
+    graph = state.to_graph()
+    sources, targets = [0, 13, 27], [5, 20, 33, 39]
+    paths, scores = multicast_search(graph, sources, targets, 0.6, 0.4)
+    expected_paths, expected_scores = reference.multicast_search(graph, sources, targets, 0.6, 0.4)
+    for source in sources:
+        assert [list(path) for path in paths[source]] == expected_paths[source]
+        np.testing.assert_allclose(scores[source], expected_scores[source])
+
+    paths, scores = shortest_path_first(graph, sources, targets)
+    expected_paths, expected_scores = reference.shortest_path_first(graph, sources, targets)
+    for source in sources:
+        assert [list(path) for path in paths[source]] == expected_paths[source]
+        assert scores[source] == expected_scores[source]
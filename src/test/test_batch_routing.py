@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.core.ring_state import RingState
+from src.core.routing import (batch_multicast_search, batch_shortest_path_first,
+                              multicast_search, shortest_path_first, targets_to_csr)
+from src.test import reference
+
+
+def make_groups(num_nodes, num_groups, seed):
+    rng = np.random.default_rng(seed)
+    sources = rng.integers(0, num_nodes, num_groups)
+    target_lists = [rng.integers(0, num_nodes, rng.integers(0, 6)).tolist()
+                    for _ in range(num_groups)]
+    return sources, target_lists
+
+
+def make_graph(num_nodes=50, seed=5):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes)).to_graph()
+
+
+def test_targets_to_csr():
+    indptr, indices = targets_to_csr([[1, 2], [], [3]])
+    assert indptr.tolist() == [0, 2, 2, 3]
+    assert indices.tolist() == [1, 2, 3]
+
+
+def test_batch_multicast_matches_per_group_search():
+    graph = make_graph()
+    sources, target_lists = make_groups(len(graph), 40, seed=6)
+    indptr, indices = targets_to_csr(target_lists)
+    clockwise, scores, costs = batch_multicast_search(graph, sources, indptr, indices, 0.6, 0.4)
+
+    for group, (source, targets) in enumerate(zip(sources.tolist(), target_lists)):
+        chunk = slice(indptr[group], indptr[group + 1])
+        if not targets:
+            assert costs[group] == 0.0
+            continue
+        paths, expected = multicast_search(graph, [source], targets, 0.6, 0.4)
+        assert clockwise[group] == paths[source][0].clockwise
+        np.testing.assert_allclose(scores[chunk], expected[source])
+        assert costs[group] == pytest.approx(sum(expected[source]))
+
+        ref_paths, ref_scores = reference.multicast_search(graph, [source], targets, 0.6, 0.4)
+        assert [list(path) for path in paths[source]] == ref_paths[source]
+        np.testing.assert_allclose(scores[chunk], ref_scores[source])
+
+
+def test_batch_shortest_path_first_matches_per_group_search():
+    graph = make_graph()
+    sources, target_lists = make_groups(len(graph), 40, seed=7)
+    indptr, indices = targets_to_csr(target_lists)
+    clockwise, lengths, totals = batch_shortest_path_first(graph, sources, indptr, indices)
+
+    for group, (source, targets) in enumerate(zip(sources.tolist(), target_lists)):
+        chunk = slice(indptr[group], indptr[group + 1])
+        if not targets:
+            assert totals[group] == 0
+            continue
+        paths, expected = shortest_path_first(graph, [source], targets)
+        ref_paths, ref_lengths = reference.shortest_path_first(graph, [source], targets)
+        assert [list(path) for path in paths[source]] == ref_paths[source]
+        assert lengths[chunk].tolist() == expected[source] == ref_lengths[source]
+        assert totals[group] == sum(ref_lengths[source])
+
+
+@pytest.mark.parametrize('indptr, indices', [
+    ([0, 1], [3]),           # one entry short for two sources
+    ([0, 1, 3], [3, 4]),     # does not span the indices
+    ([0, 3, 2], [3, 4]),     # decreasing
+])
+def test_invalid_csr_is_rejected(indptr, indices):
+    graph = make_graph()
+    with pytest.raises(ValueError):
+        batch_multicast_search(graph, [0, 1], indptr, indices, 0.5, 0.5)
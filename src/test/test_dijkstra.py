@@ -0,0 +1,83 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.core.ring_state import RingState, ring_state
+from src.core.routing import bidirectional_search, find_best_path
+from src.test import reference
+
+
+def make_graph(num_nodes=40, num_chords=0, seed=8):
+    rng = np.random.default_rng(seed)
+    graph = RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                      rng.uniform(20, 60, num_nodes)).to_graph()
+    while graph.number_of_edges() < num_nodes + num_chords:
+        u, v = rng.integers(0, num_nodes, 2)
+        if u != v and not graph.has_edge(u, v):
+            graph.add_edge(u, v, utilization=rng.uniform(0, 30))
+    return graph
+
+
+def edge_weight(graph, wc, wt):
+    """The per-edge cost find_best_path minimizes, as an nx weight function."""
+    avg_congestion = np.mean([graph[u][v]['utilization'] for u, v in graph.edges])
+    avg_temperature = np.mean([graph.nodes[n]['temperature'] for n in graph.nodes])
+
+    def weight(u, v, attributes):
+        return (wc * attributes['utilization'] / avg_congestion +
+                wt * graph.nodes[v]['temperature'] / avg_temperature)
+
+    return weight
+
+
+def path_cost(graph, path, weight):
+    return sum(weight(u, v, graph[u][v]) for u, v in zip(path[:-1], path[1:]))
+
+
+@pytest.mark.parametrize('num_chords', [0, 15])
+@pytest.mark.parametrize('bidirectional', [False, True])
+def test_matches_networkx_dijkstra(num_chords, bidirectional):
+    graph = make_graph(num_chords=num_chords)
+    assert (ring_state(graph) is None) == (num_chords > 0)
+    wc, wt = 0.7, 0.3
+    weight = edge_weight(graph, wc, wt)
+    rng = np.random.default_rng(9)
+    for source, target in rng.integers(0, len(graph), (30, 2)).tolist():
+        path, score = find_best_path(graph, source, target, wc, wt, bidirectional=bidirectional)
+        expected = nx.dijkstra_path_length(graph, source, target, weight=weight)
+        assert path[0] == source and path[-1] == target
+        assert all(graph.has_edge(u, v) for u, v in zip(path[:-1], path[1:]))
+        assert path_cost(graph, path, weight) == pytest.approx(expected)
+        assert score == pytest.approx(reference.path_score(graph, path, wc, wt))
+
+
+def test_bidirectional_search_agrees_with_one_directional_search():
+    graph = make_graph(num_chords=10, seed=10)
+    for source, target in [(0, 20), (5, 6), (39, 1), (12, 12)]:
+        _, forward = find_best_path(graph, source, target, 0.4, 0.6)
+        _, both = bidirectional_search(graph, source, target, 0.4, 0.6)
+        assert both == pytest.approx(forward)
+
+
+def test_chords_shorten_routes():
+    graph = make_graph()
+    path, _ = find_best_path(graph, 0, 20, 0.5, 0.5)
+    assert len(path) == 21
+    graph.add_edge(0, 20, utilization=1.0)
+    assert find_best_path(graph, 0, 20, 0.5, 0.5)[0] == [0, 20]
+
+
+def test_unreachable_target():
+    graph = nx.Graph([(0, 1), (2, 3)])
+    nx.set_node_attributes(graph, 30.0, 'temperature')
+    nx.set_edge_attributes(graph, 10.0, 'utilization')
+    assert find_best_path(graph, 0, 3, 0.5, 0.5) == (None, float('inf'))
+    assert bidirectional_search(graph, 0, 3, 0.5, 0.5) == (None, float('inf'))
+
+
+def test_invalid_arguments():
+    graph = make_graph()
+    with pytest.raises(ValueError):
+        find_best_path(graph, 0, 40, 0.5, 0.5)
+    with pytest.raises(ValueError):
+        find_best_path(graph, 0, 1, 0.9, 0.9)
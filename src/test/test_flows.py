@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from src.core.flows import FlowRouter, RangeFenwick
+from src.core.ring_state import RingState
+from src.test import reference
+
+
+def make_state(num_nodes=20, seed=11):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes))
+
+
+def test_range_fenwick_matches_a_plain_array():
+    rng = np.random.default_rng(12)
+    values = rng.uniform(0, 10, 17)
+    tree = RangeFenwick(values)
+    for _ in range(300):
+        start, count = int(rng.integers(0, 17)), int(rng.integers(0, 18))
+        if rng.random() < 0.5:
+            delta = rng.uniform(-5, 5)
+            tree.add_circular(start, count, delta)
+            values[(start + np.arange(count)) % 17] += delta
+        else:
+            assert (tree.sum_circular(start, count) ==
+                    pytest.approx(values[(start + np.arange(count)) % 17].sum()))
+        stop = int(rng.integers(start, 18))
+        assert tree.sum(start, stop) == pytest.approx(values[start:stop].sum())
+    np.testing.assert_allclose(tree.values(), values)
+
+
+class BruteForceRouter:
+    """Keeps the loaded state as plain arrays and scores arcs node by node."""
+
+    def __init__(self, state, wc, wt, heat_per_load):
+        self.n = state.num_nodes
+        self.wc, self.wt, self.heat_per_load = wc, wt, heat_per_load
+        self.link = state.cw_utilization.copy()
+        self.temperature = state.temperature.copy()
+        self.congestion = state.congestion.copy()
+
+    def arc(self, source, target, clockwise):
+        walk = reference.clockwise_path if clockwise else reference.counter_clockwise_path
+        nodes = walk(range(self.n), source, target)
+        links = [u if clockwise else v for u, v in zip(nodes[:-1], nodes[1:])]
+        return nodes, links
+
+    def score(self, source, target, clockwise):
+        nodes, links = self.arc(source, target, clockwise)
+        return (self.wc * self.link[links].sum() / (len(nodes) * self.link.mean()) +
+                self.wt * self.temperature[nodes].sum() / (len(nodes) * self.temperature.mean()))
+
+    def apply(self, source, target, clockwise, load):
+        nodes, links = self.arc(source, target, clockwise)
+        self.link[links] += load
+        self.congestion[nodes] += load
+        self.temperature[nodes] += load * self.heat_per_load
+
+
+def test_flow_router_matches_brute_force_routing():
+    state = make_state()
+    initial = [state.temperature.copy(), state.congestion.copy(), state.cw_utilization.copy()]
+    router = FlowRouter(state, 0.6, 0.4, heat_per_load=2.0)
+    brute = BruteForceRouter(state, 0.6, 0.4, heat_per_load=2.0)
+    rng = np.random.default_rng(13)
+
+    for flow in range(150):
+        if router.flows and rng.random() < 0.4:
+            flow_id = list(router.flows)[rng.integers(len(router.flows))]
+            source, target, clockwise, load = router.flows[flow_id]
+            router.depart(flow_id)
+            brute.apply(source, target, clockwise, -load)
+            continue
+        source, target = rng.integers(0, state.num_nodes, 2).tolist()
+        load = float(rng.uniform(1, 20))
+        clock, counter = brute.score(source, target, True), brute.score(source, target, False)
+        assert router.score(source, target, True) == pytest.approx(clock)
+        assert router.score(source, target, False) == pytest.approx(counter)
+        path = router.arrive(flow, source, target, load)
+        if source != target and not np.isclose(clock, counter):
+            assert path.clockwise == (clock < counter)
+        brute.apply(source, target, path.clockwise, load)
+        np.testing.assert_allclose(router.link_load() + initial[2], brute.link)
+
+    router.sync_state()
+    np.testing.assert_allclose(state.temperature, brute.temperature)
+    np.testing.assert_allclose(state.congestion, brute.congestion)
+    np.testing.assert_allclose(state.cw_utilization, brute.link)
+    np.testing.assert_allclose(state.ccw_utilization, np.roll(brute.link, 1))
+
+    for flow_id in list(router.flows):
+        router.depart(flow_id)
+    router.sync_state()
+    np.testing.assert_allclose(state.temperature, initial[0])
+    np.testing.assert_allclose(state.congestion, initial[1])
+    np.testing.assert_allclose(state.cw_utilization, initial[2], atol=1e-9)
+
+
+def test_process_and_errors():
+    router = FlowRouter(make_state(), 0.5, 0.5)
+    events = [('arrive', 'a', 0, 5, 1.0), ('arrive', 'b', 3, 1, 2.0), ('depart', 'a')]
+    routed = list(router.process(events))
+    assert [flow_id for flow_id, _ in routed] == ['a', 'b']
+    assert list(router.flows) == ['b']
+    with pytest.raises(ValueError):
+        router.arrive('b', 0, 1)
+    with pytest.raises(ValueError):
+        router.arrive('c', 0, 20)
+    with pytest.raises(ValueError):
+        list(router.process([('reroute', 'b')]))
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from src.core.hierarchy import create_hierarchical_topology
+from src.core.ring_state import RingState
+from src.test import reference
+
+
+def ring_graph(state):
+    """A separate graph carrying a copy of the ring's state."""
+    return RingState(state.num_nodes, state.temperature, state.congestion,
+                     state.cw_utilization, state.ccw_utilization).to_graph()
+
+
+def best_leg(graph, source, target, wc, wt):
+    """Direction and score of one leg, scored node by node on the graph."""
+    clock = reference.path_score(graph, reference.clockwise_path(graph, source, target), wc, wt)
+    counter = reference.path_score(
+        graph, reference.counter_clockwise_path(graph, source, target), wc, wt)
+    return (True, clock) if clock <= counter else (False, counter)
+
+
+def test_routes_match_per_leg_reference():
+    topology = create_hierarchical_topology(5, 8, np.random.default_rng(20), gateway=2)
+    local_graphs = [ring_graph(ring) for ring in topology.local_rings]
+    global_graph = ring_graph(topology.global_ring)
+    rng = np.random.default_rng(21)
+    sources, targets = rng.integers(0, topology.num_nodes, (2, 200))
+    routes = topology.route_batch(sources, targets, 0.7, 0.3)
+
+    for i, (source, target) in enumerate(zip(sources.tolist(), targets.tolist())):
+        (sp, sl), (tp, tl) = divmod(source, 8), divmod(target, 8)
+        if sp == tp:
+            legs = [('local', sp, local_graphs[sp], sl, tl)]
+        else:
+            legs = [('local', sp, local_graphs[sp], sl, 2),
+                    ('global', None, global_graph, sp, tp),
+                    ('local', tp, local_graphs[tp], 2, tl)]
+        total = 0.0
+        for (level, ring, graph, leg_source, leg_target), segment in zip(legs, routes[i]):
+            clockwise, score = best_leg(graph, leg_source, leg_target, 0.7, 0.3)
+            arc = segment[2]
+            assert segment[:2] == (level, ring)
+            assert (arc.source, arc.target) == (leg_source, leg_target)
+            if leg_source != leg_target:
+                assert arc.clockwise == clockwise
+            total += score
+        assert len(routes[i]) == len(legs)
+        assert routes.score[i] == pytest.approx(total)
+
+
+def test_route_nodes_follow_graph_edges():
+    topology = create_hierarchical_topology(4, 6, np.random.default_rng(22))
+    graph = topology.to_graph()
+    routes = topology.route_batch([0, 7, 23, 5], [5, 20, 1, 5], 0.5, 0.5)
+    for i, (source, target) in enumerate([(0, 5), (7, 20), (23, 1), (5, 5)]):
+        nodes = routes.nodes(i)
+        assert nodes[0] == source and nodes[-1] == target
+        assert all(graph.has_edge(u, v) for u, v in zip(nodes[:-1], nodes[1:]))
+
+
+def test_workers_do_not_change_routes():
+    topology = create_hierarchical_topology(6, 5, np.random.default_rng(23))
+    rng = np.random.default_rng(24)
+    sources, targets = rng.integers(0, topology.num_nodes, (2, 300))
+    serial = topology.route_batch(sources, targets, 0.4, 0.6)
+    parallel = topology.route_batch(sources, targets, 0.4, 0.6, workers=4)
+    np.testing.assert_array_equal(serial.score, parallel.score)
+    assert all(serial[i] == parallel[i] for i in range(len(serial)))
+    assert topology.route(sources[0], targets[0], 0.4, 0.6) == serial[0]
+
+
+def test_topology_layout_and_validation():
+    topology = create_hierarchical_topology(3, 4, np.random.default_rng(25), gateway=1)
+    assert topology.gateways().tolist() == [1, 5, 9]
+    assert topology.partitions() == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]]
+    np.testing.assert_array_equal(topology.global_ring.temperature,
+                                  [ring.temperature[1] for ring in topology.local_rings])
+    with pytest.raises(ValueError):
+        topology.route_batch([0], [12], 0.5, 0.5)
+    with pytest.raises(ValueError):
+        create_hierarchical_topology(2, 4)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.core.multicast import multicast_tree_search, plan_multicast_tree
+from src.core.ring_state import RingState, ring_state
+
+
+def make_graph(num_nodes=14, seed=18):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes)).to_graph()
+
+
+def tree_score(state, source, cw_reach, ccw_reach, wc, wt):
+    """Scores the union of a tree's links and nodes, each counted once."""
+    n = state.num_nodes
+    avg_congestion, avg_temperature = state.normalization()
+    links = ([state.cw_utilization[(source + k) % n] for k in range(cw_reach)] +
+             [state.ccw_utilization[(source - k) % n] for k in range(ccw_reach)])
+    nodes = ({(source + k) % n for k in range(cw_reach + 1)} |
+             {(source - k) % n for k in range(ccw_reach + 1)})
+    return (wc * sum(links) / avg_congestion +
+            wt * sum(state.temperature[list(nodes)]) / avg_temperature)
+
+
+def brute_force_score(state, source, targets, wc, wt):
+    """Lowest score of any pair of branches that covers all targets."""
+    n = state.num_nodes
+    offsets = {(target - source) % n for target in targets} - {0}
+    return min(tree_score(state, source, cw_reach, ccw_reach, wc, wt)
+               for cw_reach in range(n) for ccw_reach in range(n - cw_reach)
+               if all(offset <= cw_reach or n - offset <= ccw_reach for offset in offsets))
+
+
+@pytest.mark.parametrize('wc', [0.0, 0.3, 0.8, 1.0])
+def test_tree_matches_brute_force(wc):
+    graph = make_graph()
+    state = ring_state(graph)
+    rng = np.random.default_rng(19)
+    for _ in range(25):
+        source = int(rng.integers(14))
+        targets = rng.integers(0, 14, rng.integers(1, 6)).tolist()
+        tree = plan_multicast_tree(graph, source, targets, wc, 1 - wc)
+        assert tree.score == pytest.approx(brute_force_score(state, source, targets, wc, 1 - wc))
+        assert tree.score == pytest.approx(
+            tree_score(state, source, tree.cw_reach, tree.ccw_reach, wc, 1 - wc))
+        assert all(tree.covers_clockwise(target) or (source - target) % 14 <= tree.ccw_reach
+                   for target in targets)
+
+
+def test_paths_follow_the_tree():
+    graph = make_graph()
+    paths, trees = multicast_tree_search(graph, [0, 7], [3, 10, 12, 7], 0.5, 0.5)
+    for source, tree in trees.items():
+        cw_links, ccw_links = tree.links()
+        assert len(cw_links) + len(ccw_links) == tree.hops
+        tree_nodes = {node for branch in tree.branches() for node in branch} | {source}
+        for target, path in zip([3, 10, 12, 7], paths[source]):
+            assert path[0] == source and path[-1] == target
+            assert set(path) <= tree_nodes
+            assert len(path) - 1 <= (tree.cw_reach if path.clockwise else tree.ccw_reach)
+
+
+def test_tree_is_never_worse_than_one_direction():
+    graph = make_graph()
+    state = ring_state(graph)
+    avg_congestion, avg_temperature = state.normalization()
+    tree = plan_multicast_tree(graph, 2, [5, 9, 11], 0.6, 0.4)
+    clockwise_only = (0.6 * state.cw_utilization[2:11].sum() / avg_congestion +
+                      0.4 * state.temperature[2:12].sum() / avg_temperature)
+    assert tree.score <= clockwise_only + 1e-9
+
+
+def test_requires_a_ring():
+    graph = make_graph()
+    graph.add_edge(0, 7, utilization=1.0)
+    with pytest.raises(ValueError):
+        plan_multicast_tree(graph, 0, [3], 0.5, 0.5)
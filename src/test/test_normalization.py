@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from src.core.ring_state import NormalizationCache, RingState
+
+
+def make_state(num_nodes=30, seed=3):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes))
+
+
+def expected_averages(state):
+    return (np.concatenate([state.cw_utilization, state.ccw_utilization]).mean(),
+            state.temperature.mean())
+
+
+def test_cache_follows_setter_writes():
+    state = make_state()
+    rng = np.random.default_rng(4)
+    state.normalization()
+    for _ in range(200):
+        nodes = rng.integers(0, state.num_nodes, rng.integers(1, 4))
+        values = rng.uniform(0, 100, len(nodes))
+        if rng.random() < 0.5:
+            state.set_utilization(nodes, values)
+        else:
+            state.set_temperature(nodes, values)
+        # Repeated nodes keep the last value, as with plain array assignment
+        assert state.normalization() == pytest.approx(expected_averages(state))
+    assert state._normalization.adjustments > 0
+
+
+def test_direct_array_edits_need_mark_changed():
+    state = make_state()
+    cached = state.normalization()
+    state.temperature[:] += 10.0
+    assert state.normalization() == cached
+    state.mark_changed()
+    assert state.normalization() == pytest.approx(expected_averages(state))
+
+
+def test_congestion_writes_keep_the_averages():
+    state = make_state()
+    before = state.normalization()
+    state.set_congestion([0, 1], [90.0, 95.0])
+    assert state.normalization() == before
+
+
+def test_cache_resyncs_after_max_adjustments(monkeypatch):
+    monkeypatch.setattr(NormalizationCache, 'MAX_ADJUSTMENTS', 3)
+    state = make_state()
+    state.normalization()
+    first = state._normalization
+    for link in range(3):
+        state.set_utilization(link, 50.0)
+    assert state.normalization() == pytest.approx(expected_averages(state))
+    assert state._normalization is not first
+    assert state._normalization.adjustments == 0
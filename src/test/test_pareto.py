@@ -0,0 +1,102 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from src.core.pareto import decision_curve, supported_frontier
+from src.core.ring_state import RingState
+from src.core.routing import batch_multicast_search, targets_to_csr
+from src.test import reference
+
+
+def make_workload(num_nodes=14, num_groups=10, seed=34):
+    rng = np.random.default_rng(seed)
+    graph = RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                      rng.uniform(20, 60, num_nodes)).to_graph()
+    sources = rng.integers(0, num_nodes, num_groups)
+    target_lists = [rng.integers(0, num_nodes, rng.integers(1, 5)).tolist()
+                    for _ in range(num_groups)]
+    return graph, sources, target_lists
+
+
+def pareto_set(points):
+    """Totals not dominated by any other totals."""
+    return [p for p in points
+            if not any(q[0] <= p[0] and q[1] <= p[1] and q != p for q in points)]
+
+
+@pytest.mark.parametrize('wc', [0.0, 0.15, 0.5, 0.62, 0.9, 1.0])
+def test_decisions_match_batch_routing(wc):
+    graph, sources, target_lists = make_workload()
+    indptr, indices = targets_to_csr(target_lists)
+    curve = decision_curve(graph, sources, indptr, indices)
+    clockwise, _, costs = batch_multicast_search(graph, sources, indptr, indices, wc, 1 - wc)
+    np.testing.assert_array_equal(curve.clockwise(wc), clockwise)
+    np.testing.assert_allclose(curve.costs(wc), costs)
+
+    for g, (source, targets) in enumerate(zip(sources.tolist(), target_lists)):
+        paths, scores = reference.multicast_search(graph, [source], targets, wc, 1 - wc)
+        assert curve.costs(wc)[g] == pytest.approx(sum(scores[source]))
+        if any(target != source for target in targets):
+            assert paths[source][0] == (reference.clockwise_path(graph, source, targets[0])
+                                        if curve.clockwise(wc)[g] else
+                                        reference.counter_clockwise_path(graph, source,
+                                                                         targets[0]))
+
+
+def test_groups_flip_only_at_their_breakpoint():
+    graph, sources, target_lists = make_workload(num_groups=60, seed=35)
+    curve = decision_curve(graph, sources, *targets_to_csr(target_lists))
+    samples = np.linspace(0, 1, 401)
+    decisions = np.array([curve.clockwise(wc) for wc in samples])
+    flips = (decisions[1:] != decisions[:-1]).sum(axis=0)
+    assert flips.max() <= 1
+    assert np.isnan(curve.breakpoints).any() and (~np.isnan(curve.breakpoints)).any()
+    for g, breakpoint in enumerate(curve.breakpoints):
+        if np.isnan(breakpoint):
+            assert flips[g] == 0
+            continue
+        before, after = samples[samples < breakpoint], samples[samples > breakpoint]
+        assert (decisions[samples < breakpoint, g] == curve.clockwise(before[-1])[g]).all()
+        assert (decisions[samples > breakpoint, g] == curve.clockwise(after[0])[g]).all()
+        assert curve.clockwise(before[-1])[g] != curve.clockwise(after[0])[g]
+        # Both directions tie at the breakpoint
+        assert (breakpoint * curve.cw_congestion[g] + (1 - breakpoint) * curve.cw_temperature[g]
+                == pytest.approx(breakpoint * curve.ccw_congestion[g] +
+                                 (1 - breakpoint) * curve.ccw_temperature[g]))
+
+
+def test_supported_frontier_is_part_of_the_pareto_set():
+    graph, sources, target_lists = make_workload()
+    indptr, indices = targets_to_csr(target_lists)
+    curve = decision_curve(graph, sources, indptr, indices)
+    congestion = np.stack([curve.ccw_congestion, curve.cw_congestion])
+    temperature = np.stack([curve.ccw_temperature, curve.cw_temperature])
+    groups = np.arange(len(curve))
+    points = [(congestion[choice, groups].sum(), temperature[choice, groups].sum())
+              for choice in map(list, itertools.product([0, 1], repeat=len(curve)))]
+    pareto = np.array(pareto_set(points))
+
+    frontier = supported_frontier(graph, sources, indptr, indices)
+    assert len(frontier['congestion']) > 1
+    for row in range(len(frontier['congestion'])):
+        total = (frontier['congestion'][row], frontier['temperature'][row])
+        assert np.isclose(pareto, total).all(axis=1).any()
+        wc = (frontier['wc_low'][row] + frontier['wc_high'][row]) / 2
+        assert curve.totals(wc) == pytest.approx(total)
+        assert frontier['clockwise'][row] == curve.clockwise(wc).sum()
+    assert (np.diff(frontier['congestion']) < 0).all()
+    assert (np.diff(frontier['temperature']) > 0).all()
+
+    # Every weighting is minimized by a frontier row
+    for wc in np.linspace(0, 1, 11):
+        best = min(wc * c + (1 - wc) * t for c, t in pareto)
+        assert min(wc * frontier['congestion'] + (1 - wc) * frontier['temperature']) == \
+            pytest.approx(best)
+
+
+def test_weights_out_of_range_are_rejected():
+    graph, sources, target_lists = make_workload()
+    curve = decision_curve(graph, sources, *targets_to_csr(target_lists))
+    with pytest.raises(ValueError):
+        curve.clockwise(1.5)
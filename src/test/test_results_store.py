@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from src.core.main import run_simulation
+from src.core.results_store import ResultsStore, node_table, path_table
+from src.core.ring_state import RingState
+from src.core.routing import multicast_search, shortest_path_first
+from src.core.topology import partition_nodes
+
+
+def make_graph(num_nodes=16, seed=14):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes)).to_graph()
+
+
+def routed_paths(graph):
+    sources, targets = [0, 9], [4, 9, 13]
+    return {'tempcon': multicast_search(graph, sources, targets, 0.6, 0.4)[0],
+            'spf': shortest_path_first(graph, sources, targets)[0]}
+
+
+def test_path_table_matches_per_path_metrics():
+    graph = make_graph()
+    paths = routed_paths(graph)
+    table = path_table(graph, paths, 0.6, 0.4)
+    rows = [(name, source, list(path)) for name, paths_dict in paths.items()
+            for source, source_paths in paths_dict.items() for path in source_paths]
+    assert len(table['source']) == len(rows)
+
+    for row, (name, source, nodes) in enumerate(rows):
+        offsets = table['path_offsets']
+        assert table['path_nodes'][offsets[row]:offsets[row + 1]].tolist() == nodes
+        assert table['algorithm'][row] == ('tempcon', 'spf').index(name)
+        assert (table['source'][row], table['target'][row]) == (source, nodes[-1])
+        assert table['length'][row] == len(nodes)
+
+        temperature = [graph.nodes[node]['temperature'] for node in nodes]
+        utilization = [graph[u][v]['utilization'] for u, v in zip(nodes[:-1], nodes[1:])]
+        assert table['avg_temperature'][row] == pytest.approx(np.mean(temperature))
+        assert table['max_temperature'][row] == max(temperature)
+        if utilization:
+            assert table['avg_congestion'][row] == pytest.approx(np.mean(utilization))
+            assert table['max_congestion'][row] == max(utilization)
+            assert table['weighted_score'][row] == pytest.approx(
+                0.6 * np.mean(utilization) + 0.4 * np.mean(temperature))
+        else:
+            assert np.isnan(table['avg_congestion'][row])
+
+
+def test_path_table_accepts_node_lists():
+    graph = make_graph()
+    paths = routed_paths(graph)
+    as_lists = {name: {source: [list(path) for path in source_paths]
+                       for source, source_paths in paths_dict.items()}
+                for name, paths_dict in paths.items()}
+    expected = path_table(graph, paths, 0.6, 0.4)
+    for column, values in path_table(graph, as_lists, 0.6, 0.4).items():
+        np.testing.assert_array_equal(values, expected[column])
+
+
+def test_store_round_trip(tmp_path):
+    graph = make_graph()
+    partitions = partition_nodes(graph, 4)
+    nodes, partition_columns = node_table(graph, partitions)
+    tables = {'paths': path_table(graph, routed_paths(graph), 0.6, 0.4),
+              'nodes': nodes, 'partitions': partition_columns}
+    store = ResultsStore(tmp_path)
+    assert store.append_run('a', {'num_nodes': 16, 'wc': 0.6}, tables)
+    assert not store.append_run('a', {'num_nodes': 16, 'wc': 0.6}, tables)
+    assert store.append_run('b', {'num_nodes': 16, 'wc': 0.2}, tables)
+
+    assert set(store.runs()) == {'a', 'b'}
+    assert set(store.runs(wc=0.2)) == {'b'}
+    run = store.read_run('a', 'paths')
+    for column, values in tables['paths'].items():
+        np.testing.assert_array_equal(run[column], values)
+    with pytest.raises(KeyError):
+        store.read_run('c', 'paths')
+
+    # Offsets are rebased so every row of the combined table stays addressable
+    combined = store.read_table('paths', num_nodes=16)
+    rows = len(tables['paths']['source'])
+    assert sorted(combined['run_id'].tolist()) == ['a'] * rows + ['b'] * rows
+    offsets, path_nodes = combined['path_offsets'], combined['path_nodes']
+    single = tables['paths']
+    for row in range(rows):
+        first = path_nodes[offsets[row]:offsets[row + 1]]
+        second = path_nodes[offsets[rows + row]:offsets[rows + row + 1]]
+        expected = single['path_nodes'][single['path_offsets'][row]:single['path_offsets'][row + 1]]
+        np.testing.assert_array_equal(first, expected)
+        np.testing.assert_array_equal(second, expected)
+    assert store.read_table('paths', num_nodes=32) == {}
+
+
+def test_append_simulation(tmp_path):
+    result = run_simulation(20, 5, 0.7, 0.3, [0, 10], [5, 15])
+    store = ResultsStore(tmp_path)
+    run_id = store.append_simulation(result, label='example')
+    params = store.runs()[run_id]
+    assert params['label'] == 'example' and params['sources'] == [0, 10]
+    assert len(store.read_run(run_id, 'nodes')['temperature']) == 20
+    assert len(store.read_run(run_id, 'partitions')['member_offsets']) == 5
@@ -0,0 +1,164 @@
+import copy
+import pickle
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.core.metrics import calculate_congestion, calculate_path_score
+from src.core.ring_graph import RingGraph
+from src.core.ring_state import RingState, is_ring_graph, refresh_ring_state, ring_state
+from src.test import reference
+
+
+def make_state(num_nodes=24, seed=0):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes))
+
+
+def assert_matches_graph(state, graph):
+    n = state.num_nodes
+    for i in range(n):
+        assert state.temperature[i] == graph.nodes[i]['temperature']
+        assert state.congestion[i] == graph.nodes[i]['congestion']
+        assert state.cw_utilization[i] == graph[i][(i + 1) % n]['utilization']
+        assert state.ccw_utilization[(i + 1) % n] == graph[i][(i + 1) % n]['utilization']
+
+
+def test_to_graph_binds_a_ring_graph():
+    state = make_state()
+    graph = state.to_graph()
+    assert isinstance(graph, RingGraph)
+    assert is_ring_graph(graph)
+    assert ring_state(graph) is state
+    assert_matches_graph(state, graph)
+
+
+def test_from_graph_round_trip():
+    state = make_state()
+    copy_ = RingState.from_graph(state.to_graph())
+    np.testing.assert_array_equal(copy_.temperature, state.temperature)
+    np.testing.assert_array_equal(copy_.congestion, state.congestion)
+    np.testing.assert_array_equal(copy_.cw_utilization, state.cw_utilization)
+    np.testing.assert_array_equal(copy_.ccw_utilization, state.ccw_utilization)
+
+
+def test_from_graph_rejects_non_rings():
+    graph = nx.path_graph(5)
+    with pytest.raises(ValueError):
+        RingState.from_graph(graph)
+    with pytest.raises(ValueError):
+        make_state(5).bind(graph)
+
+
+def test_setters_write_through_to_the_graph():
+    state = make_state()
+    graph = state.to_graph()
+    state.set_temperature([1, 2], [70.0, 71.0])
+    state.set_congestion(3, 5.0)
+    state.set_utilization([0, 23], [11.0, 12.0])
+    assert graph.nodes[2]['temperature'] == 71.0
+    assert graph.nodes[3]['congestion'] == 5.0
+    assert graph[0][1]['utilization'] == 11.0
+    assert graph[23][0]['utilization'] == 12.0
+    assert state.link_utilization(1, 0) == 11.0
+    assert_matches_graph(state, graph)
+
+
+def test_direct_graph_edits_reach_the_state():
+    state = make_state()
+    graph = state.to_graph()
+    graph.nodes[4]['temperature'] = 80.0
+    graph[5][6]['utilization'] = 1.0
+    graph.nodes[7].update(congestion=2.0)
+    nx.set_node_attributes(graph, {8: 81.0}, 'temperature')
+    nx.set_edge_attributes(graph, {(9, 10): 3.0}, 'utilization')
+    del graph.nodes[11]['congestion']
+    graph.add_node(12, temperature=82.0)
+
+    assert ring_state(graph) is state
+    assert state.temperature[[4, 8, 12]].tolist() == [80.0, 81.0, 82.0]
+    assert state.congestion[7] == 2.0
+    assert state.congestion[11] == 0.0
+    assert state.link_utilization(5, 6) == state.link_utilization(6, 5) == 1.0
+    assert state.link_utilization(10, 9) == 3.0
+
+
+def test_scores_match_the_attribute_reference():
+    state = make_state()
+    graph = state.to_graph()
+    graph.nodes[3]['temperature'] = 90.0
+    for path in ([0, 1, 2, 3, 4], [10, 9, 8], [23, 0, 1], [5]):
+        assert calculate_congestion(graph, path) == pytest.approx(reference.congestion(graph, path))
+        assert (calculate_path_score(graph, path, 0.6, 0.4) ==
+                pytest.approx(reference.path_score(graph, path, 0.6, 0.4)))
+    with pytest.raises(ValueError):
+        calculate_congestion(graph, [0, 2])
+
+
+def test_adding_a_chord_unbinds_the_state():
+    state = make_state()
+    graph = state.to_graph()
+    graph.add_edge(0, 12, utilization=1.0)
+    assert ring_state(graph) is None
+    assert state.graph is None
+    assert 'ring_state' not in graph.graph
+
+    # The graph keeps its values and is scored from its attributes
+    state.set_temperature(0, 99.0)
+    assert graph.nodes[0]['temperature'] != 99.0
+    path = [0, 12, 13]
+    assert (calculate_path_score(graph, path, 0.5, 0.5) ==
+            pytest.approx(reference.path_score(graph, path, 0.5, 0.5)))
+
+    # Without the chord the graph is a ring again and gets a fresh state
+    graph.remove_edge(0, 12)
+    rebound = ring_state(graph)
+    assert rebound is not None and rebound is not state
+    assert_matches_graph(rebound, graph)
+
+
+def test_structure_change_that_keeps_a_ring_reloads_the_state():
+    state = make_state()
+    graph = state.to_graph()
+    graph.remove_edge(3, 4)
+    graph.add_edge(3, 4, utilization=7.0)
+    assert ring_state(graph) is state
+    assert state.link_utilization(4, 3) == 7.0
+
+
+def test_copies_get_their_own_state():
+    state = make_state()
+    graph = state.to_graph()
+    for other in (graph.copy(), copy.deepcopy(graph), pickle.loads(pickle.dumps(graph))):
+        other.nodes[0]['temperature'] = 55.0
+        other_state = ring_state(other)
+        assert other_state is not state
+        assert other_state.temperature[0] == 55.0
+        assert state.temperature[0] != 55.0
+    assert ring_state(graph) is state
+
+
+def test_plain_graphs_need_a_refresh():
+    graph = nx.cycle_graph(6)
+    nx.set_node_attributes(graph, 30.0, 'temperature')
+    nx.set_node_attributes(graph, 10.0, 'congestion')
+    nx.set_edge_attributes(graph, 40.0, 'utilization')
+    state = ring_state(graph)
+    assert ring_state(graph) is state
+
+    graph.nodes[2]['temperature'] = 60.0
+    assert state.temperature[2] == 30.0
+    refreshed = refresh_ring_state(graph)
+    assert refreshed.temperature[2] == 60.0
+    assert state.graph is None
+
+
+def test_unbind_leaves_the_graph_values():
+    state = make_state()
+    graph = state.to_graph()
+    state.unbind()
+    state.set_temperature(0, 99.0)
+    assert graph.nodes[0]['temperature'] != 99.0
+    assert ring_state(graph) is not state
@@ -0,0 +1,82 @@
+import copy
+
+import numpy as np
+import pytest
+
+from src.core.ring_state import RingState, ring_state
+from src.core.route_cache import RouteCache
+from src.core.routing import find_best_path, multicast_search
+
+
+def make_graph(num_nodes=24, seed=26):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes)).to_graph()
+
+
+def test_cached_results_equal_uncached_results_across_writes():
+    graph = make_graph()
+    state = ring_state(graph)
+    cache = RouteCache(maxsize=64)
+    rng = np.random.default_rng(27)
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.1:
+            state.set_utilization(int(rng.integers(24)), float(rng.uniform(0, 100)))
+        elif action < 0.2:
+            graph.nodes[int(rng.integers(24))]['temperature'] = float(rng.uniform(25, 90))
+        elif action < 0.6:
+            # A few recurring source sets, so lookups hit
+            sources = [int(s) for s in rng.choice(4, 2, replace=False)]
+            targets = [5, 11, 17]
+            cached = cache.multicast_search(graph, sources, targets, 0.6, 0.4)
+            expected = multicast_search(graph, sources, targets, 0.6, 0.4)
+            for source in sources:
+                assert cached[0][source] == expected[0][source]
+                assert cached[1][source] == expected[1][source]
+        else:
+            source, target = int(rng.integers(3)), int(rng.integers(20, 24))
+            bidirectional = bool(rng.random() < 0.5)
+            assert (cache.find_best_path(graph, source, target, 0.3, 0.7, bidirectional) ==
+                    find_best_path(graph, source, target, 0.3, 0.7, bidirectional))
+    stats = cache.stats()
+    assert stats['hits'] > 0 and stats['misses'] > 0
+    assert stats['size'] <= 64
+
+
+def test_copies_do_not_share_entries():
+    graph = make_graph()
+    other = copy.deepcopy(graph)
+    other.nodes[3]['temperature'] = 95.0
+    cache = RouteCache()
+    first = cache.find_best_path(graph, 0, 6, 0.2, 0.8)
+    second = cache.find_best_path(other, 0, 6, 0.2, 0.8)
+    assert cache.stats()['misses'] == 2
+    assert first == find_best_path(graph, 0, 6, 0.2, 0.8)
+    assert second == find_best_path(other, 0, 6, 0.2, 0.8)
+
+
+def test_graphs_with_chords_are_not_cached():
+    graph = make_graph()
+    graph.add_edge(0, 12, utilization=1.0)
+    cache = RouteCache()
+    assert cache.find_best_path(graph, 0, 12, 0.5, 0.5)[0] == [0, 12]
+    assert cache.stats()['uncached'] == 1 and len(cache) == 0
+    with pytest.raises(ValueError):
+        cache.multicast_search(graph, [0], [5], 0.5, 0.5)
+
+
+def test_least_recently_used_entries_are_evicted():
+    graph = make_graph()
+    cache = RouteCache(maxsize=2)
+    cache.find_best_path(graph, 0, 5, 0.5, 0.5)
+    cache.find_best_path(graph, 0, 6, 0.5, 0.5)
+    cache.find_best_path(graph, 0, 5, 0.5, 0.5)
+    cache.find_best_path(graph, 0, 7, 0.5, 0.5)   # evicts 0 -> 6
+    cache.find_best_path(graph, 0, 5, 0.5, 0.5)
+    cache.find_best_path(graph, 0, 6, 0.5, 0.5)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 4, 2, 2)
+    assert stats['hit_rate'] == pytest.approx(2 / 6)
+    with pytest.raises(ValueError):
+        RouteCache(maxsize=0)
@@ -1,34 +1,44 @@
+import numpy as np
+from src.core.ring_state import ring_state
+from src.core.topology import half_ring_stress, hotspot_clusters
+
 def create_test_scenario_1(graph):
     """High congestion and temperature on shortest paths."""
-    # Set high temperature on shortest paths
-    for node in range(len(graph)):
-        if node < len(graph) // 2:
-            graph.nodes[node]['temperature'] = 85.0  # High temperature
-        else:
-            graph.nodes[node]['temperature'] = 65.0  # Normal temperature
+    state = ring_state(graph)
+    if state is None:
+        # Not a plain ring (e.g. it has chords): set the attributes per node and edge
+        for node in range(len(graph)):
+            graph.nodes[node]['temperature'] = 85.0 if node < len(graph) // 2 else 65.0
+        for u, v in graph.edges():
+            busy = u < len(graph) // 2 and v < len(graph) // 2
+            graph[u][v]['utilization'] = 90.0 if busy else 30.0
+        return graph
+    nodes = np.arange(len(graph))
     
-    # Set high congestion on shortest paths
-    for u, v in graph.edges():
-        if u < len(graph) // 2 and v < len(graph) // 2:
-            graph[u][v]['utilization'] = 90.0  # High congestion
-        else:
-            graph[u][v]['utilization'] = 30.0  # Normal congestion
+    # 85°C and 90% link utilization on the first half, 65°C / 30% elsewhere
+    temperature, utilization = half_ring_stress(len(graph))
+    state.set_temperature(nodes, temperature)
+    state.set_utilization(nodes, utilization)
     
     return graph
 
 def create_test_scenario_2(graph):
     """Hotspots and congestion bottlenecks."""
-    # Create hotspots
-    hotspots = [5, 15, 25]
-    for node in graph.nodes():
-        if node in hotspots:
-            graph.nodes[node]['temperature'] = 90.0
-            # Set high congestion around hotspots
-            for neighbor in graph.neighbors(node):
-                graph[node][neighbor]['utilization'] = 85.0
-        else:
-            graph.nodes[node]['temperature'] = 60.0
+    state = ring_state(graph)
+    if state is None:
+        # Not a plain ring: set the attributes per node and its incident edges
+        hotspots = [5, 15, 25]
+        for node in graph.nodes():
+            hot = node in hotspots
+            graph.nodes[node]['temperature'] = 90.0 if hot else 60.0
             for neighbor in graph.neighbors(node):
-                graph[node][neighbor]['utilization'] = 25.0
+                graph[node][neighbor]['utilization'] = 85.0 if hot else 25.0
+        return graph
+    nodes = np.arange(len(graph))
+    
+    # Create hotspots at nodes 5, 15 and 25 with high congestion around them
+    temperature, utilization = hotspot_clusters(len(graph), [5, 15, 25])
+    state.set_temperature(nodes, temperature)
+    state.set_utilization(nodes, utilization)
     
     return graph
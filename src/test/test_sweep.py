@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.core.sweep import expand_grid, load_sweep, run_sweep
+
+RESULT_KEYS = ('tempcon_score', 'tempcon_hops', 'tempcon_congestion', 'tempcon_temperature',
+               'spf_hops', 'spf_congestion', 'spf_temperature', 'num_partitions')
+
+
+def by_run(columns):
+    order = np.argsort(columns['run_id'])
+    return {key: values[order] for key, values in columns.items()}
+
+
+def assert_same_results(first, second):
+    first, second = by_run(first), by_run(second)
+    assert first['run_id'].tolist() == second['run_id'].tolist()
+    for key in RESULT_KEYS:
+        np.testing.assert_array_equal(first[key], second[key])
+
+
+def test_expand_grid_skips_invalid_points():
+    configs = expand_grid([8, 16], [4, 12], [0.5], [0, 1])
+    assert len(configs) == 6
+    assert len({config['run_id'] for config in configs}) == 6
+    assert all(config['partition_size'] <= config['num_nodes'] for config in configs)
+    assert expand_grid([8], [4], [0.5], [0])[0]['run_id'] == configs[0]['run_id']
+
+
+def test_resumed_sweep_matches_a_single_run(tmp_path):
+    configs = expand_grid([12, 20], [4], [0.25, 0.75], [0, 1])
+    assert run_sweep(configs, tmp_path / 'full', workers=1) == len(configs)
+    assert run_sweep(configs, tmp_path / 'full', workers=1) == 0
+    full = load_sweep(tmp_path / 'full')
+    assert len(full['run_id']) == len(configs)
+
+    # An interrupted sweep only runs what is missing when restarted
+    assert run_sweep(configs[:3], tmp_path / 'resumed', workers=1, flush_every=2) == 3
+    assert run_sweep(configs, tmp_path / 'resumed', workers=1, flush_every=2) == len(configs) - 3
+    assert_same_results(full, load_sweep(tmp_path / 'resumed'))
+
+
+def test_results_do_not_depend_on_workers(tmp_path):
+    configs = expand_grid([12, 20], [4], [0.5], [0, 1, 2])
+    run_sweep(configs, tmp_path / 'serial', workers=1)
+    run_sweep(configs[::-1], tmp_path / 'parallel', workers=2)
+    assert_same_results(load_sweep(tmp_path / 'serial'), load_sweep(tmp_path / 'parallel'))
+
+
+def test_empty_sweep_directory(tmp_path):
+    assert load_sweep(tmp_path) == {}
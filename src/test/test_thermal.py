@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.core.ring_state import RingState
+from src.core.thermal import ThermalModel, traffic_power
+
+
+def system_matrix(model):
+    """Dense dT/dt = (A T + b) / C operator of the model, without the power term."""
+    n = model.num_nodes
+    laplacian = -2 * np.eye(n) + np.roll(np.eye(n), 1, axis=1) + np.roll(np.eye(n), -1, axis=1)
+    return model.conductance * laplacian - model.leakage * np.eye(n)
+
+
+def make_inputs(num_nodes=12, seed=15):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(25, 50, num_nodes), rng.uniform(0, 2, num_nodes)
+
+
+def test_explicit_step_matches_the_dense_system():
+    model = ThermalModel(12, conductance=0.4, leakage=0.2, heat_capacity=2.0, ambient=20.0)
+    temperature, power = make_inputs()
+    matrix = system_matrix(model)
+    expected = temperature + 0.5 / 2.0 * (matrix @ temperature + 0.2 * 20.0 + power)
+    np.testing.assert_allclose(model.step(temperature, power, 0.5), expected)
+
+
+def test_implicit_step_solves_the_dense_system():
+    model = ThermalModel(12, conductance=0.4, leakage=0.2, heat_capacity=2.0, ambient=20.0)
+    temperature, power = make_inputs()
+    dt = 50.0
+    lhs = np.eye(12) - dt / 2.0 * system_matrix(model)
+    expected = np.linalg.solve(lhs, temperature + dt / 2.0 * (power + 0.2 * 20.0))
+    np.testing.assert_allclose(model.step(temperature, power, dt, implicit=True), expected)
+
+
+def test_steady_state_is_a_fixed_point():
+    model = ThermalModel(12)
+    temperature, power = make_inputs()
+    steady = model.steady_state(power)
+    np.testing.assert_allclose(model.derivative(steady, power), 0.0, atol=1e-9)
+    # Both integrators converge to it
+    np.testing.assert_allclose(model.run(temperature, power, 0.5, 4000), steady, atol=1e-6)
+    np.testing.assert_allclose(model.run(temperature, power, 100.0, 200, implicit=True), steady,
+                               atol=1e-6)
+    with pytest.raises(ValueError):
+        ThermalModel(12, leakage=0.0).steady_state(power)
+
+
+def test_explicit_steps_beyond_the_stable_limit_are_rejected():
+    model = ThermalModel(12)
+    temperature, power = make_inputs()
+    with pytest.raises(ValueError):
+        model.step(temperature, power, model.max_stable_dt() * 1.01)
+
+
+def test_run_records_history_and_calls_power():
+    model = ThermalModel(12)
+    temperature, power = make_inputs()
+    calls = []
+
+    def varying(step, current):
+        calls.append(step)
+        return power * (step % 2)
+
+    final, history = model.run(temperature, varying, 0.5, 6, record_every=2)
+    assert calls == list(range(6))
+    assert history.shape == (3, 12)
+    np.testing.assert_array_equal(history[-1], final)
+
+    expected = temperature
+    for step in range(6):
+        expected = model.step(expected, power * (step % 2), 0.5)
+    np.testing.assert_allclose(final, expected)
+
+
+def test_advance_updates_the_state_and_graph():
+    rng = np.random.default_rng(16)
+    state = RingState(12, rng.uniform(25, 50, 12), rng.uniform(20, 60, 12), rng.uniform(20, 60, 12))
+    graph = state.to_graph()
+    version = state.version
+    power = traffic_power(state, per_utilization=0.02, per_congestion=0.01)
+    expected_power = (0.02 * (state.cw_utilization + np.roll(state.cw_utilization, 1)) / 2 +
+                      0.01 * state.congestion)
+    np.testing.assert_allclose(power, expected_power)
+
+    model = ThermalModel(12)
+    expected = model.run(state.temperature, power, 0.5, 4)
+    model.advance(state, power, 0.5, steps=4)
+    np.testing.assert_allclose(state.temperature, expected)
+    assert state.version > version
+    assert [graph.nodes[i]['temperature'] for i in range(12)] == state.temperature.tolist()
@@ -0,0 +1,84 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.core.ring_state import ring_state
+from src.core.topology import PROFILES, create_ring_state, create_ring_topology, partition_nodes
+from src.test.test_scenarios import create_test_scenario_1, create_test_scenario_2
+
+
+def assert_same_state(first, second):
+    np.testing.assert_array_equal(first.temperature, second.temperature)
+    np.testing.assert_array_equal(first.congestion, second.congestion)
+    np.testing.assert_array_equal(first.cw_utilization, second.cw_utilization)
+
+
+@pytest.mark.parametrize('profile', sorted(PROFILES))
+def test_profiles_are_reproducible_from_a_seed(profile):
+    first = create_ring_state(64, np.random.default_rng(1), profile)
+    assert_same_state(first, create_ring_state(64, np.random.default_rng(1), profile))
+    assert_same_state(first, create_ring_state(64, 1, profile))
+    np.testing.assert_array_equal(first.ccw_utilization, np.roll(first.cw_utilization, 1))
+
+
+def test_global_seed_keeps_unseeded_runs_reproducible():
+    np.random.seed(3)
+    first = create_ring_state(32)
+    np.random.seed(3)
+    assert_same_state(first, create_ring_state(32))
+
+
+def test_gaussian_profile_ranges():
+    state = create_ring_state(10_000, np.random.default_rng(2))
+    assert 25 <= state.temperature.min() and state.temperature.max() <= 50
+    assert abs(state.temperature.mean() - 35) < 0.5
+    assert 20 <= state.congestion.min() and state.congestion.max() <= 60
+    assert 20 <= state.cw_utilization.min() and state.cw_utilization.max() <= 60
+
+
+def test_hotspot_profile_options():
+    state = create_ring_state(40, np.random.default_rng(4), 'hotspot', hotspots=[10], radius=2)
+    assert np.flatnonzero(state.temperature == 90.0).tolist() == [8, 9, 10, 11, 12]
+    assert (state.temperature[state.temperature != 90.0] == 60.0).all()
+
+
+def test_custom_and_unknown_profiles():
+    def flat(rng, num_nodes, level):
+        return np.full(num_nodes, level), np.zeros(num_nodes), np.ones(num_nodes)
+
+    state = create_ring_state(5, profile=flat, level=42.0)
+    assert (state.temperature == 42.0).all()
+    with pytest.raises(ValueError):
+        create_ring_state(5, profile='volcanic')
+
+
+def scenario_attributes(graph):
+    n = len(graph)
+    return ([graph.nodes[i]['temperature'] for i in range(n)],
+            [graph[i][(i + 1) % n]['utilization'] for i in range(n)])
+
+
+@pytest.mark.parametrize('scenario', [create_test_scenario_1, create_test_scenario_2])
+def test_scenarios_match_on_rings_and_other_graphs(scenario):
+    ring = create_ring_topology(30, np.random.default_rng(5))
+    scenario(ring)
+
+    with_chord = create_ring_topology(30, np.random.default_rng(5))
+    with_chord.add_edge(3, 17, utilization=10.0)
+    assert ring_state(with_chord) is None
+    scenario(with_chord)
+    assert scenario_attributes(with_chord) == scenario_attributes(ring)
+
+    plain = nx.cycle_graph(30)
+    nx.set_node_attributes(plain, 0.0, 'temperature')
+    scenario(plain)
+    assert scenario_attributes(plain) == scenario_attributes(ring)
+
+
+def test_partition_nodes():
+    graph = create_ring_topology(10, np.random.default_rng(6))
+    partitions = partition_nodes(graph, 4)
+    assert partitions == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert [graph.nodes[i]['partition'] for i in range(10)] == [0] * 4 + [1] * 4 + [2] * 2
+    with pytest.raises(ValueError):
+        partition_nodes(graph, 11)
@@ -0,0 +1,191 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from src.core.ring_state import RingState, ring_state
+from src.core.thermal import ThermalModel
+from src.core.trace import (TraceChunk, convert_text_trace, read_binary_trace, read_text_trace,
+                            replay)
+
+
+def make_state(num_nodes=16, seed=28):
+    rng = np.random.default_rng(seed)
+    return RingState(num_nodes, rng.uniform(25, 50, num_nodes), rng.uniform(20, 60, num_nodes),
+                     rng.uniform(20, 60, num_nodes), rng.uniform(20, 60, num_nodes))
+
+
+def make_requests(num_nodes=16, count=150, seed=29):
+    rng = np.random.default_rng(seed)
+    timestamps = np.sort(rng.uniform(0, 60, count)).round(3)
+    # Leave a few empty windows
+    timestamps[timestamps > 40] += 25
+    return [(float(t), int(rng.integers(num_nodes)),
+             rng.integers(0, num_nodes, rng.integers(1, 5)).tolist()) for t in timestamps]
+
+
+def write_text(path, requests):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt') as f:
+        f.write("# timestamp,source,targets\n")
+        for i, (timestamp, source, targets) in enumerate(requests):
+            if i % 40 == 0:
+                f.write("\n")
+            f.write(f"{timestamp!r},{source},{' '.join(map(str, targets))}\n")
+
+
+def chunked(requests, chunk_size):
+    for start in range(0, len(requests), chunk_size):
+        part = requests[start:start + chunk_size]
+        indptr = np.zeros(len(part) + 1, dtype=np.intp)
+        np.cumsum([len(targets) for _, _, targets in part], out=indptr[1:])
+        yield TraceChunk(np.array([t for t, _, _ in part]), np.array([s for _, s, _ in part]),
+                         indptr, np.array([x for _, _, targets in part for x in targets],
+                                          dtype=np.intp))
+
+
+def path_score(temperature, cw, ccw, source, target, clockwise, wc, wt):
+    """Scores the ring path from source to target node by node."""
+    n = len(temperature)
+    step = 1 if clockwise else -1
+    nodes = [source]
+    while nodes[-1] != target:
+        nodes.append((nodes[-1] + step) % n)
+    links = [cw[u] if clockwise else ccw[u] for u in nodes[:-1]]
+    avg_congestion = (cw.sum() + ccw.sum()) / (2 * n)
+    return (wc * sum(links) / (len(nodes) * avg_congestion) +
+            wt * temperature[nodes].sum() / (len(nodes) * temperature.mean()))
+
+
+def brute_force_replay(state, requests, wc, wt, window, load, decay, batch_size):
+    """Replays requests one by one, re-scoring every batch against the traffic so far."""
+    n = state.num_nodes
+    temperature = state.temperature.copy()
+    base_cw, base_ccw = state.cw_utilization.copy(), state.ccw_utilization.copy()
+    traffic_cw, traffic_ccw = np.zeros(n), np.zeros(n)
+    batches = []
+    for i, request in enumerate(requests):
+        key = (int(np.floor(request[0] / window)), i // batch_size)
+        if batches and batches[-1][0] == key:
+            batches[-1][1].append(request)
+        else:
+            batches.append((key, [request]))
+
+    rows, current = [], None
+    for (index, _), batch in batches:
+        if current is not None and index != current['index']:
+            rows.append(current)
+            traffic_cw *= decay ** (index - current['index'])
+            traffic_ccw *= decay ** (index - current['index'])
+            current = None
+        if current is None:
+            current = {'index': index, 'requests': 0, 'targets': 0, 'cost': 0.0,
+                       'clockwise': 0, 'tree_hops': 0, 'spf_length': 0}
+        cw, ccw = base_cw + traffic_cw, base_ccw + traffic_ccw
+        trees = []
+        for _, source, targets in batch:
+            scores = {direction: [path_score(temperature, cw, ccw, source, target, direction,
+                                             wc, wt) for target in targets]
+                      for direction in (True, False)}
+            clockwise = sum(scores[True]) <= sum(scores[False])
+            hops = max((target - source if clockwise else source - target) % n
+                       for target in targets)
+            clock_nodes = sum((target - source) % n + 1 for target in targets)
+            counter_nodes = sum((source - target) % n + 1 for target in targets)
+            trees.append((source, clockwise, hops))
+            current['requests'] += 1
+            current['targets'] += len(targets)
+            current['cost'] += sum(scores[clockwise])
+            current['clockwise'] += clockwise
+            current['tree_hops'] += hops
+            current['spf_length'] += min(clock_nodes, counter_nodes)
+        for source, clockwise, hops in trees:
+            for k in range(hops):
+                if clockwise:
+                    traffic_cw[(source + k) % n] += load
+                else:
+                    traffic_ccw[(source - k) % n] += load
+        current['max_link_utilization'] = max((base_cw + traffic_cw).max(),
+                                              (base_ccw + traffic_ccw).max())
+    rows.append(current)
+    return rows
+
+
+@pytest.mark.parametrize('batch_size', [1, 7, 64])
+def test_replay_matches_brute_force(batch_size):
+    requests = make_requests()
+    window, decay = 10.0, 0.5
+    expected = brute_force_replay(make_state(), requests, 0.6, 0.4, window, 2.0, decay,
+                                  batch_size)
+    graph = make_state().to_graph()
+    rows = list(replay(graph, chunked(requests, 23), 0.6, 0.4, window, load=2.0, decay=decay,
+                       batch_size=batch_size))
+    assert len(rows) == len(expected)
+    for row, reference in zip(rows, expected):
+        assert row['window_start'] == reference['index'] * window
+        assert row['window_end'] == row['window_start'] + window
+        assert row['requests'] == reference['requests']
+        assert row['targets'] == reference['targets']
+        assert row['tempcon_cost'] == pytest.approx(reference['cost'])
+        assert row['spf_length'] == reference['spf_length']
+        assert row['clockwise_fraction'] == reference['clockwise'] / reference['requests']
+        assert row['mean_tree_hops'] == pytest.approx(reference['tree_hops'] /
+                                                      reference['requests'])
+        assert row['max_link_utilization'] == pytest.approx(reference['max_link_utilization'])
+    assert sum(row['requests'] for row in rows) == len(requests)
+
+
+def test_replay_does_not_depend_on_chunk_size():
+    requests = make_requests(count=300)
+    results = []
+    for chunk_size in [1, 5, 64, 1000]:
+        state = make_state()
+        graph = state.to_graph()
+        rows = list(replay(graph, chunked(requests, chunk_size), 0.7, 0.3, 10.0, decay=0.3,
+                           thermal=ThermalModel(16), thermal_dt=2.0, batch_size=16))
+        results.append((rows, state.temperature.copy(), state.cw_utilization.copy(),
+                        state.ccw_utilization.copy()))
+    for rows, temperature, cw, ccw in results[1:]:
+        assert rows == results[0][0]
+        np.testing.assert_array_equal(temperature, results[0][1])
+        np.testing.assert_array_equal(cw, results[0][2])
+        np.testing.assert_array_equal(ccw, results[0][3])
+
+
+def test_replay_writes_the_traffic_to_the_graph():
+    graph = make_state().to_graph()
+    list(replay(graph, chunked(make_requests(), 50), 0.5, 0.5, 10.0, decay=1.0))
+    state = ring_state(graph)
+    assert [graph.nodes[i]['temperature'] for i in range(16)] == state.temperature.tolist()
+    assert graph[0][1]['utilization'] == state.cw_utilization[0]
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.csv.gz'])
+def test_text_and_binary_traces_round_trip(tmp_path, suffix):
+    requests = make_requests()
+    path = str(tmp_path / f'trace{suffix}')
+    write_text(path, requests)
+    assert convert_text_trace(path, str(tmp_path / 'binary'), chunk_size=17) == len(requests)
+
+    expected = TraceChunk.concatenate(list(chunked(requests, len(requests))))
+    for chunks in (list(read_text_trace(path, 11)),
+                   list(read_binary_trace(str(tmp_path / 'binary'), 13))):
+        assert max(len(chunk) for chunk in chunks) <= 13
+        joined = TraceChunk.concatenate(chunks)
+        for name in TraceChunk.__slots__:
+            np.testing.assert_array_equal(getattr(joined, name), getattr(expected, name))
+
+
+def test_invalid_traces_are_rejected(tmp_path):
+    graph = make_state().to_graph()
+    requests = make_requests()
+    with pytest.raises(ValueError):
+        list(replay(graph, chunked(requests[::-1], 50), 0.5, 0.5, 10.0))
+    with pytest.raises(ValueError):
+        list(replay(graph, chunked([(0.0, 3, [16])], 1), 0.5, 0.5, 10.0))
+    with pytest.raises(ValueError):
+        list(replay(graph, chunked(requests, 50), 0.5, 0.5, 0.0))
+    path = tmp_path / 'bad.csv'
+    path.write_text("1.0,2\n")
+    with pytest.raises(ValueError):
+        list(read_text_trace(str(path)))
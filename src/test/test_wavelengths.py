@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from src.core.arcs import RingArc
+from src.core.wavelengths import WavelengthAllocator
+
+
+class BruteForceAllocator:
+    """Channel sets per directed link, scanned channel by channel."""
+
+    def __init__(self, num_nodes, num_channels):
+        self.n, self.num_channels = num_nodes, num_channels
+        self.used = {}
+        self.usage = [0] * num_channels
+        self.allocations = {}
+
+    def links(self, paths):
+        links = set()
+        for path in paths:
+            nodes = list(path)
+            for u, v in zip(nodes[:-1], nodes[1:]):
+                # Clockwise link u carries u -> u + 1, counter-clockwise link u carries u -> u - 1
+                links.add(((v - u) % self.n == 1, u))
+        return links
+
+    def allocate(self, request_id, paths, policy):
+        links = self.links(paths)
+        free = [c for c in range(self.num_channels)
+                if all(c not in self.used.get(link, ()) for link in links)]
+        if not free:
+            return None
+        if policy == 'first_fit':
+            channel = free[0]
+        else:
+            channel = max(free, key=lambda c: (self.usage[c], -c))
+        for link in links:
+            self.used.setdefault(link, set()).add(channel)
+        self.usage[channel] += len(links)
+        self.allocations[request_id] = (channel, links)
+        return channel
+
+    def release(self, request_id):
+        channel, links = self.allocations.pop(request_id)
+        for link in links:
+            self.used[link].discard(channel)
+        self.usage[channel] -= len(links)
+
+
+@pytest.mark.parametrize('policy', ['first_fit', 'most_used'])
+def test_allocation_matches_brute_force(policy):
+    n, channels = 16, 70
+    allocator = WavelengthAllocator(n, channels)
+    brute = BruteForceAllocator(n, channels)
+    rng = np.random.default_rng(17)
+    blocked = 0
+    for request in range(800):
+        if allocator.allocations and rng.random() < 0.15:
+            request_id = list(allocator.allocations)[rng.integers(len(allocator.allocations))]
+            allocator.release(request_id)
+            brute.release(request_id)
+            continue
+        source = int(rng.integers(n))
+        clockwise = bool(rng.random() < 0.5)
+        paths = [RingArc(source, int(target), clockwise, n)
+                 for target in rng.integers(0, n, rng.integers(1, 4))]
+        channel = allocator.allocate(request, paths, policy)
+        assert channel == brute.allocate(request, paths, policy)
+        blocked += channel is None
+
+    cw_load, ccw_load = allocator.link_load()
+    for link in range(n):
+        assert cw_load[link] == len(brute.used.get((True, link), ()))
+        assert ccw_load[link] == len(brute.used.get((False, link), ()))
+    assert blocked > 0
+    assert allocator.blocking_probability() == blocked / allocator.requests
+
+
+def test_node_lists_and_arcs_use_the_same_links():
+    allocator = WavelengthAllocator(10, 8)
+    arcs = [RingArc(2, 6, True, 10), RingArc(2, 8, False, 10), RingArc(2, 2, True, 10)]
+    cw, ccw = allocator.tree_links(arcs)
+    assert cw.tolist() == [2, 3, 4, 5]
+    assert ccw.tolist() == [0, 1, 2, 9]
+    as_lists = allocator.tree_links([list(arc) for arc in arcs])
+    assert [links.tolist() for links in as_lists] == [cw.tolist(), ccw.tolist()]
+    with pytest.raises(ValueError):
+        allocator.tree_links([[0, 1, 3]])
+
+
+def test_conflicting_trees_get_different_channels():
+    allocator = WavelengthAllocator(10, 2)
+    assert allocator.allocate('a', [RingArc(0, 5, True, 10)]) == 0
+    # The opposite direction uses other links
+    assert allocator.allocate('b', [RingArc(5, 0, False, 10)]) == 0
+    assert allocator.allocate('c', [RingArc(3, 7, True, 10)]) == 1
+    assert allocator.allocate('d', [RingArc(4, 6, True, 10)]) is None
+    allocator.release('a')
+    assert allocator.allocate('d', [RingArc(4, 6, True, 10)]) == 0
+    with pytest.raises(ValueError):
+        allocator.allocate('d', [RingArc(0, 1, True, 10)])
+
+
+def test_thermal_policy_keeps_the_drift_range_free():
+    allocator = WavelengthAllocator(10, 16)
+    # 5 K above T_o shifts the resonance by about 1.4 nm, i.e. two channel spacings
+    assert allocator.drift_channels(30.0) == 2
+    free = np.ones(16, dtype=bool)
+    free[[1, 5]] = False
+    assert allocator.choose(free, 'thermal', 30.0) == 2
+    assert allocator.choose(free, 'first_fit') == 0
+    # With no wide enough gap it falls back to first fit
+    assert allocator.choose(np.array([False, True] * 8), 'thermal', 30.0) == 1
+
+    temperature = np.full(10, 25.0)
+    temperature[3] = 30.0
+    allocator.allocate('busy', [RingArc(0, 1, True, 10)])
+    assert allocator.allocate('hot', [RingArc(0, 3, True, 10)], 'thermal', temperature) == 1
+    with pytest.raises(ValueError):
+        allocator.choose(free, 'thermal')
+    with pytest.raises(ValueError):
+        allocator.choose(free, 'random')
@@ -1,49 +1,169 @@
 import matplotlib.pyplot as plt
-import networkx as nx
 import numpy as np
 import pandas as pd
-from matplotlib.patches import FancyArrowPatch
+from matplotlib.collections import LineCollection
 import os
+from src.core.arcs import RingArc
+from src.core.metrics import node_partition_metrics
+from src.core.ring_state import ring_state
+from src.core.topology import partition_labels
 
-def visualize_topology(graph, paths_tempcon, paths_spf, sources, targets, partition_size):
-    """Visualizes the ring topology with temperatures and highlights the best paths."""
-    fig, ax = plt.subplots(figsize=(15, 10))
-    pos = nx.circular_layout(graph)
-    
-    # Draw base network
-    node_colors = [graph.nodes[n]['temperature'] for n in graph.nodes]
-    nx.draw(graph, pos, with_labels=True, node_color=node_colors, 
-           cmap=plt.cm.coolwarm, node_size=500, ax=ax)
+BAND_THRESHOLD = 256
+"""Rings with more nodes draw per-link path load bands instead of individual paths."""
+
+def _ring_positions(num_nodes):
+    """Node coordinates of the circular layout (node i at angle 2*pi*i/n)."""
+    theta = 2 * np.pi * np.arange(num_nodes) / num_nodes
+    return np.column_stack((np.cos(theta), np.sin(theta)))
+
+def _node_temperatures(graph):
+    state = ring_state(graph)
+    if state is not None:
+        return state.temperature
+    return np.array([graph.nodes[n]['temperature'] for n in range(graph.number_of_nodes())])
+
+def _hit_test(x, y, num_nodes, tolerance=0.05):
+    """Node under the point (x, y) of the circular layout, or None.
+
+    The nearest node is found from the point's angle instead of scanning
+    all node positions.
+    """
+    if x is None or y is None:
+        return None
+    node = int(np.rint(np.arctan2(y, x) / (2 * np.pi) * num_nodes)) % num_nodes
+    angle = 2 * np.pi * node / num_nodes
+    if np.hypot(x - np.cos(angle), y - np.sin(angle)) > max(tolerance, np.pi / num_nodes):
+        return None
+    return node
+
+def _path_angles(path, num_nodes, samples_per_hop=8):
+    """Continuous angles along a path, sampled between nodes so arcs follow the ring."""
+    nodes = np.asarray(path, dtype=float)
+    if len(nodes) < 2:
+        return nodes * 2 * np.pi / num_nodes
+    steps = np.diff(nodes)
+    # Unwrap steps across node 0 so consecutive nodes are one hop apart
+    steps = (steps + num_nodes / 2) % num_nodes - num_nodes / 2
+    hops = np.concatenate(([nodes[0]], nodes[0] + np.cumsum(steps)))
+    fine = np.linspace(0, len(hops) - 1, (len(hops) - 1) * samples_per_hop + 1)
+    return np.interp(fine, np.arange(len(hops)), hops) * 2 * np.pi / num_nodes
+
+def _path_segments(paths, num_nodes, radius, spread):
+    """One polyline per path, each on its own radius so overlapping paths stay visible."""
+    segments = []
+    for i, path in enumerate(paths):
+        angles = _path_angles(path, num_nodes)
+        r = radius + spread * (i % 5)
+        segments.append(np.column_stack((r * np.cos(angles), r * np.sin(angles))))
+    return segments
+
+def _link_loads(paths, num_nodes):
+    """Number of paths using each link i -- i+1 of the ring, in either direction."""
+    starts, counts = [], []
+    edges = []
+    for path in paths:
+        if isinstance(path, RingArc):
+            # Clockwise arcs use links source..target-1, counter-clockwise ones target..source-1
+            starts.append(path.source if path.clockwise else path.target)
+            counts.append(path.hops)
+        elif len(path) > 1:
+            u, v = np.asarray(path[:-1]), np.asarray(path[1:])
+            edges.append(np.where(v == (u + 1) % num_nodes, u, v))
+
+    diff = np.zeros(2 * num_nodes + 1, dtype=np.int64)
+    if starts:
+        starts = np.asarray(starts)
+        np.add.at(diff, starts, 1)
+        np.add.at(diff, starts + np.asarray(counts), -1)
+    loads = np.cumsum(diff[:-1])
+    loads = loads[:num_nodes] + loads[num_nodes:]
+    if edges:
+        loads += np.bincount(np.concatenate(edges), minlength=num_nodes)
+    return loads
+
+def _band_segments(num_nodes, radius):
+    """Arc of every ring link i -- i+1 at the given radius."""
+    theta = 2 * np.pi * (np.arange(num_nodes)[:, None] + np.linspace(0, 1, 5)) / num_nodes
+    return np.stack((radius * np.cos(theta), radius * np.sin(theta)), axis=-1)
+
+class _PathLayer:
+    """Paths of one algorithm drawn as a single LineCollection.
+
+    Small rings show every path as its own polyline; large rings show one
+    band per link whose width grows with the number of paths using it.
+    Updating the paths only changes the collection's data.
+    """
+
+    def __init__(self, ax, num_nodes, color, radius, spread, band, label=None):
+        self.num_nodes = num_nodes
+        self.radius = radius
+        self.spread = spread
+        self.band = band
+        self.collection = LineCollection([], colors=color, linewidths=2, alpha=0.8,
+                                         capstyle='round', label=label, zorder=1)
+        if band:
+            self._segments = _band_segments(num_nodes, radius)
+        ax.add_collection(self.collection)
+
+    def set_paths(self, paths):
+        if not self.band:
+            self.collection.set_segments(_path_segments(paths, self.num_nodes, self.radius,
+                                                        self.spread))
+            return
+        loads = _link_loads(paths, self.num_nodes)
+        used = np.flatnonzero(loads)
+        self.collection.set_segments(self._segments[used])
+        if len(used):
+            self.collection.set_linewidths(1 + 7 * loads[used] / loads[used].max())
+
+def _draw_ring(ax, graph, sources, targets):
+    """Draws nodes colored by temperature plus source/target markers; returns the node artists."""
+    num_nodes = graph.number_of_nodes()
+    pos = _ring_positions(num_nodes)
+    size = float(np.clip(40000 / num_nodes, 4, 500))
+    ax.add_collection(LineCollection(_band_segments(num_nodes, 1.0), colors='0.6',
+                                     linewidths=0.8, zorder=0))
+    nodes = ax.scatter(pos[:, 0], pos[:, 1], c=_node_temperatures(graph), cmap=plt.cm.coolwarm,
+                       s=size, zorder=2)
+    highlight_sources = ax.scatter(pos[sources, 0], pos[sources, 1], c='lime', s=size * 1.4,
+                                   label='Sources', zorder=3)
+    ax.scatter(pos[targets, 0], pos[targets, 1], c='cyan', s=size * 1.4, label='Targets', zorder=3)
+    if num_nodes <= 64:
+        for node, (x, y) in enumerate(pos):
+            ax.text(x, y, str(node), ha='center', va='center', fontsize=8, zorder=4)
+    ax.set_xlim(-1.3, 1.3)
+    ax.set_ylim(-1.3, 1.3)
+    ax.set_aspect('equal')
+    ax.set_axis_off()
+    return nodes, highlight_sources
+
+def visualize_topology(graph, paths_tempcon, paths_spf, sources, targets, partition_size, dpi=300,
+                       band_threshold=BAND_THRESHOLD):
+    """Visualizes the ring topology with temperatures and highlights the best paths.
     
-    # Draw paths for each source
-    for source in sources:
-        for path in paths_tempcon[source]:
-            edges = list(zip(path[:-1], path[1:]))
-            nx.draw_networkx_edges(graph, pos, edgelist=edges, edge_color='red',
-                                 width=2, arrows=True, arrowsize=20,
-                                 connectionstyle='arc3,rad=0.2', ax=ax)
-        
-        for path in paths_spf[source]:
-            edges = list(zip(path[:-1], path[1:]))
-            nx.draw_networkx_edges(graph, pos, edgelist=edges, edge_color='blue',
-                                 width=2, arrows=True, arrowsize=20,
-                                 connectionstyle='arc3,rad=-0.2', ax=ax)
+    TempCon paths are drawn outside the ring (red), SPF paths inside (blue).
+    Rings with more than band_threshold nodes show per-link path load bands.
+    """
+    fig, ax = plt.subplots(figsize=(15, 10))
+    num_nodes = graph.number_of_nodes()
+    band = num_nodes > band_threshold
+    nodes, _ = _draw_ring(ax, graph, sources, targets)
     
-    # Highlight source and target nodes
-    nx.draw_networkx_nodes(graph, pos, nodelist=sources, node_color='lime',
-                          node_size=700, label='Sources', ax=ax)
-    nx.draw_networkx_nodes(graph, pos, nodelist=targets, node_color='cyan',
-                          node_size=700, label='Targets', ax=ax)
+    # Draw the paths of all sources, one collection per algorithm
+    for paths, color, radius, spread, label in ((paths_tempcon, 'red', 1.06, 0.03, 'TempCon-RingCast'),
+                                                (paths_spf, 'blue', 0.94, -0.03, 'SPF')):
+        layer = _PathLayer(ax, num_nodes, color, radius, spread, band, label)
+        layer.set_paths([path for source in sources for path in paths[source]])
     
     plt.title("Ring Topology Comparison: TempCon-RingCast vs SPF")
-    plt.colorbar(plt.cm.ScalarMappable(cmap=plt.cm.coolwarm), ax=ax)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.colorbar(nodes, ax=ax, label='Temperature (°C)')
+    ax.legend(loc='upper left')
     
     plt.savefig('results/plots/ring_topology_comparison.png', 
-                bbox_inches='tight', dpi=300)
+                bbox_inches='tight', dpi=dpi)
     plt.close()
 
-def visualize_metrics_comparison(graph, paths_tempcon, paths_spf, wc, wt, test_name=None):
+def visualize_metrics_comparison(graph, paths_tempcon, paths_spf, wc, wt, test_name=None, dpi=300):
     """Creates detailed comparison plots between TempCon-RingCast and SPF."""
     fig = plt.figure(figsize=(15, 10))
     gs = fig.add_gridspec(2, 2, hspace=0.3, wspace=0.3)
@@ -71,7 +191,7 @@ def visualize_metrics_comparison(graph, paths_tempcon, paths_spf, wc, wt, test_n
     # Save to appropriate directory
     save_dir = 'results/test' if test_name else 'results/plots'
     filename = f'{test_name}_comparison.png' if test_name else 'metrics_comparison.png'
-    plt.savefig(f'{save_dir}/{filename}', bbox_inches='tight', dpi=300)
+    plt.savefig(f'{save_dir}/{filename}', bbox_inches='tight', dpi=dpi)
     plt.close()
     
     # Add more visualization code here...
@@ -83,7 +203,7 @@ def visualize_path_metrics(graph, path, algorithm_name):
     congestion = []
     for u, v in zip(path[:-1], path[1:]):
         if graph.has_edge(u, v):
-            congestion.append(graph[u][v]['utilization'])
+            congestion.append(graph[u][v].get('utilization', 0.0))
         else:
             congestion.append(0)  # Handle invalid edges
 
@@ -112,7 +232,7 @@ def summarize_path_metrics(graph, path, wc, wt):
     data = {
         'Node': path,
         'Temperature (°C)': [graph.nodes[node]['temperature'] for node in path],
-        'Congestion (%)': [graph[u][v]['utilization'] if graph.has_edge(u, v) else None for u, v in zip(path[:-1], path[1:])] + [None],
+        'Congestion (%)': [graph[u][v].get('utilization', 0.0) if graph.has_edge(u, v) else None for u, v in zip(path[:-1], path[1:])] + [None],
     }
 
     # Calculate weighted scores
@@ -126,65 +246,38 @@ def summarize_path_metrics(graph, path, wc, wt):
     print(df.to_string(index=False))
     return df
 
-def create_interactive_visualization(graph, paths_tempcon, paths_spf, sources, targets):
-    """Creates an interactive visualization showing multicast paths."""
+def create_interactive_visualization(graph, paths_tempcon, paths_spf, sources, targets,
+                                     band_threshold=BAND_THRESHOLD):
+    """Creates an interactive visualization showing multicast paths.
+    
+    Clicking a source node shows its paths; only the path and highlight
+    artists are updated, the ring itself is drawn once.
+    """
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 10))
-    pos = nx.circular_layout(graph)
+    num_nodes = graph.number_of_nodes()
+    band = num_nodes > band_threshold
+    pos = _ring_positions(num_nodes)
+    source_set = set(sources)
     
-    def draw_multicast_paths(ax, paths_dict, source, color):
-        for i, path in enumerate(paths_dict[source]):
-            edges = list(zip(path[:-1], path[1:]))
-            rad = 0.2 + (i * 0.1)  # Different curvature for each target
-            rad = rad if color == 'red' else -rad
-            nx.draw_networkx_edges(graph, pos, edgelist=edges,
-                                 edge_color=color, width=2,
-                                 connectionstyle=f'arc3,rad={rad}',
-                                 arrows=True, arrowsize=20, ax=ax)
+    views = []
+    for ax, paths_dict, color, radius, spread in ((ax1, paths_tempcon, 'red', 1.06, 0.03),
+                                                  (ax2, paths_spf, 'blue', 0.94, -0.03)):
+        _, highlight = _draw_ring(ax, graph, sources, targets)
+        views.append((highlight, paths_dict,
+                      _PathLayer(ax, num_nodes, color, radius, spread, band)))
     
     def on_click(event):
-        if event.inaxes in [ax1, ax2]:
-            for node, (x, y) in pos.items():
-                if abs(event.xdata - x) < 0.05 and abs(event.ydata - y) < 0.05:
-                    if node in sources:
-                        # Clear previous paths
-                        ax1.clear()
-                        ax2.clear()
-                        
-                        # Redraw base network
-                        for ax in [ax1, ax2]:
-                            nx.draw(graph, pos, with_labels=True,
-                                  node_color=[graph.nodes[n]['temperature'] for n in graph.nodes],
-                                  cmap=plt.cm.coolwarm, node_size=500, ax=ax)
-                            
-                            # Highlight source and targets
-                            nx.draw_networkx_nodes(graph, pos, nodelist=[node],
-                                                 node_color='lime', node_size=700, ax=ax)
-                            nx.draw_networkx_nodes(graph, pos, nodelist=targets,
-                                                 node_color='cyan', node_size=700, ax=ax)
-                        
-                        # Draw multicast paths from selected source
-                        draw_multicast_paths(ax1, paths_tempcon, node, 'red')
-                        draw_multicast_paths(ax2, paths_spf, node, 'blue')
-                        
-                        ax1.set_title(f"TempCon-RingCast Paths from Node {node}")
-                        ax2.set_title(f"Shortest Path First Paths from Node {node}")
-                        
-                        plt.draw()
-    
-    # Initial drawing
-    nx.draw(graph, pos, with_labels=True, 
-           node_color=[graph.nodes[n]['temperature'] for n in graph.nodes],
-           cmap=plt.cm.coolwarm, node_size=500, ax=ax1)
-    nx.draw(graph, pos, with_labels=True,
-           node_color=[graph.nodes[n]['temperature'] for n in graph.nodes],
-           cmap=plt.cm.coolwarm, node_size=500, ax=ax2)
-    
-    # Highlight source and target nodes
-    for ax in [ax1, ax2]:
-        nx.draw_networkx_nodes(graph, pos, nodelist=sources,
-                             node_color='lime', node_size=700, ax=ax)
-        nx.draw_networkx_nodes(graph, pos, nodelist=targets,
-                             node_color='cyan', node_size=700, ax=ax)
+        if event.inaxes not in (ax1, ax2):
+            return
+        node = _hit_test(event.xdata, event.ydata, num_nodes)
+        if node not in source_set:
+            return
+        for highlight, paths_dict, layer in views:
+            highlight.set_offsets(pos[[node]])
+            layer.set_paths(paths_dict[node])
+        ax1.set_title(f"TempCon-RingCast Paths from Node {node}")
+        ax2.set_title(f"Shortest Path First Paths from Node {node}")
+        fig.canvas.draw_idle()
     
     ax1.set_title("Click on a source node to view TempCon-RingCast path")
     ax2.set_title("Click on a source node to view Shortest Path First path")
@@ -203,16 +296,18 @@ def save_simulation_metrics(graph, paths_tempcon, paths_spf, wc, wt, test_name=N
     for algo, paths in [('TempCon', paths_tempcon), ('SPF', paths_spf)]:
         for source in paths:
             for path in paths[source]:
+                # A target equal to its source gives a zero-hop path that
+                # crosses no links, so its congestion is 0
+                link_utilization = [graph[u][v].get('utilization', 0.0)
+                                    for u, v in zip(path[:-1], path[1:])]
                 path_metrics = {
                     'Source': source,
                     'Path': '->'.join(map(str, path)),
                     'Path_Length': len(path),
                     'Avg_Temperature': np.mean([graph.nodes[n]['temperature'] for n in path]),
                     'Max_Temperature': max([graph.nodes[n]['temperature'] for n in path]),
-                    'Avg_Congestion': np.mean([graph[u][v]['utilization'] 
-                                             for u, v in zip(path[:-1], path[1:])]),
-                    'Max_Congestion': max([graph[u][v]['utilization'] 
-                                         for u, v in zip(path[:-1], path[1:])])
+                    'Avg_Congestion': np.mean(link_utilization) if link_utilization else 0.0,
+                    'Max_Congestion': max(link_utilization, default=0.0)
                 }
                 
                 # Calculate weighted score
@@ -233,30 +328,24 @@ def save_simulation_metrics(graph, paths_tempcon, paths_spf, wc, wt, test_name=N
 
 def save_node_partition_metrics(graph, partitions, test_name=None):
     """Saves node and partition level metrics to CSV files."""
-    # Node metrics
-    node_metrics = []
-    for node in graph.nodes():
-        node_data = {
-            'Node_ID': node,
-            'Temperature': graph.nodes[node]['temperature'],
-            'Partition': next((i for i, p in enumerate(partitions) if node in p), None),
-            'Avg_Edge_Congestion': np.mean([graph[node][neighbor]['utilization'] 
-                                          for neighbor in graph.neighbors(node)])
-        }
-        node_metrics.append(node_data)
+    # Node and partition metrics as grouped reductions over the partition labels
+    labels = partition_labels(partitions, len(graph))
+    node_columns, partition_columns = node_partition_metrics(graph, labels, len(partitions))
+    
+    node_metrics = pd.DataFrame({
+        'Node_ID': node_columns['node_id'],
+        'Temperature': node_columns['temperature'],
+        'Partition': node_columns['partition'],
+        'Avg_Edge_Congestion': node_columns['avg_edge_congestion']
+    })
     
-    # Partition metrics
-    partition_metrics = []
-    for i, partition in enumerate(partitions):
-        partition_data = {
-            'Partition_ID': i,
-            'Nodes': ','.join(map(str, partition)),
-            'Avg_Temperature': np.mean([graph.nodes[n]['temperature'] for n in partition]),
-            'Max_Temperature': max([graph.nodes[n]['temperature'] for n in partition]),
-            'Avg_Congestion': np.mean([graph[u][v]['utilization'] 
-                                     for u in partition for v in graph.neighbors(u)])
-        }
-        partition_metrics.append(partition_data)
+    partition_metrics = pd.DataFrame({
+        'Partition_ID': partition_columns['partition_id'],
+        'Nodes': [','.join(map(str, partition)) for partition in partitions],
+        'Avg_Temperature': partition_columns['avg_temperature'],
+        'Max_Temperature': partition_columns['max_temperature'],
+        'Avg_Congestion': partition_columns['avg_congestion']
+    })
     
     # Save to CSV
     save_dir = 'results/test/metrics' if test_name else 'results/metrics'
@@ -264,8 +353,8 @@ def save_node_partition_metrics(graph, partitions, test_name=None):
     
     # Save node metrics
     node_filename = f'{test_name}_node_metrics.csv' if test_name else 'node_metrics.csv'
-    pd.DataFrame(node_metrics).to_csv(f'{save_dir}/{node_filename}', index=False)
+    node_metrics.to_csv(f'{save_dir}/{node_filename}', index=False)
     
     # Save partition metrics
     partition_filename = f'{test_name}_partition_metrics.csv' if test_name else 'partition_metrics.csv'
-    pd.DataFrame(partition_metrics).to_csv(f'{save_dir}/{partition_filename}', index=False)
\ No newline at end of file
+    partition_metrics.to_csv(f'{save_dir}/{partition_filename}', index=False)
\ No newline at end of file